@@ -55,6 +55,8 @@ from mpas_analysis.shared.analysis_task import AnalysisTask
 
 from mpas_analysis.shared.html import write_image_xml
 
+from mpas_analysis.shared.plot.plotting import savefig
+
 from mpas_analysis.shared.climatology import \
     update_climatology_bounds_from_file_names
 
@@ -372,8 +374,9 @@ class MyTask(AnalysisTask):  # {{{
         # make the plot
         x = numpy.linspace(0, 1, 1000)
         plt.plot(x, x**2)
-        # save the plot to the output file
-        plt.savefig(outFileName)
+        # save the plot to the output file (and in any additional formats
+        # requested in the config file)
+        savefig(outFileName, self.config)
 
         # here's an example of how you would create an XML file for this plot
         # with the appropriate entries.  Some notes:
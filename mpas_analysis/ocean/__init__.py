@@ -30,6 +30,7 @@ from mpas_analysis.ocean.meridional_heat_transport import \
 from mpas_analysis.ocean.time_series_antarctic_melt import \
     TimeSeriesAntarcticMelt
 
+from mpas_analysis.ocean.remap_transects_task import RemapTransectsTask
 from mpas_analysis.ocean.woce_transects import WoceTransects
 from mpas_analysis.ocean.sose_transects import SoseTransects
 from mpas_analysis.ocean.geojson_transects import GeojsonTransects
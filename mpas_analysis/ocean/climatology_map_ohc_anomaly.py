@@ -21,7 +21,7 @@ from mpas_analysis.shared.climatology import RemapMpasClimatologySubtask
 from mpas_analysis.ocean.plot_climatology_map_subtask import \
     PlotClimatologyMapSubtask
 
-from mpas_analysis.ocean.utility import compute_zmid
+from mpas_analysis.ocean.utility import get_vertical_mesh_variables
 
 
 class ClimatologyMapOHCAnomaly(AnalysisTask):  # {{{
@@ -294,8 +294,8 @@ class RemapMpasOHCClimatology(RemapMpasClimatologySubtask):  # {{{
         Compute the OHC from the temperature and layer thicknesses in a given
         climatology data sets.
         """
-        dsRestart = xarray.open_dataset(self.restartFileName)
-        dsRestart = dsRestart.isel(Time=0)
+        dsVertical = get_vertical_mesh_variables(self.config,
+                                                 self.restartFileName)
 
         # specific heat [J/(kg*degC)]
         cp = self.namelist.getfloat('config_specific_heat_sea_water')
@@ -304,18 +304,12 @@ class RemapMpasOHCClimatology(RemapMpasClimatologySubtask):  # {{{
 
         unitsScalefactor = 1e-9
 
-        nVertLevels = dsRestart.sizes['nVertLevels']
-
-        zMid = compute_zmid(dsRestart.bottomDepth, dsRestart.maxLevelCell,
-                            dsRestart.layerThickness)
-
-        vertIndex = xarray.DataArray.from_dict(
-                {'dims': ('nVertLevels',), 'data': numpy.arange(nVertLevels)})
+        zMid = dsVertical.zMid
 
         temperature = climatology['timeMonthly_avg_activeTracers_temperature']
         layerThickness = climatology['timeMonthly_avg_layerThickness']
 
-        masks = [vertIndex < dsRestart.maxLevelCell,
+        masks = [dsVertical.cellMask,
                  zMid <= self.minDepth,
                  zMid >= self.maxDepth]
         for mask in masks:
@@ -163,6 +163,16 @@ class ComputeAnomalySubtask(AnalysisTask):
             anomalyYear = int(anomalyRefDate[0:4])
             anomalyEndDate = '{:04d}-12-31_23:59:59'.format(anomalyYear)
 
+        outFileName = self.outFileName
+        if not os.path.isabs(outFileName):
+            baseDirectory = build_config_full_path(
+                config, 'output', 'timeSeriesSubdirectory')
+
+            outFileName = '{}/{}'.format(baseDirectory,
+                                         outFileName)
+
+        # if the anomaly has been computed before, only the moving average for
+        # new times gets computed
         ds = compute_moving_avg_anomaly_from_start(
                 timeSeriesFileName=self.inputFile,
                 variableList=self.variableList,
@@ -172,15 +182,8 @@ class ComputeAnomalySubtask(AnalysisTask):
                 endDate=endDate,
                 calendar=self.calendar,
                 movingAveragePoints=self.movingAveragePoints,
-                alter_dataset=self.alter_dataset)
-
-        outFileName = self.outFileName
-        if not os.path.isabs(outFileName):
-            baseDirectory = build_config_full_path(
-                config, 'output', 'timeSeriesSubdirectory')
-
-            outFileName = '{}/{}'.format(baseDirectory,
-                                         outFileName)
+                alter_dataset=self.alter_dataset,
+                previousFileName=outFileName)
 
         write_netcdf(ds, outFileName)  # }}}
 
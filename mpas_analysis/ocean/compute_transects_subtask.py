@@ -18,17 +18,16 @@ from collections import OrderedDict
 
 from mpas_analysis.shared.climatology import RemapMpasClimatologySubtask
 
-from mpas_analysis.shared.mpas_xarray import mpas_xarray
-
 from mpas_analysis.shared.grid import PointCollectionDescriptor
 
 from mpas_analysis.shared.io.utility import build_config_full_path, \
     make_directories
 from mpas_analysis.shared.io import write_netcdf
 
-from mpas_analysis.ocean.utility import compute_zmid
+from mpas_analysis.ocean.utility import get_vertical_mesh_variables
 
-from mpas_analysis.shared.interpolation import interp_1d
+from mpas_analysis.shared.interpolation import interp_1d, \
+    compute_interp_1d_weights
 
 
 class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
@@ -68,18 +67,22 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
         The mesh descriptor for the collection of all points in all transects,
         used for remapping
 
-    zMid : ``xarray.DataArray``
-        Vertical coordinate at the center of layers, used to interpolate to
-        reference depths
+    cellMask : ``xarray.DataArray``
+        A mask of the valid layers in each cell, used to mask the climatology
+        below the bathymetry (set by ``remapTransectsTask`` before masking)
+
+    remapTransectsTask : ``RemapTransectsTask``
+        The task that remaps the climatology to the points of this and all
+        other transect collections at once
     """
     # Authors
     # -------
     # Xylar Asay-Davis
 
-    def __init__(self, mpasClimatologyTask, parentTask, climatologyName,
-                 transectCollectionName, variableList, seasons, obsDatasets,
-                 verticalComparisonGridName='obs', verticalComparisonGrid=None,
-                 subtaskName='remapTransects'):
+    def __init__(self, mpasClimatologyTask, remapTransectsTask, parentTask,
+                 climatologyName, transectCollectionName, variableList,
+                 seasons, obsDatasets, verticalComparisonGridName='obs',
+                 verticalComparisonGrid=None, subtaskName='remapTransects'):
 
         # {{{
         '''
@@ -92,6 +95,10 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
             The task that produced a climatology to be remapped and plotted
             as a transect
 
+        remapTransectsTask : ``RemapTransectsTask``
+            The task that remaps the climatology to the points of all transect
+            collections at once
+
         parentTask :  ``AnalysisTask``
             The parent task, used to get the ``taskName``, ``config`` and
             ``componentName``
@@ -150,6 +157,9 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
         self.verticalComparisonGridName = verticalComparisonGridName
         self.verticalComparisonGrid = verticalComparisonGrid
 
+        self.remapTransectsTask = remapTransectsTask
+        self.run_after(remapTransectsTask)
+
         # }}}
 
     def setup_and_check(self):  # {{{
@@ -204,63 +214,68 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
         # (RemapMpasClimatologySubtask)
         super(ComputeTransectsSubtask, self).setup_and_check()
 
+        # the horizontal remapping is performed for all transect collections
+        # at once
+        self.remapTransectsTask.add_transects(self)
+
         for transectName in obsDatasets:
             obsDatasets[transectName].close()
 
     def run_task(self):  # {{{
         '''
-        Compute climatologies of melt rates from E3SM/MPAS output
+        Vertically interpolate the climatologies on each transect
 
-        This function has been overridden to compute  ``zMid`` based on data
-        from a restart file for later use in vertically interpolating to
+        This function has been overridden because the horizontal remapping
+        has already been performed by ``remapTransectsTask`` for all transect
+        collections at once.  ``zMid`` from the mesh cache is remapped to the
+        transect points only once for use in vertically interpolating to
         reference depths.
         '''
         # Authors
         # -------
         # Xylar Asay-Davis
 
-        # first, compute zMid and cell mask from the restart file
-        with xr.open_dataset(self.restartFileName) as ds:
-            ds = mpas_xarray.subset_variables(ds, ['maxLevelCell',
-                                                   'bottomDepth',
-                                                   'layerThickness'])
-            ds = ds.isel(Time=0)
+        # first, get zMid, computed from the restart file once per mesh
+        dsVertical = get_vertical_mesh_variables(self.config,
+                                                 self.restartFileName)
 
-            self.maxLevelCell = ds.maxLevelCell - 1
-
-            zMid = compute_zmid(ds.bottomDepth, ds.maxLevelCell,
-                                ds.layerThickness)
-
-            self.zMid = \
-                xr.DataArray.from_dict({'dims': ('nCells', 'nVertLevels'),
-                                        'data': zMid})
-            ds.close()
-
-        # then, call run from the base class (RemapMpasClimatologySubtask),
-        # which will perform the horizontal remapping
-        super(ComputeTransectsSubtask, self).run_task()
+        # zMid is the same for all seasons, so it is remapped only once
+        zMid = self._remap_zmid(dsVertical)
 
         obsDatasets = self.obsDatasets.get_observations()
+        transectNames = list(obsDatasets.keys())
 
-        self.logger.info('Interpolating each transect vertically...')
-        # finally, vertically interpolate and write out each transect
+        self.logger.info('Interpolating transects vertically...')
+        # finally, vertically interpolate all transects at once and write out
+        # each transect.  zMid and the comparison grid are the same for all
+        # seasons, so the interpolation weights are computed only once.
+        weights = None
         for season in self.seasons:
 
+            outFileNames = [self.get_remapped_file_name(
+                season, comparisonGridName=transectName)
+                for transectName in transectNames]
+            if all([os.path.exists(outFileName) for outFileName in
+                    outFileNames]):
+                continue
+
             remappedFileName = self.get_remapped_file_name(
                     season, comparisonGridName=self.transectCollectionName)
 
             with xr.open_dataset(remappedFileName) as ds:
-                transectNames = list(obsDatasets.keys())
+                ds['zMid'] = (zMid.dims, zMid.values)
+                ds, weights = self._vertical_interp(ds, obsDatasets, weights)
+
                 for transectIndex, transectName in enumerate(transectNames):
-                    self.logger.info('  {}'.format(transectName))
+                    if os.path.exists(outFileNames[transectIndex]):
+                        continue
+                    self.logger.info('  {} {}'.format(season, transectName))
                     dsObs = obsDatasets[transectName]
-                    outFileName = self.get_remapped_file_name(
-                            season, comparisonGridName=transectName)
                     outObsFileName = self.obsDatasets.get_out_file_name(
                             transectName, self.verticalComparisonGridName)
-                    self._vertical_interp(ds, transectIndex, dsObs,
-                                          outFileName, outObsFileName)
-                ds.close()
+                    self._write_transect(ds, transectIndex, dsObs,
+                                         outFileNames[transectIndex],
+                                         outObsFileName)
 
         for transectName in obsDatasets:
             obsDatasets[transectName].close()
@@ -269,7 +284,7 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
 
     def customize_masked_climatology(self, climatology, season):  # {{{
         '''
-        Add zMid to the climatologys
+        Mask the climatology below the bathymetry
 
         Parameters
         ----------
@@ -288,17 +303,9 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
         # -------
         # Xylar Asay-Davis
 
-        zIndex = xr.DataArray.from_dict(
-                {'dims': ('nVertLevels',),
-                 'data': numpy.arange(climatology.sizes['nVertLevels'])})
-
-        cellMask = zIndex < self.maxLevelCell
-
         for variableName in self.variableList:
             climatology[variableName] = \
-                climatology[variableName].where(cellMask)
-
-        climatology['zMid'] = self.zMid
+                climatology[variableName].where(self.cellMask)
 
         return climatology  # }}}
 
@@ -334,21 +341,126 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
 
         return climatology  # }}}
 
-    def _vertical_interp(self, ds, transectIndex, dsObs, outFileName,
-                         outObsFileName):
+    def _remap_zmid(self, dsVertical):  # {{{
+        '''
+        Remap zMid to the transect points, or read it from a previous run
+
+        Parameters
+        ----------
+        dsVertical : ``xarray.Dataset``
+            A data set containing ``zMid`` on the MPAS mesh
+
+        Returns
+        -------
+        zMid : ``xarray.DataArray``
+            ``zMid`` remapped to the points in all transects
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        remappedDirectory = os.path.dirname(self.get_remapped_file_name(
+            self.seasons[0], comparisonGridName=self.transectCollectionName))
+        outFileName = '{}/zMid.nc'.format(remappedDirectory)
+
+        if not os.path.exists(outFileName):
+            ds = xr.Dataset()
+            ds['zMid'] = (dsVertical.zMid.dims, dsVertical.zMid.values)
+            remapper = self.remappers[self.transectCollectionName]
+            if remapper.mappingFileName is not None:
+                renormalizationThreshold = self.config.getfloat(
+                    'climatology', 'renormalizationThreshold')
+                ds = remapper.remap(ds, renormalizationThreshold)
+            write_netcdf(ds, outFileName)
+
+        with xr.open_dataset(outFileName) as ds:
+            zMid = ds.zMid.load()
+
+        return zMid  # }}}
+
+    def _vertical_interp(self, ds, obsDatasets, weights=None):  # {{{
         '''
-        Vertically interpolate a transect and write it to a unique file
+        Vertically interpolate all transects at once
 
         Parameters
         ----------
         ds : ``xarray.Dataset``
             The data set containing all transects before vertical interpolation
 
+        obsDatasets : OrderedDict
+            The obs datasets, whose depths are used if
+            verticalComparisonGridName is 'obs'
+
+        weights : tuple, optional
+            Interpolation weights from a previous call (e.g. for another
+            season) to reuse
+
+        Returns
+        -------
+        ds : ``xarray.Dataset``
+            The data set containing all transects after vertical interpolation,
+            with vertical dimension ``nz``.  If verticalComparisonGridName is
+            'obs', transects with fewer depths than others are padded with
+            NaNs.
+
+        weights : tuple
+            The interpolation weights (or ``None`` if no interpolation was
+            needed)
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if self.verticalComparisonGridName == 'mpas':
+            ds = ds.rename({'zMid': 'z', 'nVertLevels': 'nz'})
+            return ds, None
+
+        if self.verticalComparisonGridName == 'obs':
+            # the depths of the obs for each point in each transect, padded
+            # with NaNs to the largest number of obs depths
+            transectNumber = ds.transectNumber.values
+            nzOut = max([dsObs.sizes['nz'] for dsObs in obsDatasets.values()])
+            z = numpy.nan*numpy.ones((ds.sizes['nPoints'], nzOut))
+            for transectIndex, dsObs in enumerate(obsDatasets.values()):
+                zObs = dsObs.z
+                if 'nPoints' in zObs.dims:
+                    zObs = zObs.transpose('nPoints', 'nz')
+                z[transectNumber == transectIndex, 0:dsObs.sizes['nz']] = \
+                    zObs.values
+            ds['z'] = (('nPoints', 'nzOut'), z)
+        else:
+            # a defined vertical grid
+            ds['z'] = (('nzOut', ), self.verticalComparisonGrid)
+
+        if weights is None:
+            weights = compute_interp_1d_weights(
+                ds, inInterpDim='nVertLevels', inInterpCoord='zMid',
+                outInterpDim='nzOut', outInterpCoord='z')
+
+        # remap each variable
+        ds = interp_1d(ds, inInterpDim='nVertLevels', inInterpCoord='zMid',
+                       outInterpDim='nzOut', outInterpCoord='z',
+                       weights=weights)
+        ds = ds.rename({'nzOut': 'nz'})
+
+        return ds, weights  # }}}
+
+    def _write_transect(self, ds, transectIndex, dsObs, outFileName,
+                        outObsFileName):  # {{{
+        '''
+        Extract a vertically interpolated transect and write it to a unique
+        file, vertically interpolating the obs if needed
+
+        Parameters
+        ----------
+        ds : ``xarray.Dataset``
+            The data set containing all transects after vertical interpolation
+
         transectIndex : int
             The index of the transect to extract
 
         dsObs : ``xarray.Dataset``
-            The obs dataset used if verticalComparisonGridName is 'obs'
+            The obs dataset for this transect
 
         outFileName : str
             The name of the file to which the resulting data set should be
@@ -362,35 +474,25 @@ class ComputeTransectsSubtask(RemapMpasClimatologySubtask):  # {{{
         # -------
         # Xylar Asay-Davis
 
-        if os.path.exists(outFileName):
-            return
+        pointIndices = numpy.nonzero(ds.transectNumber.values ==
+                                     transectIndex)[0]
+        ds = ds.isel(nPoints=pointIndices)
 
-        ds = ds.where(ds.transectNumber == transectIndex, drop=True)
+        if self.verticalComparisonGridName == 'obs':
+            # remove the padding and go back to the obs depths
+            ds = ds.isel(nz=slice(0, dsObs.sizes['nz']))
+            ds['z'] = dsObs.z
 
-        if self.verticalComparisonGridName == 'mpas':
-            z = ds.zMid
-            z = z.rename({'nVertLevels': 'nzOut'})
-        elif self.verticalComparisonGridName == 'obs':
-            z = dsObs.z
-            z = z.rename({'nz': 'nzOut'})
-        else:
-            # a defined vertical grid
-            z = (('nzOut', ), self.verticalComparisonGrid)
-
-        if self.verticalComparisonGridName == 'mpas':
-            ds = ds.rename({'zMid': 'z', 'nVertLevels': 'nz'})
-        else:
-            ds['z'] = z
-            # remap each variable
-            ds = interp_1d(ds, inInterpDim='nVertLevels', inInterpCoord='zMid',
-                           outInterpDim='nzOut',  outInterpCoord='z')
-            ds = ds.rename({'nzOut': 'nz'})
-
-        if self.verticalComparisonGridName != 'obs' and 'nz' in dsObs.dims:
+        if self.verticalComparisonGridName != 'obs' and 'nz' in dsObs.dims \
+                and not os.path.exists(outObsFileName):
+            if self.verticalComparisonGridName == 'mpas':
+                z = ds.z.rename({'nz': 'nzOut'})
+            else:
+                z = (('nzOut', ), self.verticalComparisonGrid)
             dsObs['zOut'] = z
             # remap each variable
             dsObs = interp_1d(dsObs, inInterpDim='nz', inInterpCoord='z',
-                              outInterpDim='nzOut',  outInterpCoord='zOut')
+                              outInterpDim='nzOut', outInterpCoord='zOut')
             dsObs = dsObs.rename({'nzOut': 'nz'})
             write_netcdf(dsObs, outObsFileName)
 
@@ -602,7 +704,8 @@ class TransectsObservations(object):  # {{{
     def _subdivide_observations(self, dsObs):  # {{{
         '''
         Subdivide each segment of the transect so the horizontal resolution
-        approximately matches the requested resolution
+        approximately matches the requested resolution.  New points are
+        placed along the great circle between the original points.
         '''
 
         lat = dsObs.lat.values
@@ -617,14 +720,20 @@ class TransectsObservations(object):  # {{{
         xIn = numpy.zeros(lat.shape)
         xIn[1:] = numpy.cumsum(dxIn)
 
-        outIndex = []
-        for index in range(len(xIn)-1):
-            n = nSegments[index]
-            outIndex.extend(index + numpy.arange(0, n)/n)
-        outIndex.append(len(xIn)-1)
+        # the index of the original segment each new point is on and the
+        # fraction of the way along that segment
+        segmentIndices = numpy.repeat(numpy.arange(len(nSegments)), nSegments)
+        firstIndices = numpy.cumsum(nSegments) - nSegments
+        fractions = (numpy.arange(len(segmentIndices)) -
+                     firstIndices[segmentIndices]) / nSegments[segmentIndices]
+
+        outIndex = numpy.append(segmentIndices + fractions, len(xIn)-1)
 
         xOut = numpy.interp(outIndex, numpy.arange(len(xIn)), xIn)
 
+        latOut, lonOut = self._great_circle_points(lon, lat, segmentIndices,
+                                                   fractions)
+
         dsObs['xIn'] = (('nPoints',), xIn)
         dsObs['xOut'] = (('nPointsOut',), xOut)
 
@@ -634,8 +743,54 @@ class TransectsObservations(object):  # {{{
                           outInterpCoord='xOut')
         dsObs = dsObs.drop(['xIn'])
         dsObs = dsObs.rename({'nPointsOut': 'nPoints', 'xOut': 'x'})
+        dsObs.coords['lat'] = ('nPoints', latOut)
+        dsObs.coords['lon'] = ('nPoints', lonOut)
         return dsObs  # }}}
 
+    def _great_circle_points(self, lon, lat, segmentIndices,
+                             fractions):  # {{{
+        '''
+        Find points a given fraction of the way along the great circles
+        between consecutive transect points (in degrees), followed by the last
+        transect point
+        '''
+
+        lonRad = numpy.deg2rad(lon)
+        latRad = numpy.deg2rad(lat)
+        points = numpy.array([numpy.cos(latRad)*numpy.cos(lonRad),
+                              numpy.cos(latRad)*numpy.sin(lonRad),
+                              numpy.sin(latRad)]).T
+
+        point0 = points[segmentIndices, :]
+        point1 = points[segmentIndices+1, :]
+        angle = numpy.arccos(numpy.clip(numpy.sum(point0*point1, axis=1),
+                                        -1., 1.))
+        sinAngle = numpy.sin(angle)
+
+        # spherical linear interpolation, except where the points coincide
+        valid = sinAngle > 1e-12
+        weight0 = 1. - fractions
+        weight1 = numpy.array(fractions)
+        weight0[valid] = numpy.sin((1. - fractions[valid])*angle[valid]) / \
+            sinAngle[valid]
+        weight1[valid] = numpy.sin(fractions[valid]*angle[valid]) / \
+            sinAngle[valid]
+        pointsOut = weight0[:, numpy.newaxis]*point0 + \
+            weight1[:, numpy.newaxis]*point1
+
+        latOut = numpy.rad2deg(numpy.arcsin(numpy.clip(pointsOut[:, 2],
+                                                       -1., 1.)))
+        lonOut = numpy.rad2deg(numpy.arctan2(pointsOut[:, 1],
+                                             pointsOut[:, 0]))
+
+        # keep longitudes in the same range as the start of each segment
+        lon0 = lon[segmentIndices]
+        lonOut = lon0 + numpy.mod(lonOut - lon0 + 180., 360.) - 180.
+
+        latOut = numpy.append(latOut, lat[-1])
+        lonOut = numpy.append(lonOut, lon[-1])
+        return latOut, lonOut  # }}}
+
     def _haversine(self, lon1, lat1, lon2, lat2):  # {{{
         """
         Calculate the great circle distance in km between two points on the
@@ -30,7 +30,7 @@ from mpas_analysis.shared.timekeeping.utility import datetime_to_days, \
 
 from mpas_analysis.shared.io import open_mpas_dataset
 
-from mpas_analysis.shared.plot.plotting import plot_xtick_format
+from mpas_analysis.shared.plot.plotting import plot_xtick_format, savefig
 
 from mpas_analysis.shared import AnalysisTask
 from mpas_analysis.shared.html import write_image_xml
@@ -585,8 +585,7 @@ class IndexNino34(AnalysisTask):  # {{{
         plt.tight_layout(rect=[0, 0.03, 1, 0.90])
 
         if outFileName is not None:
-            fig.savefig(outFileName, dpi=dpi, bbox_inches='tight',
-                        pad_inches=0.1)
+            savefig(outFileName, config, dpi=dpi, fig=fig)
 
         plt.close()
         # }}}
@@ -666,8 +665,7 @@ class IndexNino34(AnalysisTask):  # {{{
         plt.tight_layout(rect=[0, 0.03, 1, 0.90])
 
         if outFileName is not None:
-            plt.savefig(outFileName, dpi=dpi, bbox_inches='tight',
-                        pad_inches=0.1)
+            savefig(outFileName, config, dpi=dpi)
 
         plt.close()
         # }}}
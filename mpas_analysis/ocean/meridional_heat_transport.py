@@ -24,11 +24,15 @@ from mpas_analysis.shared.io import write_netcdf, subset_variables
 
 from mpas_analysis.shared import AnalysisTask
 from mpas_analysis.shared.html import write_image_xml
+from mpas_analysis.shared.mesh import get_mesh_variables, \
+    get_mesh_operator, get_global_lat_bin_operator, \
+    build_edge_divergence_operator
 
 
 class MeridionalHeatTransport(AnalysisTask):  # {{{
     '''
-    Plot meridional heat transport from the analysis member output.
+    Plot meridional heat transport from the analysis member output or
+    computed as a post-process from the temperature and velocity climatology.
 
     Attributes
     ----------
@@ -98,12 +102,19 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
 
         config = self.config
 
-        self.check_analysis_enabled(
+        mhtAnalysisMemberEnabled = self.check_analysis_enabled(
             analysisOptionName='config_am_meridionalheattransport_enable',
-            raiseException=True)
+            raiseException=False)
 
         self.sectionName = 'meridionalHeatTransport'
 
+        self.usePostprocessing = config.getboolean(self.sectionName,
+                                                   'usePostprocessingScript')
+        if not mhtAnalysisMemberEnabled and not self.usePostprocessing:
+            print('Warning: the meridional heat transport analysis member is '
+                  'disabled so MHT will be computed as a post-process')
+            self.usePostprocessing = True
+
         # Read in obs file information
         compareWithObs = config.getboolean(self.sectionName,
                                            'compareWithObservations')
@@ -122,8 +133,17 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
 
         mainRunName = self.config.get('runs', 'mainRunName')
 
-        variableList = ['timeMonthly_avg_meridionalHeatTransportLat',
-                        'timeMonthly_avg_meridionalHeatTransportLatZ']
+        if self.usePostprocessing:
+            variableList = ['timeMonthly_avg_normalVelocity',
+                            'timeMonthly_avg_activeTracers_temperature',
+                            'timeMonthly_avg_layerThickness']
+            # heat is also transported by the bolus velocity if GM is enabled
+            self.includeBolus = self.namelist.getbool('config_use_standardgm')
+            if self.includeBolus:
+                variableList.append('timeMonthly_avg_normalGMBolusVelocity')
+        else:
+            variableList = ['timeMonthly_avg_meridionalHeatTransportLat',
+                            'timeMonthly_avg_meridionalHeatTransportLatZ']
 
         self.mpasClimatologyTask.add_variables(variableList=variableList,
                                                seasons=['ANN'])
@@ -147,7 +167,8 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
 
     def run_task(self):  # {{{
         """
-        Process MHT analysis member data if available.
+        Process MHT analysis member data if available, or compute MHT as a
+        post-process otherwise.
         Plots MHT as:
            1D function of latitude
            2D function of latitude and depth
@@ -177,33 +198,47 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
             '{}/meridionalHeatTransport_years{:04d}-{:04d}.nc'.format(
                 outputDirectory, self.startYear, self.endYear)
 
+        # Read in depth
+        try:
+            restartFileName = self.runStreams.readpath('restart')[0]
+        except ValueError:
+            raise IOError('No MPAS-O restart file found: need at least '
+                          'one for MHT calcuation')
+
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['refBottomDepth'])
+        refBottomDepth = dsMesh.refBottomDepth.values
+
+        nVertLevels = len(refBottomDepth)
+        refLayerThickness = np.zeros(nVertLevels)
+        refLayerThickness[0] = refBottomDepth[0]
+        refLayerThickness[1:nVertLevels] = \
+            refBottomDepth[1:nVertLevels] - refBottomDepth[0:nVertLevels-1]
+
         if os.path.exists(outFileName):
             self.logger.info('  Reading results from previous analysis run...')
             annualClimatology = xr.open_dataset(outFileName)
             refZMid = annualClimatology.refZMid.values
             binBoundaryMerHeatTrans = \
                 annualClimatology.binBoundaryMerHeatTrans.values
-        else:
+        elif self.usePostprocessing:
+            self.logger.info('\n   Computing global meridional heat '
+                             'transport as a post-process')
 
-            # Read in depth and MHT latitude points
-            # Latitude is from binBoundaryMerHeatTrans
-            try:
-                restartFileName = self.runStreams.readpath('restart')[0]
-            except ValueError:
-                raise IOError('No MPAS-O restart file found: need at least '
-                              'one for MHT calcuation')
+            refZMid = -refBottomDepth + 0.5*refLayerThickness
 
-            with xr.open_dataset(restartFileName) as dsRestart:
-                refBottomDepth = dsRestart.refBottomDepth.values
+            annualClimatology, binBoundaryMerHeatTrans = \
+                self._compute_mht_postprocess(restartFileName)
 
-            nVertLevels = len(refBottomDepth)
-            refLayerThickness = np.zeros(nVertLevels)
-            refLayerThickness[0] = refBottomDepth[0]
-            refLayerThickness[1:nVertLevels] = \
-                refBottomDepth[1:nVertLevels] - refBottomDepth[0:nVertLevels-1]
+            annualClimatology.coords['refZMid'] = (('nVertLevels',), refZMid)
+            annualClimatology.coords['binBoundaryMerHeatTrans'] = \
+                (('nMerHeatTransBinsP1',), binBoundaryMerHeatTrans)
 
+            write_netcdf(annualClimatology, outFileName)
+        else:
             refZMid = -refBottomDepth + 0.5*refLayerThickness
 
+            # Read in MHT latitude points from binBoundaryMerHeatTrans
             binBoundaryMerHeatTrans = None
             # first try timeSeriesStatsMonthly for bin boundaries, then try
             # meridionalHeatTransport stream as a backup option
@@ -331,9 +366,7 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
             # normalize 2D MHT by layer thickness
             MHTLatZVar = \
                 annualClimatology.timeMonthly_avg_meridionalHeatTransportLatZ
-            MHTLatZ = MHTLatZVar.values.T[:, :]
-            for k in range(nVertLevels):
-                MHTLatZ[k, :] = MHTLatZ[k, :]/refLayerThickness[k]
+            MHTLatZ = MHTLatZVar.values.T/refLayerThickness[:, np.newaxis]
 
             x = binBoundaryMerHeatTrans
             y = refZMid
@@ -356,6 +389,116 @@ class MeridionalHeatTransport(AnalysisTask):  # {{{
 
         # }}}
 
+    def _compute_mht_postprocess(self, restartFileName):  # {{{
+        """
+        Compute the MHT from the climatology of the heat flux on edges,
+        summing its divergence over cells in latitude bins with a sparse
+        operator that is cached with the mesh.
+
+        Parameters
+        ----------
+        restartFileName : str
+            The name of an MPAS restart file with the mesh
+
+        Returns
+        -------
+        annualClimatology : ``xarray.Dataset``
+            A data set with the depth-integrated MHT and the MHT in each
+            layer in the same form as the analysis member output
+
+        binBoundaryMerHeatTrans : ``numpy.ndarray``
+            The boundaries of the latitude bins in degrees
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        config = self.config
+
+        latBinSize = config.getExpression(self.sectionName, 'latBinSize')
+
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['cellsOnEdge', 'maxLevelEdgeTop'])
+        # subtract 1 because of python 0-indexing
+        cellsOnEdge = dsMesh.cellsOnEdge.values - 1
+        maxLevelEdgeTop = dsMesh.maxLevelEdgeTop.values
+
+        # the latitude-bin operator is shared with the global MOC
+        binBoundaryMerHeatTrans, latBinOperator = \
+            get_global_lat_bin_operator(config, restartFileName, latBinSize)
+
+        def build_operator():
+            dsOperatorMesh = get_mesh_variables(
+                config, restartFileName, ['cellsOnEdge', 'dvEdge',
+                                          'areaCell'])
+            divergenceOperator = build_edge_divergence_operator(
+                dsOperatorMesh.cellsOnEdge.values,
+                dsOperatorMesh.dvEdge.values,
+                dsOperatorMesh.areaCell.values)
+            return latBinOperator.dot(divergenceOperator)
+
+        # sums the net flux out of the cells in each bin
+        edgeLatBinOperator = get_mesh_operator(
+            config, restartFileName,
+            'mhtEdgeLatBinOperator_{}deg'.format(repr(float(latBinSize))),
+            build_operator)
+
+        self.logger.info('   Load data...')
+
+        climatologyFileName = self.mpasClimatologyTask.get_file_name(
+            season='ANN')
+
+        with xr.open_dataset(climatologyFileName) as ds:
+            ds = ds.isel(Time=0)
+            normalVelocity = ds.timeMonthly_avg_normalVelocity.values
+            if self.includeBolus:
+                normalVelocity = normalVelocity + \
+                    ds.timeMonthly_avg_normalGMBolusVelocity.values
+            temperature = ds.timeMonthly_avg_activeTracers_temperature.values
+            layerThickness = ds.timeMonthly_avg_layerThickness.values
+
+        nVertLevels = normalVelocity.shape[1]
+
+        # boundary edges use the values from their one valid cell
+        cell0 = np.where(cellsOnEdge[:, 0] >= 0, cellsOnEdge[:, 0],
+                         cellsOnEdge[:, 1])
+        cell1 = np.where(cellsOnEdge[:, 1] >= 0, cellsOnEdge[:, 1],
+                         cellsOnEdge[:, 0])
+
+        temperatureEdge = 0.5*(temperature[cell0, :] + temperature[cell1, :])
+        layerThicknessEdge = 0.5*(layerThickness[cell0, :] +
+                                  layerThickness[cell1, :])
+
+        edgeMask = np.arange(nVertLevels)[np.newaxis, :] < \
+            maxLevelEdgeTop[:, np.newaxis]
+
+        heatFlux = np.where(edgeMask,
+                            layerThicknessEdge*normalVelocity*temperatureEdge,
+                            0.)
+
+        self.logger.info('   Compute global MHT...')
+
+        # the MHT across each latitude is the net heat flux out of the ocean
+        # to the south of it
+        binSums = edgeLatBinOperator.dot(heatFlux)
+        mhtLatZ = np.zeros((binSums.shape[0]+1, nVertLevels))
+        mhtLatZ[1:, :] = np.cumsum(binSums, axis=0)
+
+        # convert to PW
+        cp = self.namelist.getfloat('config_specific_heat_sea_water')
+        rho = self.namelist.getfloat('config_density0')
+        mhtLatZ = 1e-15*rho*cp*mhtLatZ
+
+        annualClimatology = xr.Dataset()
+        annualClimatology['timeMonthly_avg_meridionalHeatTransportLat'] = \
+            (('nMerHeatTransBinsP1',), mhtLatZ.sum(axis=1))
+        annualClimatology['timeMonthly_avg_meridionalHeatTransportLatZ'] = \
+            (('nMerHeatTransBinsP1', 'nVertLevels'), mhtLatZ)
+        for variableName in annualClimatology.data_vars:
+            annualClimatology[variableName].attrs['units'] = 'PW'
+
+        return annualClimatology, binBoundaryMerHeatTrans  # }}}
+
     def _write_xml(self, filePrefix):  # {{{
         caption = 'Meridional Heat Transport'
         write_image_xml(
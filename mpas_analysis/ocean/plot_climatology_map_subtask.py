@@ -25,12 +25,14 @@ import numpy as np
 from mpas_analysis.shared import AnalysisTask
 
 from mpas_analysis.shared.plot.plotting import plot_global_comparison, \
-    plot_polar_projection_comparison
+    plot_polar_projection_comparison, plot_native_mesh
 
 from mpas_analysis.shared.html import write_image_xml
 
 from mpas_analysis.shared.grid import interp_extrap_corner
 
+from mpas_analysis.shared.mesh import get_mesh_rasterizer
+
 from mpas_analysis.shared.climatology import \
     get_remapped_mpas_climatology_file_name
 
@@ -114,6 +116,9 @@ class PlotClimatologyMapSubtask(AnalysisTask):  # {{{
     # -------
     # Luke Van Roekel, Xylar Asay-Davis, Milena Veneziani
 
+    # this task only plots files written by other tasks
+    plotOnly = True
+
     def __init__(self, parentTask, season, comparisonGridName,
                  remapMpasClimatologySubtask, remapObsClimatologySubtask=None,
                  refConfig=None, depth=None, removeMean=False,
@@ -332,6 +337,16 @@ class PlotClimatologyMapSubtask(AnalysisTask):  # {{{
 
         self.xmlFileNames.append('{}/{}.xml'.format(self.plotsDirectory,
                                                     self.filePrefix))
+
+        # optionally, also plot the model results on the native mesh,
+        # without remapping
+        self.plotNativeMesh = \
+            self.comparisonGridName == 'latlon' and \
+            config.getWithDefault(self.configSectionName, 'plotNativeMesh',
+                                  False)
+        if self.plotNativeMesh:
+            self.xmlFileNames.append('{}/{}_native.xml'.format(
+                self.plotsDirectory, self.filePrefix))
         # }}}
 
     def run_task(self):  # {{{
@@ -420,6 +435,9 @@ class PlotClimatologyMapSubtask(AnalysisTask):  # {{{
                     remappedRefClimatology[self.refFieldName] - \
                     masked.mean()
 
+        if self.plotNativeMesh:
+            self._plot_native_mesh()
+
         if self.comparisonGridName == 'latlon':
             self._plot_latlon(remappedModelClimatology, remappedRefClimatology)
         elif self.comparisonGridName == 'antarctic':
@@ -489,6 +507,60 @@ class PlotClimatologyMapSubtask(AnalysisTask):  # {{{
 
         # }}}
 
+    def _plot_native_mesh(self):  # {{{
+        """ plotting the model climatology on the native MPAS mesh """
+
+        season = self.season
+        depth = self.depth
+        config = self.config
+        configSectionName = self.configSectionName
+
+        maskedFileName = \
+            self.remapMpasClimatologySubtask.get_masked_file_name(season)
+        maskedModelClimatology = xr.open_dataset(maskedFileName)
+
+        if depth is not None:
+            maskedModelClimatology = maskedModelClimatology.sel(
+                    depthSlice=str(depth), drop=True)
+
+        field = maskedModelClimatology[self.mpasFieldName].values
+        if self.removeMean:
+            field = field - np.nanmean(field)
+
+        rasterizer = get_mesh_rasterizer(
+            config, self.remapMpasClimatologySubtask.restartFileName)
+
+        bounds = config.getWithDefault(configSectionName, 'nativeMeshBounds',
+                                       [-180., 180., -90., 90.])
+
+        filePrefix = '{}_native'.format(self.filePrefix)
+        outFileName = '{}/{}.png'.format(self.plotsDirectory, filePrefix)
+        title = '{} ({}, years {:04d}-{:04d}, native mesh)'.format(
+                self.fieldNameInTitle, season, self.startYear,
+                self.endYear)
+
+        plot_native_mesh(config, rasterizer, field, outFileName,
+                         configSectionName, bounds, title=title,
+                         cbarlabel=self.unitsLabel)
+
+        caption = '{} {} on the native mesh'.format(season,
+                                                     self.imageCaption)
+        write_image_xml(
+            config,
+            filePrefix,
+            componentName='Ocean',
+            componentSubdirectory='ocean',
+            galleryGroup='Global {}'.format(self.galleryGroup),
+            groupSubtitle=self.groupSubtitle,
+            groupLink=self.groupLink,
+            gallery=self.galleryName,
+            thumbnailDescription='{} native'.format(
+                self.thumbnailDescription),
+            imageDescription=caption,
+            imageCaption=caption)
+
+        # }}}
+
     def _plot_antarctic(self, remappedModelClimatology,
                         remappedRefClimatology):  # {{{
         """ plotting an Antarctic data set """
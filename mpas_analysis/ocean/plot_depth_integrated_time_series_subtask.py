@@ -92,6 +92,9 @@ class PlotDepthIntegratedTimeSeriesSubtask(AnalysisTask):
     # -------
     # Xylar Asay-Davis, Milena Veneziani, Greg Streletz
 
+    # this task only plots files written by other tasks
+    plotOnly = True
+
     def __init__(self, parentTask, regionName, inFileName, outFileLabel,
                  fieldNameInTitle, mpasFieldName, yAxisLabel, sectionName,
                  thumbnailSuffix, imageCaption, galleryGroup, groupSubtitle,
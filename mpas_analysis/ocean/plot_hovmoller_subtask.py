@@ -14,7 +14,6 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
-import xarray as xr
 import os
 
 from mpas_analysis.shared import AnalysisTask
@@ -27,6 +26,8 @@ from mpas_analysis.shared.io.utility import build_config_full_path
 
 from mpas_analysis.shared.html import write_image_xml
 
+from mpas_analysis.shared.mesh import get_mesh_variables
+
 
 class PlotHovmollerSubtask(AnalysisTask):
     """
@@ -83,6 +84,9 @@ class PlotHovmollerSubtask(AnalysisTask):
     # -------
     # Xylar Asay-Davis, Milena Veneziani, Greg Streletz
 
+    # this task only plots files written by other tasks
+    plotOnly = True
+
     def __init__(self, parentTask, regionName, inFileName, outFileLabel,
                  fieldNameInTitle, mpasFieldName, unitsLabel, sectionName,
                  thumbnailSuffix, imageCaption, galleryGroup, groupSubtitle,
@@ -252,9 +256,9 @@ class PlotHovmollerSubtask(AnalysisTask):
 
         # Define/read in general variables
         self.logger.info('  Read in depth...')
-        with xr.open_dataset(restartFile) as dsRestart:
-            # reference depth [m]
-            depth = dsRestart.refBottomDepth.values
+        dsMesh = get_mesh_variables(config, restartFile, ['refBottomDepth'])
+        # reference depth [m]
+        depth = dsMesh.refBottomDepth.values
 
         Time = ds.Time.values
         field = ds[self.mpasFieldName].values.transpose()
@@ -102,6 +102,9 @@ class PlotTransectSubtask(AnalysisTask):  # {{{
     # -------
     # Xylar Asay-Davis, Greg Streletz
 
+    # this task only plots files written by other tasks
+    plotOnly = True
+
     def __init__(self, parentTask, season, transectName, fieldName,
                  remapMpasClimatologySubtask, plotObs=True,
                  refConfig=None):
@@ -16,9 +16,9 @@ import numpy as np
 
 from mpas_analysis.shared.climatology import RemapMpasClimatologySubtask
 
-from mpas_analysis.shared.mpas_xarray import mpas_xarray
+from mpas_analysis.shared.mesh import get_mesh_variables
 
-from mpas_analysis.ocean.utility import compute_zmid
+from mpas_analysis.ocean.utility import get_vertical_mesh_variables
 
 
 class RemapDepthSlicesSubtask(RemapMpasClimatologySubtask):  # {{{
@@ -100,8 +100,8 @@ class RemapDepthSlicesSubtask(RemapMpasClimatologySubtask):  # {{{
         """
         Compute climatologies of T or S  from ACME/MPAS output
 
-        This function has been overridden to load ``maxLevelCell`` from a
-        restart file for later use in indexing bottom T and S.
+        This function has been overridden to load ``maxLevelCell`` and
+        ``zMid`` from the mesh cache for later use in indexing bottom T and S.
         ``verticalIndex`` is also computed for later indexing of
         the model level. It then simply calls the run function from
         ClimatologyMapOcean.
@@ -110,19 +110,16 @@ class RemapDepthSlicesSubtask(RemapMpasClimatologySubtask):  # {{{
         # -------
         # Xylar Asay-Davis
 
-        # first, load the land-ice mask from the restart file
-        ds = xr.open_dataset(self.restartFileName)
-        ds = mpas_xarray.subset_variables(ds, ['maxLevelCell',
-                                               'bottomDepth',
-                                               'layerThickness'])
-        ds = ds.isel(Time=0)
+        # first, load maxLevelCell and zMid from the mesh cache
+        ds = get_mesh_variables(self.config, self.restartFileName,
+                                ['maxLevelCell'])
 
         self.maxLevelCell = ds.maxLevelCell - 1
 
         depthNames = [str(depth) for depth in self.depths]
 
-        zMid = compute_zmid(ds.bottomDepth, ds.maxLevelCell,
-                            ds.layerThickness)
+        zMid = get_vertical_mesh_variables(self.config,
+                                           self.restartFileName).zMid
 
         nVertLevels = zMid.shape[1]
         zMid.coords['verticalIndex'] = \
@@ -136,7 +133,8 @@ class RemapDepthSlicesSubtask(RemapMpasClimatologySubtask):  # {{{
         zBot = zMid.where(zMid.verticalIndex == self.maxLevelCell).sum(
                 dim='nVertLevels')
 
-        verticalIndices = np.zeros((len(self.depths), ds.dims['nCells']), int)
+        verticalIndices = np.zeros((len(self.depths), ds.sizes['nCells']),
+                                   int)
 
         mask = np.zeros(verticalIndices.shape, bool)
 
@@ -0,0 +1,339 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+import xarray as xr
+import os
+
+from mpas_analysis.shared import AnalysisTask
+
+from mpas_analysis.shared.grid import PointCollectionDescriptor
+from mpas_analysis.shared.interpolation import Remapper
+
+from mpas_analysis.shared.io.utility import build_config_full_path, \
+    make_directories
+from mpas_analysis.shared.io import write_netcdf
+from mpas_analysis.shared.mpas_xarray import mpas_xarray
+
+from mpas_analysis.ocean.utility import get_vertical_mesh_variables
+
+
+class RemapTransectsTask(AnalysisTask):  # {{{
+    """
+    An analysis task for remapping climatologies to the points of all
+    transect collections (e.g. WOCE, SOSE and GeoJSON transects) at once.
+    Each season is masked and remapped only once with a single mapping
+    matrix, and the results are split back into one file per collection for
+    the ``ComputeTransectsSubtask`` of each collection to interpolate
+    vertically.
+
+    Attributes
+    ----------
+    mpasClimatologyTask : ``MpasClimatologyTask``
+        The task that produced the climatology to be remapped
+
+    transectSubtasks : list of ``ComputeTransectsSubtask``
+        The subtasks whose transect collections are remapped by this task,
+        added with ``add_transects()`` during their setup
+
+    restartFileName : str
+        An MPAS restart file used to get the mesh and the vertical mask
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, config, mpasClimatologyTask,
+                 taskName='remapTransects'):  # {{{
+        '''
+        Construct the analysis task.
+
+        Parameters
+        ----------
+        config : ``MpasAnalysisConfigParser``
+            Contains configuration options
+
+        mpasClimatologyTask : ``MpasClimatologyTask``
+            The task that produced the climatology to be remapped
+
+        taskName : str, optional
+            The name of the task
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        self.mpasClimatologyTask = mpasClimatologyTask
+        self.transectSubtasks = []
+
+        # call the constructor from the base class (AnalysisTask)
+        super(RemapTransectsTask, self).__init__(
+            config=config,
+            taskName=taskName,
+            componentName=mpasClimatologyTask.componentName,
+            tags=['climatology'])
+
+        self.run_after(mpasClimatologyTask)
+
+        # this is a stopgap until MPAS implements the _FillValue attribute
+        # correctly
+        self._fillValue = -9.99999979021476795361e+33
+        # }}}
+
+    def setup_and_check(self):  # {{{
+        '''
+        Perform steps to set up the analysis and check for errors in the setup.
+
+        Raises
+        ------
+        IOError :
+            If a restart file is not available from which to read mesh
+            information
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        # first, call setup_and_check from the base class (AnalysisTask),
+        # which will perform some common setup
+        super(RemapTransectsTask, self).setup_and_check()
+
+        try:
+            self.restartFileName = self.runStreams.readpath('restart')[0]
+        except ValueError:
+            raise IOError('No MPAS restart file found: need at least one '
+                          'restart file to perform remapping of '
+                          'climatologies.')
+        # }}}
+
+    def add_transects(self, computeTransectsSubtask):  # {{{
+        '''
+        Add a collection of transects to be remapped.  This should be called
+        at the end of the ``setup_and_check()`` of the subtask, once its
+        remapper has been set up.
+
+        Parameters
+        ----------
+        computeTransectsSubtask : ``ComputeTransectsSubtask``
+            A subtask that will vertically interpolate the remapped
+            climatologies of its transect collection
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if computeTransectsSubtask not in self.transectSubtasks:
+            self.transectSubtasks.append(computeTransectsSubtask)
+        # }}}
+
+    def run_task(self):  # {{{
+        '''
+        Mask and remap each season to the points of all transect collections
+        at once, then write out the remapped climatology for each collection
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if len(self.transectSubtasks) == 0:
+            self.logger.info('Nothing to do: no transects were requested.')
+            return
+
+        seasons = []
+        for subtask in self.transectSubtasks:
+            for season in subtask.seasons:
+                if season not in seasons and \
+                        self._get_missing_subtasks(season):
+                    seasons.append(season)
+
+        if len(seasons) == 0:
+            return
+
+        self.logger.info('\nRemapping climatologies to transects:')
+        for subtask in self.transectSubtasks:
+            self.logger.info('  {}'.format(subtask.transectCollectionName))
+
+        remapper, offsets = self._get_combined_remapper()
+
+        variableList = []
+        for subtask in self.transectSubtasks:
+            for variableName in subtask.variableList:
+                if variableName not in variableList:
+                    variableList.append(variableName)
+
+        dsMask = xr.open_dataset(self.mpasClimatologyTask.inputFiles[0])
+        dsMask = mpas_xarray.subset_variables(dsMask, variableList)
+        dsMask = dsMask.isel(Time=0)
+
+        # the mask of valid layers is computed once per mesh and is the same
+        # for all collections
+        dsVertical = get_vertical_mesh_variables(self.config,
+                                                 self.restartFileName)
+        for subtask in self.transectSubtasks:
+            subtask.cellMask = dsVertical.cellMask
+
+        renormalizationThreshold = self.config.getfloat(
+            'climatology', 'renormalizationThreshold')
+
+        for season in seasons:
+            self.logger.info('  {}'.format(season))
+            subtasks = self._get_missing_subtasks(season)
+
+            climatologyFileName = \
+                self.mpasClimatologyTask.get_file_name(season)
+            climatology = xr.open_dataset(climatologyFileName)
+            climatology = mpas_xarray.subset_variables(climatology,
+                                                       variableList)
+            climatology = climatology.isel(Time=0)
+
+            # add valid mask as a variable, useful for remapping later
+            climatology['validMask'] = \
+                xr.DataArray(numpy.ones(climatology.dims['nCells']),
+                             dims=['nCells'])
+            for variableName in variableList:
+                climatology[variableName] = \
+                    climatology[variableName].where(
+                        dsMask[variableName] != self._fillValue)
+
+            # each collection masks its own variables and may add derived
+            # fields (e.g. velocity magnitude) that must be computed before
+            # remapping
+            dsMasked = xr.Dataset()
+            subtaskVariables = {}
+            for subtask in subtasks:
+                ds = climatology[subtask.variableList + ['validMask']]
+                ds = subtask.customize_masked_climatology(ds, season)
+                subtaskVariables[subtask] = list(ds.data_vars)
+                for variableName in ds.data_vars:
+                    dsMasked[variableName] = ds[variableName]
+
+            dsRemapped = remapper.remap(dsMasked, renormalizationThreshold)
+
+            for subtask in subtasks:
+                index = self.transectSubtasks.index(subtask)
+                ds = dsRemapped[subtaskVariables[subtask]].isel(
+                    nPoints=slice(offsets[index], offsets[index+1]))
+                ds.attrs['meshName'] = subtask.transectCollectionName
+                ds = subtask.customize_remapped_climatology(
+                    ds, subtask.transectCollectionName, season)
+
+                write_netcdf(ds, subtask.get_remapped_file_name(
+                    season, comparisonGridName=subtask.transectCollectionName))
+        # }}}
+
+    def _get_missing_subtasks(self, season):  # {{{
+        '''
+        Get the subtasks that require the given season and for which the
+        remapped climatology has not yet been written
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        subtasks = []
+        for subtask in self.transectSubtasks:
+            if season not in subtask.seasons:
+                continue
+            remappedFileName = subtask.get_remapped_file_name(
+                season, comparisonGridName=subtask.transectCollectionName)
+            if not os.path.exists(remappedFileName):
+                subtasks.append(subtask)
+        return subtasks  # }}}
+
+    def _get_combined_remapper(self):  # {{{
+        '''
+        Get a remapper to the points of all transect collections, writing
+        out a mapping file with the rows of the mapping matrices of each
+        collection stacked one after another (if this hasn't been done
+        already)
+
+        Returns
+        -------
+        remapper : ``Remapper``
+            A remapper to all transect points, with destination dimension
+            ``nPoints``
+
+        offsets : numpy.ndarray
+            The index of the first point of each collection in the combined
+            point collection, followed by the total number of points
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        remappers = [subtask.remappers[subtask.transectCollectionName]
+                     for subtask in self.transectSubtasks]
+
+        lats = []
+        lons = []
+        offsets = [0]
+        for subtask in self.transectSubtasks:
+            descriptor = subtask.collectionDescriptor
+            lats.extend(descriptor.lat)
+            lons.extend(descriptor.lon)
+            offsets.append(len(lats))
+        offsets = numpy.array(offsets)
+
+        collectionName = '_'.join(
+            [subtask.transectCollectionName for subtask in
+             self.transectSubtasks])
+
+        collectionDescriptor = PointCollectionDescriptor(
+            lats, lons, collectionName=collectionName,
+            units='degrees', outDimension='nPoints')
+
+        mpasDescriptor = remappers[0].sourceDescriptor
+
+        method = self.config.get('climatology', 'mpasInterpolationMethod')
+        mappingSubdirectory = build_config_full_path(self.config, 'output',
+                                                     'mappingSubdirectory')
+        make_directories(mappingSubdirectory)
+        mappingFileName = '{}/map_{}_to_{}_{}.nc'.format(
+            mappingSubdirectory, mpasDescriptor.meshName, collectionName,
+            method)
+
+        if not os.path.exists(mappingFileName):
+            col = []
+            row = []
+            S = []
+            frac_b = []
+            for index, remapper in enumerate(remappers):
+                with xr.open_dataset(remapper.mappingFileName) as dsMapping:
+                    if index == 0:
+                        dsCombined = xr.Dataset()
+                        dsCombined['frac_a'] = dsMapping.frac_a
+                        dsCombined['src_grid_dims'] = dsMapping.src_grid_dims
+                    col.append(dsMapping.col.values)
+                    row.append(dsMapping.row.values + offsets[index])
+                    S.append(dsMapping.S.values)
+                    frac_b.append(dsMapping.frac_b.values)
+
+            dsCombined['col'] = (('n_s',), numpy.concatenate(col))
+            dsCombined['row'] = (('n_s',), numpy.concatenate(row))
+            dsCombined['S'] = (('n_s',), numpy.concatenate(S))
+            dsCombined['frac_b'] = (('n_b',), numpy.concatenate(frac_b))
+            dsCombined['dst_grid_dims'] = \
+                (('dst_grid_rank',), numpy.array([offsets[-1]],
+                                                 dtype=numpy.int32))
+            dsCombined.load()
+            # no fill values, so the indices are still read back as integers
+            dsCombined.to_netcdf(mappingFileName)
+
+        remapper = Remapper(mpasDescriptor, collectionDescriptor,
+                            mappingFileName)
+
+        return remapper, offsets  # }}}
+
+    # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -40,7 +40,8 @@ class SoseTransects(AnalysisTask):  # {{{
     # -------
     # Xylar Asay-Davis
 
-    def __init__(self, config, mpasClimatologyTask, refConfig=None):
+    def __init__(self, config, mpasClimatologyTask, remapTransectsTask,
+                 refConfig=None):
 
         # {{{
         '''
@@ -56,6 +57,10 @@ class SoseTransects(AnalysisTask):  # {{{
             The task that produced the climatology to be remapped and plotted
             as a transect
 
+        remapTransectsTask : ``RemapTransectsTask``
+            The task that remaps the climatology to the points of all transect
+            collections at once
+
         refConfig :  ``MpasAnalysisConfigParser``, optional
             Configuration options for a reference run (if any)
         '''
@@ -144,6 +149,7 @@ class SoseTransects(AnalysisTask):  # {{{
 
         computeTransectsSubtask = ComputeTransectsWithVelMag(
             mpasClimatologyTask=mpasClimatologyTask,
+            remapTransectsTask=remapTransectsTask,
             parentTask=self,
             climatologyName='SOSE_transects',
             transectCollectionName=transectCollectionName,
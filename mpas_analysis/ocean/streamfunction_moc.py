@@ -18,6 +18,11 @@ import xarray as xr
 import numpy as np
 import netCDF4
 import os
+import tempfile
+import threading
+from multiprocessing.pool import ThreadPool
+import scipy.sparse
+from scipy.sparse import csr_matrix
 
 from mpas_analysis.shared.constants.constants import m3ps_to_Sv
 from mpas_analysis.shared.plot.plotting import plot_vertical_section,\
@@ -28,12 +33,20 @@ from mpas_analysis.shared.io.utility import build_config_full_path, \
 
 from mpas_analysis.shared.io import open_mpas_dataset, write_netcdf
 
+from mpas_analysis.shared.io.dask_execution import get_task_thread_count
+
 from mpas_analysis.shared.timekeeping.utility import days_to_datetime
 
+from mpas_analysis.shared.time_series import read_cached_records
+
 from mpas_analysis.shared import AnalysisTask
 
 from mpas_analysis.shared.html import write_image_xml
 
+from mpas_analysis.shared.mesh import get_mesh_variables, \
+    get_global_lat_bin_operator, build_lat_bin_operator, \
+    build_transect_operator
+
 
 class StreamfunctionMOC(AnalysisTask):  # {{{
     '''
@@ -325,12 +338,14 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         except ValueError:
             raise IOError('No MPAS-O restart file found: need at least one '
                           'restart file for MOC calculation')
-        ncFile = netCDF4.Dataset(restartFile, mode='r')
-        dvEdge = ncFile.variables['dvEdge'][:]
-        areaCell = ncFile.variables['areaCell'][:]
-        refBottomDepth = ncFile.variables['refBottomDepth'][:]
-        latCell = np.rad2deg(ncFile.variables['latCell'][:])
-        ncFile.close()
+        self.restartFileName = restartFile
+        dsMesh = get_mesh_variables(self.config, restartFile,
+                                    ['dvEdge', 'areaCell', 'refBottomDepth',
+                                     'latCell'])
+        dvEdge = dsMesh.dvEdge.values
+        areaCell = dsMesh.areaCell.values
+        refBottomDepth = dsMesh.refBottomDepth.values
+        latCell = np.rad2deg(dsMesh.latCell.values)
         nVertLevels = len(refBottomDepth)
         refTopDepth = np.zeros(nVertLevels+1)
         refTopDepth[1:nVertLevels+1] = refBottomDepth[0:nVertLevels]
@@ -361,8 +376,9 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
             raise IOError('No MPAS-O restart file found: need at least '
                           'one for MHT calcuation')
 
-        with xr.open_dataset(restartFileName) as dsRestart:
-            refBottomDepth = dsRestart.refBottomDepth.values
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['refBottomDepth'])
+        refBottomDepth = dsMesh.refBottomDepth.values
 
         nVertLevels = len(refBottomDepth)
         refLayerThickness = np.zeros(nVertLevels)
@@ -538,34 +554,18 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         times = np.zeros(len(inputFilesTseries))
         computed = np.zeros(len(inputFilesTseries), bool)
 
-        continueOutput = os.path.exists(outputFileTseries)
-        if continueOutput:
-            self.logger.info('   Read in previously computed MOC time series')
-            with open_mpas_dataset(fileName=outputFileTseries,
-                                   calendar=self.calendar,
-                                   timeVariableNames=None,
-                                   variableList=['mocAtlantic26'],
-                                   startDate=self.startDateTseries,
-                                   endDate=self.endDateTseries) as dsMOCIn:
-
-                dsMOCIn.load()
-
-                # first, copy all computed data
-                for inIndex in range(dsMOCIn.dims['Time']):
-
-                    mask = np.logical_and(
-                            dsMOCIn.year[inIndex].values == years,
-                            dsMOCIn.month[inIndex].values == months)
+        # first, copy all previously computed data
+        dsMOCIn, computedIndices = read_cached_records(
+            outputFileTseries, keyNames=['year', 'month'],
+            expectedKeys=[years, months], logger=self.logger)
+        if dsMOCIn is not None:
+            mocRegion[computedIndices] = dsMOCIn.mocAtlantic26.values
+            times[computedIndices] = dsMOCIn.Time.values
+            computed[computedIndices] = True
 
-                    outIndex = np.where(mask)[0][0]
-
-                    mocRegion[outIndex] = dsMOCIn.mocAtlantic26[inIndex]
-                    times[outIndex] = dsMOCIn.Time[inIndex]
-                    computed[outIndex] = True
-
-                if np.all(computed):
-                    # no need to waste time writing out the data set again
-                    return dsMOCIn
+            if np.all(computed):
+                # no need to waste time writing out the data set again
+                return dsMOCIn
 
         for timeIndex, fileName in enumerate(inputFilesTseries):
             if computed[timeIndex]:
@@ -589,30 +589,11 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
             indRegion = 0
             mocTop = dsLocal.timeMonthly_avg_mocStreamvalLatAndDepthRegion[indRegion, :, :].values
             mocRegion[timeIndex] = np.amax(mocTop[:, indlat26])
+            computed[timeIndex] = True
 
-        description = 'Max MOC Atlantic streamfunction nearest to RAPID ' \
-            'Array latitude (26.5N)'
-
-        dictonary = {'dims': ['Time'],
-                     'coords': {'Time':
-                                {'dims': ('Time'),
-                                 'data': times,
-                                 'attrs': {'units': 'days since 0001-01-01'}},
-                                'year':
-                                {'dims': ('Time'),
-                                 'data': years,
-                                 'attrs': {'units': 'year'}},
-                                'month':
-                                {'dims': ('Time'),
-                                 'data': months,
-                                 'attrs': {'units': 'month'}}},
-                     'data_vars': {'mocAtlantic26':
-                                   {'dims': ('Time'),
-                                    'data': mocRegion,
-                                    'attrs': {'units': 'Sv (10^6 m^3/s)',
-                                              'description': description}}}}
-        dsMOCTimeSeries = xr.Dataset.from_dict(dictonary)
-        write_netcdf(dsMOCTimeSeries, outputFileTseries)
+        dsMOCTimeSeries = self._write_moc_time_series(outputFileTseries, times,
+                                                      years, months,
+                                                      mocRegion, computed)
 
         return dsMOCTimeSeries  # }}}
 
@@ -638,30 +619,27 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         if not os.path.exists(regionMaskFile):
             raise IOError('Regional masking file {} for MOC calculation '
                           'does not exist'.format(regionMaskFile))
-        iRegion = 0
+        self.logger.info('\n  Reading region and transect masks for '
+                         '{}...'.format(', '.join(self.regionNames)))
         self.dictRegion = {}
-        for region in self.regionNames:
-            self.logger.info('\n  Reading region and transect mask for '
-                             '{}...'.format(region))
-            ncFileRegional = netCDF4.Dataset(regionMaskFile, mode='r')
-            maxEdgesInTransect = \
-                ncFileRegional.dimensions['maxEdgesInTransect'].size
+        with netCDF4.Dataset(regionMaskFile, mode='r') as ncFileRegional:
+            regionIndices = self._get_mask_region_indices(ncFileRegional)
+            # read the masks for all regions at once
             transectEdgeMaskSigns = \
-                ncFileRegional.variables['transectEdgeMaskSigns'][:, iRegion]
+                ncFileRegional.variables['transectEdgeMaskSigns'][:, :]
             transectEdgeGlobalIDs = \
-                ncFileRegional.variables['transectEdgeGlobalIDs'][iRegion, :]
-            regionCellMask = \
-                ncFileRegional.variables['regionCellMasks'][:, iRegion]
-            ncFileRegional.close()
-            iRegion += 1
+                ncFileRegional.variables['transectEdgeGlobalIDs'][:, :]
+            regionCellMasks = ncFileRegional.variables['regionCellMasks'][:, :]
 
+        for region, iRegion in zip(self.regionNames, regionIndices):
+            regionCellMask = regionCellMasks[:, iRegion]
             indRegion = np.where(regionCellMask == 1)
             self.dictRegion[region] = {
                 'indices': indRegion,
                 'cellMask': regionCellMask,
-                'maxEdgesInTransect': maxEdgesInTransect,
-                'transectEdgeMaskSigns': transectEdgeMaskSigns,
-                'transectEdgeGlobalIDs': transectEdgeGlobalIDs}
+                'transectOperator': build_transect_operator(
+                    transectEdgeGlobalIDs[iRegion, :],
+                    transectEdgeMaskSigns[:, iRegion], dvEdge)}
         # Add Global regionCellMask=1 everywhere to make the algorithm
         # for the global moc similar to that of the regional moc
 
@@ -706,50 +684,52 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
             # (can result in a memory error for large array size)
             horizontalVel = annualClimatology.avgNormalVelocity.values
             verticalVel = annualClimatology.avgVertVelocityTop.values
-            velArea = verticalVel * areaCell[:, np.newaxis]
 
             # Create dictionary for MOC climatology (NB: need this form
             # in order to convert it to xarray dataset later in the script)
             self.depth = refTopDepth
             self.lat = {}
             self.moc = {}
+            latBinOperators = []
+            transectOperators = []
             for region in self.regionNames:
-                self.logger.info('   Compute {} MOC...'.format(region))
-                self.logger.info('    Compute transport through region '
-                                 'southern transect...')
-                if region == 'Global':
-                    transportZ = np.zeros(nVertLevels)
-                else:
-                    maxEdgesInTransect = \
-                        self.dictRegion[region]['maxEdgesInTransect']
-                    transectEdgeGlobalIDs = \
-                        self.dictRegion[region]['transectEdgeGlobalIDs']
-                    transectEdgeMaskSigns = \
-                        self.dictRegion[region]['transectEdgeMaskSigns']
-                    transportZ = self._compute_transport(maxEdgesInTransect,
-                                                         transectEdgeGlobalIDs,
-                                                         transectEdgeMaskSigns,
-                                                         nVertLevels, dvEdge,
-                                                         refLayerThickness,
-                                                         horizontalVel)
-
                 regionCellMask = self.dictRegion[region]['cellMask']
                 latBinSize = \
                     config.getExpression(self.sectionName,
                                          'latBinSize{}'.format(region))
                 if region == 'Global':
-                    latBins = np.arange(-90.0, 90.1, latBinSize)
+                    # the global operator is cached with the mesh and shared
+                    # with the meridional heat transport
+                    latBins, latBinOperator = get_global_lat_bin_operator(
+                        config, self.restartFileName, latBinSize)
+                    # no transport through a southern transect
+                    transectOperators.append(csr_matrix((1, len(dvEdge))))
                 else:
                     indRegion = self.dictRegion[region]['indices']
                     latBins = latCell[indRegion]
                     latBins = np.arange(np.amin(latBins),
                                         np.amax(latBins)+latBinSize,
                                         latBinSize)
-                mocTop = self._compute_moc(latBins, nVertLevels, latCell,
-                                           regionCellMask, transportZ, velArea)
+                    transectOperators.append(
+                        self.dictRegion[region]['transectOperator'])
+                    latBinOperator = build_lat_bin_operator(
+                        latCell, latBins, weights=areaCell,
+                        mask=regionCellMask)
+                latBinOperators.append(latBinOperator)
+                self.lat[region] = latBins
 
+            # the operators for all regions are stacked so the streamfunctions
+            # for all regions are computed in one pass through the velocities
+            self.logger.info('   Compute {} MOC...'.format(
+                ', '.join(self.regionNames)))
+            transportZ = self._compute_transport(
+                scipy.sparse.vstack(transectOperators), refLayerThickness,
+                horizontalVel)
+            mocTops = self._compute_moc(latBinOperators, transportZ,
+                                        verticalVel)
+
+            for region, mocTop in zip(self.regionNames, mocTops):
                 # Store computed MOC to dictionary
-                self.lat[region] = latBins
                 self.moc[region] = mocTop
 
             # Save to file
@@ -821,10 +801,26 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         indlat26 = np.where(np.abs(dLat) == np.amin(np.abs(dLat)))
 
         dictRegion = self.dictRegion['Atlantic']
-        maxEdgesInTransect = dictRegion['maxEdgesInTransect']
-        transectEdgeGlobalIDs = dictRegion['transectEdgeGlobalIDs']
-        transectEdgeMaskSigns = dictRegion['transectEdgeMaskSigns']
-        regionCellMask = dictRegion['cellMask']
+        transectOperator = dictRegion['transectOperator']
+        # the sums over latitude bins are computed as a sparse matrix product
+        latBinOperator = build_lat_bin_operator(
+            latCell, latAtlantic, weights=areaCell,
+            mask=dictRegion['cellMask'])
+
+        config = self.config
+        rapidLatitudeOnly = config.getboolean(self.sectionName,
+                                              'computeRapidLatitudeOnly')
+        checkpointMonths = config.getint(self.sectionName,
+                                         'timeSeriesCheckpointMonths')
+        threadCount = get_task_thread_count(config)
+
+        if rapidLatitudeOnly:
+            # the streamfunction at a bin boundary is the sum over all bins
+            # to the south, so only one row per boundary nearest 26.5N is
+            # needed
+            rapidOperator = csr_matrix(np.vstack(
+                [np.asarray(latBinOperator[0:iLat, :].sum(axis=0))
+                 for iLat in indlat26[0]]))
 
         streamName = 'timeSeriesStatsMonthlyOutput'
         inputFilesTseries = sorted(self.historyStreams.readpath(
@@ -839,52 +835,35 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         times = np.zeros(len(inputFilesTseries))
         computed = np.zeros(len(inputFilesTseries), bool)
 
-        continueOutput = os.path.exists(outputFileTseries)
-        if continueOutput:
-            self.logger.info('   Read in previously computed MOC time series')
-            with open_mpas_dataset(fileName=outputFileTseries,
-                                   calendar=self.calendar,
-                                   timeVariableNames=None,
-                                   variableList=['mocAtlantic26'],
-                                   startDate=self.startDateTseries,
-                                   endDate=self.endDateTseries) as dsMOCIn:
-
-                dsMOCIn.load()
-
-                # first, copy all computed data
-                for inIndex in range(dsMOCIn.dims['Time']):
-
-                    mask = np.logical_and(
-                            dsMOCIn.year[inIndex].values == years,
-                            dsMOCIn.month[inIndex].values == months)
-
-                    outIndex = np.where(mask)[0][0]
-
-                    mocRegion[outIndex] = dsMOCIn.mocAtlantic26[inIndex]
-                    times[outIndex] = dsMOCIn.Time[inIndex]
-                    computed[outIndex] = True
-
-                if np.all(computed):
-                    # no need to waste time writing out the data set again
-                    return dsMOCIn
-
-        for timeIndex, fileName in enumerate(inputFilesTseries):
-            if computed[timeIndex]:
-                continue
-
-            dsLocal = open_mpas_dataset(
-                fileName=fileName,
-                calendar=self.calendar,
-                variableList=self.variableList,
-                startDate=self.startDateTseries,
-                endDate=self.endDateTseries)
-            dsLocal = dsLocal.isel(Time=0)
+        # first, copy all previously computed data
+        dsMOCIn, computedIndices = read_cached_records(
+            outputFileTseries, keyNames=['year', 'month'],
+            expectedKeys=[years, months], logger=self.logger)
+        if dsMOCIn is not None:
+            mocRegion[computedIndices] = dsMOCIn.mocAtlantic26.values
+            times[computedIndices] = dsMOCIn.Time.values
+            computed[computedIndices] = True
+
+            if np.all(computed):
+                # no need to waste time writing out the data set again
+                return dsMOCIn
+
+        # netCDF files are read and written one at a time (netCDF/HDF5 I/O is
+        # not thread-safe), while the MOC computations for different months
+        # proceed in parallel threads
+        netcdfLock = threading.Lock()
+
+        def compute_month(timeIndex):
+            with netcdfLock:
+                dsLocal = open_mpas_dataset(
+                    fileName=inputFilesTseries[timeIndex],
+                    calendar=self.calendar,
+                    variableList=self.variableList,
+                    startDate=self.startDateTseries,
+                    endDate=self.endDateTseries)
+                dsLocal = dsLocal.isel(Time=0)
+                dsLocal.load()
             time = dsLocal.Time.values
-            times[timeIndex] = time
-            date = days_to_datetime(time, calendar=self.calendar)
-
-            self.logger.info('     date: {:04d}-{:02d}'.format(date.year,
-                                                               date.month))
 
             if self.includeBolus:
                 dsLocal['avgNormalVelocity'] = \
@@ -902,16 +881,59 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
 
             horizontalVel = dsLocal.avgNormalVelocity.values
             verticalVel = dsLocal.avgVertVelocityTop.values
-            velArea = verticalVel * areaCell[:, np.newaxis]
-            transportZ = self._compute_transport(maxEdgesInTransect,
-                                                 transectEdgeGlobalIDs,
-                                                 transectEdgeMaskSigns,
-                                                 nVertLevels, dvEdge,
+            transportZ = self._compute_transport(transectOperator,
                                                  refLayerThickness,
                                                  horizontalVel)
-            mocTop = self._compute_moc(latAtlantic, nVertLevels, latCell,
-                                       regionCellMask, transportZ, velArea)
-            mocRegion[timeIndex] = np.amax(mocTop[:, indlat26])
+            if rapidLatitudeOnly:
+                mocSouth = np.zeros(nVertLevels+1)
+                mocSouth[1:] = transportZ[0, :].cumsum()
+                mocTop = (mocSouth[np.newaxis, :] +
+                          rapidOperator.dot(verticalVel)) * m3ps_to_Sv
+                mocAtlantic26 = np.amax(mocTop)
+            else:
+                mocTop = self._compute_moc([latBinOperator], transportZ,
+                                           verticalVel)[0]
+                mocAtlantic26 = np.amax(mocTop[:, indlat26])
+            return timeIndex, time, mocAtlantic26
+
+        indicesToCompute = np.nonzero(np.logical_not(computed))[0]
+        pool = ThreadPool(threadCount)
+        try:
+            newCount = 0
+            for timeIndex, time, mocAtlantic26 in pool.imap_unordered(
+                    compute_month, indicesToCompute):
+                times[timeIndex] = time
+                mocRegion[timeIndex] = mocAtlantic26
+                computed[timeIndex] = True
+                date = days_to_datetime(time, calendar=self.calendar)
+                self.logger.info('     date: {:04d}-{:02d}'.format(
+                    date.year, date.month))
+
+                newCount += 1
+                if newCount % checkpointMonths == 0:
+                    # save what we have so far in case the task is
+                    # interrupted, while no thread is reading a file
+                    with netcdfLock:
+                        self._write_moc_time_series(outputFileTseries, times,
+                                                    years, months, mocRegion,
+                                                    computed)
+        finally:
+            pool.close()
+            pool.join()
+
+        dsMOCTimeSeries = self._write_moc_time_series(outputFileTseries, times,
+                                                      years, months,
+                                                      mocRegion, computed)
+
+        return dsMOCTimeSeries  # }}}
+
+    def _write_moc_time_series(self, outputFileTseries, times, years, months,
+                               mocRegion, computed):  # {{{
+
+        '''
+        write the computed entries of the MOC time series to a file,
+        replacing the file only once the new one is complete
+        '''
 
         description = 'Max MOC Atlantic streamfunction nearest to RAPID ' \
             'Array latitude (26.5N)'
@@ -919,62 +941,109 @@ class StreamfunctionMOC(AnalysisTask):  # {{{
         dictonary = {'dims': ['Time'],
                      'coords': {'Time':
                                 {'dims': ('Time'),
-                                 'data': times,
+                                 'data': times[computed],
                                  'attrs': {'units': 'days since 0001-01-01'}},
                                 'year':
                                 {'dims': ('Time'),
-                                 'data': years,
+                                 'data': np.asarray(years)[computed],
                                  'attrs': {'units': 'year'}},
                                 'month':
                                 {'dims': ('Time'),
-                                 'data': months,
+                                 'data': np.asarray(months)[computed],
                                  'attrs': {'units': 'month'}}},
                      'data_vars': {'mocAtlantic26':
                                    {'dims': ('Time'),
-                                    'data': mocRegion,
+                                    'data': mocRegion[computed],
                                     'attrs': {'units': 'Sv (10^6 m^3/s)',
                                               'description': description}}}}
         dsMOCTimeSeries = xr.Dataset.from_dict(dictonary)
-        write_netcdf(dsMOCTimeSeries, outputFileTseries)
+
+        outputDirectory = os.path.dirname(outputFileTseries)
+        handle, tempFileName = tempfile.mkstemp(suffix='.nc',
+                                                dir=outputDirectory)
+        os.close(handle)
+        try:
+            write_netcdf(dsMOCTimeSeries, tempFileName)
+            os.rename(tempFileName, outputFileTseries)
+        except BaseException:
+            os.remove(tempFileName)
+            raise
 
         return dsMOCTimeSeries  # }}}
 
-    def _compute_transport(self, maxEdgesInTransect, transectEdgeGlobalIDs,
-                           transectEdgeMaskSigns, nz, dvEdge,
-                           refLayerThickness, horizontalVel):  # {{{
-
-        '''compute mass transport across southern transect of ocean basin'''
-
-        transportZEdge = np.zeros([nz, maxEdgesInTransect])
-        for i in range(maxEdgesInTransect):
-            if transectEdgeGlobalIDs[i] == 0:
-                break
-            # subtract 1 because of python 0-indexing
-            iEdge = transectEdgeGlobalIDs[i] - 1
-            transportZEdge[:, i] = horizontalVel[iEdge, :] * \
-                transectEdgeMaskSigns[iEdge, np.newaxis] * \
-                dvEdge[iEdge, np.newaxis] * \
-                refLayerThickness[np.newaxis, :]
-        transportZ = transportZEdge.sum(axis=1)
+    def _get_mask_region_indices(self, ncFileRegional):  # {{{
+
+        '''
+        get the index in the region mask file of each region in
+        ``self.regionNames``, looked up by name if the file has region names
+        and otherwise assumed to be in the same order.  Regions that are not
+        found by name fall back on their position in ``self.regionNames``
+        (with a warning), as region masks were always indexed before.
+        '''
+
+        if 'regionNames' not in ncFileRegional.variables:
+            return list(range(len(self.regionNames)))
+
+        maskRegionNames = ncFileRegional.variables['regionNames'][:]
+        if maskRegionNames.dtype == np.dtype('S1'):
+            maskRegionNames = netCDF4.chartostring(maskRegionNames)
+        maskRegionNames = [str(name).strip() for name in maskRegionNames]
+        regionIndices = []
+        for index, region in enumerate(self.regionNames):
+            if region in maskRegionNames:
+                regionIndices.append(maskRegionNames.index(region))
+            else:
+                self.logger.warning(
+                    'Warning: region {} not found in region mask file, '
+                    'using region {} in the file by position instead. '
+                    'Available regions: {}'.format(
+                        region, index, ', '.join(maskRegionNames)))
+                regionIndices.append(index)
+        return regionIndices  # }}}
+
+    def _compute_transport(self, transectOperator, refLayerThickness,
+                           horizontalVel):  # {{{
+
+        '''
+        compute mass transport across southern transects of ocean basins,
+        given a sparse operator from ``build_transect_operator()`` (or several
+        stacked into one operator with one row per transect)
+        '''
+
+        transportZ = transectOperator.dot(horizontalVel) * \
+            refLayerThickness[np.newaxis, :]
         return transportZ  # }}}
 
-    def _compute_moc(self, latBins, nz, latCell, regionCellMask, transportZ,
-                     velArea):  # {{{
-
-        '''compute meridionally integrated MOC streamfunction'''
-
-        mocTop = np.zeros([np.size(latBins), nz+1])
-        mocTop[0, range(1, nz+1)] = transportZ.cumsum()
-        for iLat in range(1, np.size(latBins)):
-            indlat = np.logical_and(np.logical_and(
-                         regionCellMask == 1, latCell >= latBins[iLat-1]),
-                         latCell < latBins[iLat])
-            mocTop[iLat, :] = mocTop[iLat-1, :] + \
-                velArea[indlat, :].sum(axis=0)
-        # convert m^3/s to Sverdrup
-        mocTop = mocTop * m3ps_to_Sv
-        mocTop = mocTop.T
-        return mocTop  # }}}
+    def _compute_moc(self, latBinOperators, transportZ, verticalVel):  # {{{
+
+        '''
+        compute meridionally integrated MOC streamfunctions for one or more
+        regions, given a list of sparse operators from
+        ``build_lat_bin_operator()`` that sum area-weighted cell values in the
+        latitude bins of each region and the transport into each region
+        through its southern transect.  The operators are stacked so that
+        all regions are computed with a single sparse product.
+        '''
+
+        if len(latBinOperators) == 1:
+            binSums = latBinOperators[0].dot(verticalVel)
+        else:
+            binSums = scipy.sparse.vstack(latBinOperators).dot(verticalVel)
+
+        nz = transportZ.shape[1]
+        mocTops = []
+        offset = 0
+        for iRegion, latBinOperator in enumerate(latBinOperators):
+            binCount = latBinOperator.shape[0]
+            mocTop = np.zeros([binCount+1, nz+1])
+            mocTop[0, 1:] = transportZ[iRegion, :].cumsum()
+            mocTop[1:, :] = mocTop[0, :] + \
+                np.cumsum(binSums[offset:offset+binCount, :], axis=0)
+            offset += binCount
+            # convert m^3/s to Sverdrup
+            mocTop = mocTop * m3ps_to_Sv
+            mocTops.append(mocTop.T)
+        return mocTops  # }}}
 
 # }}}
 
@@ -19,7 +19,7 @@ from mpas_analysis.shared.analysis_task import AnalysisTask
 
 from mpas_analysis.shared.constants import constants
 
-from mpas_analysis.shared.plot.plotting import timeseries_analysis_plot
+from mpas_analysis.shared.plot.plotting import timeseries_analysis_plots
 
 from mpas_analysis.shared.io import open_mpas_dataset, write_netcdf
 
@@ -28,6 +28,10 @@ from mpas_analysis.shared.io.utility import build_config_full_path, \
 
 from mpas_analysis.shared.html import write_image_xml
 
+from mpas_analysis.shared.mesh import get_mesh_variables
+
+from mpas_analysis.shared.time_series import read_cached_records
+
 import csv
 
 
@@ -196,6 +200,10 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
         calendar = self.calendar
 
         totalMeltFlux, meltRates = self._compute_ice_shelf_fluxes()
+        # all ice shelves are plotted from the same time series, so read them
+        # once
+        totalMeltFlux.load()
+        meltRates.load()
 
         plotRef = self.refConfig is not None
         if plotRef:
@@ -203,6 +211,8 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
 
             refTotalMeltFlux, refMeltRates = \
                 self._load_ice_shelf_fluxes(self.refConfig)
+            refTotalMeltFlux.load()
+            refMeltRates.load()
 
         # Load observations from multiple files and put in dictionary based
         # on shelf keyname
@@ -251,7 +261,20 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
 
         make_directories(outputDirectory)
 
+        if config.has_option(self.taskName, 'firstYearXTicks'):
+            firstYearXTicks = config.getint(self.taskName, 'firstYearXTicks')
+        else:
+            firstYearXTicks = None
+
+        if config.has_option(self.taskName, 'yearStrideXTicks'):
+            yearStrideXTicks = config.getint(self.taskName,
+                                             'yearStrideXTicks')
+        else:
+            yearStrideXTicks = None
+
         self.logger.info('  Make plots...')
+        plots = []
+        images = []
         for iRegion in range(nRegions):
 
             regionName = self.iceShelvesToPlot[iRegion]
@@ -302,29 +325,20 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
                 lineWidths.append(1.2)
                 legendText.append(refRunName)
 
-            timeseries_analysis_plot(config, fields, movingAverageMonths,
-                                     title, xLabel, yLabel, figureName,
-                                     calendar=calendar,
-                                     lineColors=lineColors,
-                                     lineWidths=lineWidths,
-                                     legendText=legendText,
-                                     obsMean=obsMeltFlux,
-                                     obsUncertainty=obsMeltFluxUnc,
-                                     obsLegend=list(obsDict.keys()))
+            plots.append({'dsvalues': fields, 'N': movingAverageMonths,
+                          'title': title, 'xlabel': xLabel, 'ylabel': yLabel,
+                          'fileout': figureName, 'lineColors': lineColors,
+                          'lineWidths': lineWidths, 'legendText': legendText,
+                          'obsMean': obsMeltFlux,
+                          'obsUncertainty': obsMeltFluxUnc,
+                          'obsLegend': list(obsDict.keys())})
 
             caption = 'Running Mean of Total Melt Flux  under Ice ' \
                       'Shelves in the {} Region'.format(title)
-            write_image_xml(
-                config=config,
-                filePrefix=filePrefix,
-                componentName='Ocean',
-                componentSubdirectory='ocean',
-                galleryGroup='Antarctic Melt Time Series',
-                groupLink='antmelttime',
-                gallery='Total Melt Flux',
-                thumbnailDescription=title,
-                imageDescription=caption,
-                imageCaption=caption)
+            images.append({'filePrefix': filePrefix,
+                           'gallery': 'Total Melt Flux',
+                           'thumbnailDescription': title,
+                           'caption': caption})
 
             xLabel = 'Time (yr)'
             yLabel = 'Melt Rate (m/yr)'
@@ -344,43 +358,38 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
                 lineWidths.append(1.2)
                 legendText.append(refRunName)
 
-            if config.has_option(self.taskName, 'firstYearXTicks'):
-                firstYearXTicks = config.getint(self.taskName,
-                                                'firstYearXTicks')
-            else:
-                firstYearXTicks = None
-
-            if config.has_option(self.taskName, 'yearStrideXTicks'):
-                yearStrideXTicks = config.getint(self.taskName,
-                                                 'yearStrideXTicks')
-            else:
-                yearStrideXTicks = None
-
-            timeseries_analysis_plot(config, fields, movingAverageMonths,
-                                     title, xLabel, yLabel, figureName,
-                                     calendar=calendar,
-                                     lineColors=lineColors,
-                                     lineWidths=lineWidths,
-                                     legendText=legendText,
-                                     obsMean=obsMeltRate,
-                                     obsUncertainty=obsMeltRateUnc,
-                                     obsLegend=list(obsDict.keys()),
-                                     firstYearXTicks=firstYearXTicks,
-                                     yearStrideXTicks=yearStrideXTicks)
+            plots.append({'dsvalues': fields, 'N': movingAverageMonths,
+                          'title': title, 'xlabel': xLabel, 'ylabel': yLabel,
+                          'fileout': figureName, 'lineColors': lineColors,
+                          'lineWidths': lineWidths, 'legendText': legendText,
+                          'obsMean': obsMeltRate,
+                          'obsUncertainty': obsMeltRateUnc,
+                          'obsLegend': list(obsDict.keys()),
+                          'firstYearXTicks': firstYearXTicks,
+                          'yearStrideXTicks': yearStrideXTicks})
 
             caption = 'Running Mean of Area-averaged Melt Rate under Ice ' \
                       'Shelves in the {} Region'.format(title)
+            images.append({'filePrefix': filePrefix,
+                           'gallery': 'Area-averaged Melt Rate',
+                           'thumbnailDescription': title,
+                           'caption': caption})
+
+        # plot the melt fluxes and rates of all ice shelves in one pass
+        timeseries_analysis_plots(config, plots, calendar=calendar)
+
+        for image in images:
             write_image_xml(
                 config=config,
-                filePrefix=filePrefix,
+                filePrefix=image['filePrefix'],
                 componentName='Ocean',
                 componentSubdirectory='ocean',
                 galleryGroup='Antarctic Melt Time Series',
                 groupLink='antmelttime',
-                gallery='Area-averaged Melt Rate',
-                thumbnailDescription=title,
-                imageDescription=caption,
-                imageCaption=caption)
+                gallery=image['gallery'],
+                thumbnailDescription=image['thumbnailDescription'],
+                imageDescription=image['caption'],
+                imageCaption=image['caption'])
         # }}}
 
     def _compute_ice_shelf_fluxes(self):  # {{{
@@ -407,22 +416,20 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
                                  variableList=self.variableList,
                                  startDate=self.startDate,
                                  endDate=self.endDate)
-        try:
-            if os.path.exists(outFileName):
-                # The file already exists so load it
-                dsOut = xarray.open_dataset(outFileName)
-                if numpy.all(dsOut.Time.values == dsIn.Time.values):
-                    return dsOut.totalMeltFlux, dsOut.meltRates
-                else:
-                    self.logger.warning('File {} is incomplete. Deleting '
-                                        'it.'.format(outFileName))
-                    os.remove(outFileName)
-        except OSError:
-            # something is potentailly wrong with the file, so let's delete
-            # it and try again
-            self.logger.warning('Problems reading file {}. Deleting '
-                                'it.'.format(outFileName))
-            os.remove(outFileName)
+        # only compute the records that weren't computed previously
+        dsCache, cachedIndices = read_cached_records(
+            outFileName, keyNames=['Time'], expectedKeys=[dsIn.Time.values],
+            logger=self.logger)
+        if dsCache is not None and \
+                dsCache.sizes['nRegions'] != len(self.regionIndices):
+            # the regions have changed, so start over
+            dsCache, cachedIndices = None, numpy.zeros(0, int)
+        if dsCache is not None and len(cachedIndices) == dsIn.sizes['Time']:
+            return dsCache.totalMeltFlux, dsCache.meltRates
+
+        missingIndices = numpy.setdiff1d(numpy.arange(dsIn.sizes['Time']),
+                                         cachedIndices)
+        dsIn = dsIn.isel(Time=missingIndices)
 
         # work on data from simulations
         freshwaterFlux = dsIn.timeMonthly_avg_landIceFreshwaterFlux
@@ -430,8 +437,9 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
         restartFileName = \
             mpasTimeSeriesTask.runStreams.readpath('restart')[0]
 
-        dsRestart = xarray.open_dataset(restartFileName)
-        areaCell = dsRestart.landIceFraction.isel(Time=0)*dsRestart.areaCell
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['landIceFraction', 'areaCell'])
+        areaCell = dsMesh.landIceFraction*dsMesh.areaCell
 
         mpasMeshName = config.get('input', 'mpasMeshName')
         regionMaskDirectory = config.get('regions', 'regionMaskDirectory')
@@ -472,9 +480,13 @@ class TimeSeriesAntarcticMelt(AnalysisTask):
         dsOut.meltRates.attrs['description'] = \
             'Melt rate averaged over each ice shelf or region'
 
+        if dsCache is not None and len(cachedIndices) > 0:
+            dsOut = xarray.concat([dsCache, dsOut], dim='Time')
+            dsOut = dsOut.isel(Time=numpy.argsort(dsOut.Time.values))
+
         write_netcdf(dsOut, outFileName)
 
-        return totalMeltFlux, meltRates  # }}}
+        return dsOut.totalMeltFlux, dsOut.meltRates  # }}}
 
     def _load_ice_shelf_fluxes(self, config):  # {{{
         """
@@ -14,9 +14,8 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
-import xarray as xr
-
 from mpas_analysis.shared import AnalysisTask
+from mpas_analysis.shared.mesh import get_mesh_variables
 
 from mpas_analysis.ocean.compute_anomaly_subtask import ComputeAnomalySubtask
 from mpas_analysis.ocean.plot_hovmoller_subtask import PlotHovmollerSubtask
@@ -161,11 +160,12 @@ class TimeSeriesOHCAnomaly(AnalysisTask):
                           'restart file for OHC calculation')
 
         # Define/read in general variables
-        with xr.open_dataset(restartFile) as dsRestart:
-            # reference depth [m]
-            # add depths as a coordinate to the data set
-            ds.coords['depth'] = (('nVertLevels',),
-                                  dsRestart.refBottomDepth.values)
+        dsMesh = get_mesh_variables(self.config, restartFile,
+                                    ['refBottomDepth'])
+        # reference depth [m]
+        # add depths as a coordinate to the data set
+        ds.coords['depth'] = (('nVertLevels',),
+                              dsMesh.refBottomDepth.values)
 
         return ds  # }}}
 
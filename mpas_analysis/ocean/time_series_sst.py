@@ -14,7 +14,7 @@ from __future__ import absolute_import, division, print_function, \
 
 from mpas_analysis.shared import AnalysisTask
 
-from mpas_analysis.shared.plot.plotting import timeseries_analysis_plot
+from mpas_analysis.shared.plot.plotting import timeseries_analysis_plots
 
 from mpas_analysis.shared.time_series import combine_time_series_with_ncrcat
 from mpas_analysis.shared.io import open_mpas_dataset
@@ -169,6 +169,8 @@ class TimeSeriesSST(AnalysisTask):
                                   variableList=self.variableList,
                                   startDate=self.startDate,
                                   endDate=self.endDate)
+        # all regions are plotted from the same data set, so read it once
+        dsSST.load()
 
         yearStart = days_to_datetime(dsSST.Time.min(), calendar=calendar).year
         yearEnd = days_to_datetime(dsSST.Time.max(), calendar=calendar).year
@@ -195,6 +197,7 @@ class TimeSeriesSST(AnalysisTask):
                     variableList=self.variableList,
                     startDate=refStartDate,
                     endDate=refEndDate)
+            dsRefSST.load()
         else:
             dsRefSST = None
 
@@ -224,7 +227,19 @@ class TimeSeriesSST(AnalysisTask):
                                     'plotted.')
                 preprocessedReferenceRunName = 'None'
 
+        if config.has_option(self.taskName, 'firstYearXTicks'):
+            firstYearXTicks = config.getint(self.taskName, 'firstYearXTicks')
+        else:
+            firstYearXTicks = None
+
+        if config.has_option(self.taskName, 'yearStrideXTicks'):
+            yearStrideXTicks = config.getint(self.taskName,
+                                             'yearStrideXTicks')
+        else:
+            yearStrideXTicks = None
+
         self.logger.info('  Make plots...')
+        plots = []
         for regionIndex in regionIndicesToPlot:
             region = regions[regionIndex]
 
@@ -260,27 +275,19 @@ class TimeSeriesSST(AnalysisTask):
                 lineWidths.append(1.5)
                 legendText.append(preprocessedReferenceRunName)
 
-            if config.has_option(self.taskName, 'firstYearXTicks'):
-                firstYearXTicks = config.getint(self.taskName,
-                                                'firstYearXTicks')
-            else:
-                firstYearXTicks = None
-
-            if config.has_option(self.taskName, 'yearStrideXTicks'):
-                yearStrideXTicks = config.getint(self.taskName,
-                                                 'yearStrideXTicks')
-            else:
-                yearStrideXTicks = None
+            plots.append({'dsvalues': fields, 'N': movingAveragePoints,
+                          'title': title, 'xlabel': xLabel, 'ylabel': yLabel,
+                          'fileout': figureName, 'lineColors': lineColors,
+                          'lineWidths': lineWidths, 'legendText': legendText,
+                          'firstYearXTicks': firstYearXTicks,
+                          'yearStrideXTicks': yearStrideXTicks})
 
-            timeseries_analysis_plot(config, fields, movingAveragePoints,
-                                     title, xLabel, yLabel, figureName,
-                                     calendar=calendar,
-                                     lineColors=lineColors,
-                                     lineWidths=lineWidths,
-                                     legendText=legendText,
-                                     firstYearXTicks=firstYearXTicks,
-                                     yearStrideXTicks=yearStrideXTicks)
+        # plot all regions in one pass
+        timeseries_analysis_plots(config, plots, calendar=calendar)
 
+        for regionIndex in regionIndicesToPlot:
+            region = regions[regionIndex]
+            filePrefix = self.filePrefixes[region]
             caption = 'Running Mean of {} Sea Surface Temperature'.format(
                     region)
             write_image_xml(
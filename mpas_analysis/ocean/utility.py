@@ -21,6 +21,9 @@ from __future__ import absolute_import, division, print_function, \
 import numpy
 import xarray
 
+from mpas_analysis.shared.mesh import get_mesh_variables, \
+    get_derived_mesh_variables
+
 
 def compute_zmid(bottomDepth, maxLevelCell, layerThickness):  # {{{
     """
@@ -67,6 +70,51 @@ def compute_zmid(bottomDepth, maxLevelCell, layerThickness):  # {{{
     return zMid  # }}}
 
 
+def get_vertical_mesh_variables(config, restartFileName):  # {{{
+    """
+    Get ``zMid`` and the mask of valid layers in each cell, computed from the
+    restart file only once per mesh and then read from the mesh cache
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of an MPAS restart file with ``bottomDepth``,
+        ``maxLevelCell`` and ``layerThickness``
+
+    Returns
+    -------
+    dsVertical : ``xarray.Dataset``
+        A data set with ``zMid``, the vertical coordinate defining the middle
+        of each layer (NaN below the bathymetry), and ``cellMask``, which is
+        ``True`` for layers above the bathymetry
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def compute_variables():
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['maxLevelCell', 'bottomDepth',
+                                     'layerThickness'])
+        dsVertical = xarray.Dataset()
+        dsVertical['zMid'] = compute_zmid(
+            dsMesh.bottomDepth, dsMesh.maxLevelCell,
+            dsMesh.layerThickness).transpose('nCells', 'nVertLevels')
+        vertIndex = xarray.DataArray.from_dict(
+            {'dims': ('nVertLevels',),
+             'data': numpy.arange(dsMesh.sizes['nVertLevels'])})
+        dsVertical['cellMask'] = (vertIndex < dsMesh.maxLevelCell).transpose(
+            'nCells', 'nVertLevels')
+        return dsVertical
+
+    return get_derived_mesh_variables(config, restartFileName,
+                                      ['zMid', 'cellMask'],
+                                      compute_variables)  # }}}
+
+
 def nans_to_numpy_mask(field):  # {{{
     """
     Convert a numpy array with NaNs to a masked numpy array
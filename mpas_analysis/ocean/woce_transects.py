@@ -31,7 +31,8 @@ class WoceTransects(AnalysisTask):  # {{{
     # -------
     # Xylar Asay-Davis
 
-    def __init__(self, config, mpasClimatologyTask, refConfig=None):
+    def __init__(self, config, mpasClimatologyTask, remapTransectsTask,
+                 refConfig=None):
 
         # {{{
         '''
@@ -47,6 +48,10 @@ class WoceTransects(AnalysisTask):  # {{{
             The task that produced the climatology to be remapped and plotted
             as a transect
 
+        remapTransectsTask : ``RemapTransectsTask``
+            The task that remaps the climatology to the points of all transect
+            collections at once
+
         refConfig :  ``MpasAnalysisConfigParser``, optional
             Configuration options for a reference run (if any)
         '''
@@ -109,6 +114,7 @@ class WoceTransects(AnalysisTask):  # {{{
 
         computeTransectsSubtask = ComputeTransectsSubtask(
             mpasClimatologyTask=mpasClimatologyTask,
+            remapTransectsTask=remapTransectsTask,
             parentTask=self,
             climatologyName='WOCE',
             transectCollectionName=transectCollectionName,
@@ -97,6 +97,9 @@ class PlotClimatologyMapSubtask(AnalysisTask):  # {{{
     # -------
     # Xylar Asay-Davis, Milena Veneziani
 
+    # this task only plots files written by other tasks
+    plotOnly = True
+
     def __init__(self, parentTask, hemisphere, season, comparisonGridName,
                  remapMpasClimatologySubtask, remapObsClimatologySubtask=None,
                  refConfig=None, subtaskSuffix=None):
@@ -13,10 +13,11 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 import xarray as xr
+import numpy
 
 from mpas_analysis.shared import AnalysisTask
 
-from mpas_analysis.shared.plot.plotting import timeseries_analysis_plot, \
+from mpas_analysis.shared.plot.plotting import timeseries_analysis_plots, \
     timeseries_analysis_plot_polar
 
 from mpas_analysis.shared.io.utility import build_config_full_path, \
@@ -27,9 +28,10 @@ from mpas_analysis.shared.timekeeping.utility import date_to_days, \
 from mpas_analysis.shared.timekeeping.MpasRelativeDelta import \
     MpasRelativeDelta
 
-from mpas_analysis.shared.time_series import combine_time_series_with_ncrcat
+from mpas_analysis.shared.time_series import \
+    combine_time_series_with_ncrcat, read_cached_records
 from mpas_analysis.shared.io import open_mpas_dataset, write_netcdf
-from mpas_analysis.shared.mpas_xarray.mpas_xarray import subset_variables
+from mpas_analysis.shared.mesh import get_mesh_variables
 
 from mpas_analysis.shared.html import write_image_xml
 
@@ -321,6 +323,18 @@ class TimeSeriesSeaIce(AnalysisTask):
         obsLegend = {}
         plotVarsRef = {}
 
+        if config.has_option(sectionName, 'firstYearXTicks'):
+            firstYearXTicks = config.getint(sectionName, 'firstYearXTicks')
+        else:
+            firstYearXTicks = None
+
+        if config.has_option(sectionName, 'yearStrideXTicks'):
+            yearStrideXTicks = config.getint(sectionName, 'yearStrideXTicks')
+        else:
+            yearStrideXTicks = None
+
+        plots = []
+        images = []
         for hemisphere in ['NH', 'SH']:
 
             self.logger.info('  Make {} plots...'.format(hemisphere))
@@ -450,31 +464,19 @@ class TimeSeriesSeaIce(AnalysisTask):
                     lineColors.append('r')
                     lineWidths.append(1.2)
 
-                if config.has_option(sectionName, 'firstYearXTicks'):
-                    firstYearXTicks = config.getint(sectionName,
-                                                    'firstYearXTicks')
-                else:
-                    firstYearXTicks = None
-
-                if config.has_option(sectionName, 'yearStrideXTicks'):
-                    yearStrideXTicks = config.getint(sectionName,
-                                                     'yearStrideXTicks')
-                else:
-                    yearStrideXTicks = None
-
-                # separate plots for nothern and southern hemispheres
-                timeseries_analysis_plot(config, dsvalues,
-                                         movingAveragePoints,
-                                         title[key], xLabel,
-                                         units[variableName],
-                                         figureNameStd[key],
-                                         calendar=calendar,
-                                         lineColors=lineColors,
-                                         lineWidths=lineWidths,
-                                         legendText=legendText,
-                                         titleFontSize=titleFontSize,
-                                         firstYearXTicks=firstYearXTicks,
-                                         yearStrideXTicks=yearStrideXTicks)
+                # separate plots for nothern and southern hemispheres, all
+                # plotted in one pass below
+                plots.append({'dsvalues': dsvalues,
+                              'N': movingAveragePoints,
+                              'title': title[key], 'xlabel': xLabel,
+                              'ylabel': units[variableName],
+                              'fileout': figureNameStd[key],
+                              'lineColors': lineColors,
+                              'lineWidths': lineWidths,
+                              'legendText': legendText,
+                              'titleFontSize': titleFontSize,
+                              'firstYearXTicks': firstYearXTicks,
+                              'yearStrideXTicks': yearStrideXTicks})
 
                 filePrefix = '{}{}_{}'.format(variableName,
                                               hemisphere,
@@ -483,16 +485,7 @@ class TimeSeriesSeaIce(AnalysisTask):
                         hemisphere, plotTitles[variableName])
                 caption = 'Running mean of {}'.format(
                         thumbnailDescription)
-                write_image_xml(
-                    config,
-                    filePrefix,
-                    componentName='Sea Ice',
-                    componentSubdirectory='sea_ice',
-                    galleryGroup=galleryGroup,
-                    groupLink=groupLink,
-                    thumbnailDescription=thumbnailDescription,
-                    imageDescription=caption,
-                    imageCaption=caption)
+                images.append((filePrefix, thumbnailDescription, caption))
 
                 if (polarPlot):
                     timeseries_analysis_plot_polar(
@@ -519,6 +512,20 @@ class TimeSeriesSeaIce(AnalysisTask):
                         thumbnailDescription=thumbnailDescription,
                         imageDescription=caption,
                         imageCaption=caption)
+
+        timeseries_analysis_plots(config, plots, calendar=calendar)
+
+        for filePrefix, thumbnailDescription, caption in images:
+            write_image_xml(
+                config,
+                filePrefix,
+                componentName='Sea Ice',
+                componentSubdirectory='sea_ice',
+                galleryGroup=galleryGroup,
+                groupLink=groupLink,
+                thumbnailDescription=thumbnailDescription,
+                imageDescription=caption,
+                imageCaption=caption)
         # }}}
 
     def _replicate_cycle(self, ds, dsToReplicate, calendar):  # {{{
@@ -609,9 +616,8 @@ class TimeSeriesSeaIce(AnalysisTask):
             outFileNames[hemisphere] = outFileName
 
         dsTimeSeries = {}
-        dsMesh = xr.open_dataset(self.restartFileName)
-        dsMesh = subset_variables(dsMesh,
-                                  variableList=['latCell', 'areaCell'])
+        dsMesh = get_mesh_variables(self.config, self.restartFileName,
+                                    ['latCell', 'areaCell'])
         # Load data
         ds = open_mpas_dataset(
             fileName=self.inputFile,
@@ -622,12 +628,24 @@ class TimeSeriesSeaIce(AnalysisTask):
 
         for hemisphere in ['NH', 'SH']:
 
+            # only compute the records that weren't computed previously
+            dsCache, cachedIndices = read_cached_records(
+                outFileNames[hemisphere], keyNames=['Time'],
+                expectedKeys=[ds.Time.values], logger=self.logger)
+            if dsCache is not None and len(cachedIndices) == ds.sizes['Time']:
+                dsTimeSeries[hemisphere] = dsCache
+                continue
+
+            missingIndices = numpy.setdiff1d(numpy.arange(ds.sizes['Time']),
+                                             cachedIndices)
+            dsMissing = ds.isel(Time=missingIndices)
+
             if hemisphere == 'NH':
                 mask = dsMesh.latCell > 0
             else:
                 mask = dsMesh.latCell < 0
 
-            dsAreaSum = (ds.where(mask)*dsMesh.areaCell).sum('nCells')
+            dsAreaSum = (dsMissing.where(mask)*dsMesh.areaCell).sum('nCells')
             dsAreaSum = dsAreaSum.rename(
                     {'timeMonthly_avg_iceAreaCell': 'iceArea',
                      'timeMonthly_avg_iceVolumeCell': 'iceVolume'})
@@ -644,6 +662,11 @@ class TimeSeriesSeaIce(AnalysisTask):
             dsAreaSum['iceThickness'].attrs['description'] = \
                 'Mean {} sea ice volume'.format(hemisphere)
 
+            if dsCache is not None and len(cachedIndices) > 0:
+                dsAreaSum = xr.concat([dsCache, dsAreaSum], dim='Time')
+                dsAreaSum = dsAreaSum.isel(
+                    Time=numpy.argsort(dsAreaSum.Time.values))
+
             dsTimeSeries[hemisphere] = dsAreaSum
 
             write_netcdf(dsAreaSum, outFileNames[hemisphere])
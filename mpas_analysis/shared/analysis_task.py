@@ -27,6 +27,7 @@ import sys
 from mpas_analysis.shared.io import NameList, StreamsFile
 from mpas_analysis.shared.io.utility import build_config_full_path, \
     make_directories
+from mpas_analysis.shared.io.dask_execution import dask_scheduler
 
 
 class AnalysisTask(Process):  # {{{
@@ -88,11 +89,18 @@ class AnalysisTask(Process):  # {{{
 
     logger : ``logging.Logger``
         A logger for output during the run phase of an analysis task
+
+    plotOnly : bool
+        Whether the task only produces plots from files written by its
+        prerequisites, so that it can be run by a long-lived plot worker in
+        parallel mode rather than in its own process
     '''
     # Authors
     # -------
     # Xylar Asay-Davis
 
+    plotOnly = False
+
     # flags for run status
     UNSET = 0
     READY = 1
@@ -317,7 +325,8 @@ class AnalysisTask(Process):  # {{{
 
         startTime = time.time()
         try:
-            self.run_task()
+            with dask_scheduler(self.config):
+                self.run_task()
             self._runStatus.value = AnalysisTask.SUCCESS
         except (Exception, BaseException) as e:
             if isinstance(e, KeyboardInterrupt):
@@ -338,7 +347,9 @@ class AnalysisTask(Process):  # {{{
             sys.stderr = oldStderr
 
         # remove the handlers from the logger (probably only necessary if
-        # writeLogFile==False)
+        # writeLogFile==False), closing the log file in case this process
+        # goes on to run other tasks
+        handler.close()
         self.logger.handlers = []
 
         # }}}
@@ -31,6 +31,8 @@ from functools import partial
 import resource
 
 from mpas_analysis.shared.mpas_xarray import mpas_xarray
+from mpas_analysis.shared.io.dask_execution import get_task_memory_limit, \
+    get_task_thread_count
 from mpas_analysis.shared.timekeeping.utility import \
     string_to_days_since_date, days_to_datetime
 
@@ -104,12 +106,14 @@ def open_multifile_dataset(fileNames, calendar, config,
         If present, the first and last dates to be used in the data set.  The
         time variable is sliced to only include dates within this range.
 
-    chunking : None, int, True, dict, optional
+    chunking : None, int, True, dict, ``'auto'``, optional
         If integer is present, applies maximum chunk size from config file
         value ``maxChunkSize``, otherwise if None do not perform chunking.  If
-        True, use automated chunking using default config value
-        ``maxChunkSize``. If chunking is a dict use dictionary values for
-        chunking.
+        True, use the chunking given by the config option ``chunkingMode``:
+        either ``maxChunkSize`` or ``'auto'``. If chunking is a dict use
+        dictionary values for chunking.  If ``'auto'``, chunk sizes along
+        ``Time`` and ``nCells`` are determined from the size of the mesh and
+        the memory available to each task.
 
     Returns
     -------
@@ -196,10 +200,22 @@ def open_multifile_dataset(fileNames, calendar, config,
                              days_to_datetime(endDate, calendar=calendar)))
     # process chunking
     if chunking is True:
-        # limit chunk size to prevent memory error
-        chunking = config.getint('input', 'maxChunkSize')
+        chunkingMode = config.getWithDefault('input', 'chunkingMode',
+                                             'maxChunkSize')
+        if chunkingMode == 'auto':
+            chunking = 'auto'
+        else:
+            # limit chunk size to prevent memory error
+            chunking = config.getint('input', 'maxChunkSize')
+
+    memoryLimit = None
+    threadCount = 1
+    if chunking == 'auto':
+        memoryLimit = get_task_memory_limit(config)
+        threadCount = get_task_thread_count(config)
 
-    ds = mpas_xarray.process_chunking(ds, chunking)
+    ds = mpas_xarray.process_chunking(ds, chunking, memoryLimit=memoryLimit,
+                                      threadCount=threadCount)
 
     # private record of autoclose use
     ds.attrs['_autoclose'] = int(autoclose)
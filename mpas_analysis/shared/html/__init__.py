@@ -1,3 +1,4 @@
 from mpas_analysis.shared.html.pages import MainPage, ComponentPage, \
     generate_html
-from mpas_analysis.shared.html.image_xml import write_image_xml
+from mpas_analysis.shared.html.image_xml import write_image_xml, \
+    generate_thumbnails, collect_provenance
@@ -15,14 +15,19 @@ from __future__ import absolute_import, division, print_function, \
 import os
 import sys
 import shutil
+import multiprocessing
 import socket
 import subprocess
 import datetime
+from collections import OrderedDict
 from lxml import etree
 from PIL import Image
 
 from mpas_analysis.shared.io.utility import build_config_full_path
 
+# the provenance of this run, collected once (see collect_provenance())
+_provenance = None
+
 
 def write_image_xml(config, filePrefix, componentName, componentSubdirectory,
                     galleryGroup, groupLink, groupSubtitle=None, gallery=None,
@@ -30,8 +35,9 @@ def write_image_xml(config, filePrefix, componentName, componentSubdirectory,
                     imageCaption='', history=None, **kwargs):
     """
     Create an xml file describing the give plot, used to create a webpage
-    including that plot and also to store provenance.  Also copies the image
-    to the html subdirectory and generates thumbnails.
+    including that plot and also to store provenance.  The image is copied
+    to the html subdirectory and thumbnails are generated later, by
+    ``generate_thumbnails()``.
 
     Parameters
     ----------
@@ -118,22 +124,10 @@ def write_image_xml(config, filePrefix, componentName, componentSubdirectory,
 
     generateHTML = config.getboolean('html', 'generate')
     if generateHTML:
-        htmlBaseDirectory = build_config_full_path(config, 'output',
-                                                   'htmlSubdirectory')
-        componentDirectory = '{}/{}'.format(htmlBaseDirectory,
-                                            componentSubdirectory)
-        try:
-            os.makedirs('{}/thumbnails'.format(componentDirectory))
-        except OSError:
-            pass
-
-        plotsDirectory = build_config_full_path(config, 'output',
-                                                'plotsSubdirectory')
-        shutil.copyfile('{}/{}'.format(plotsDirectory, imageFileName),
-                        '{}/{}'.format(componentDirectory, imageFileName))
-
-        imageSize, orientation = _generate_thumbnails(imageFileName,
-                                                      componentDirectory)
+        # the image is copied and thumbnails are generated for all images at
+        # once when the webpage is generated (see generate_thumbnails())
+        imageSize, orientation = _get_size_and_orientation(
+            '{}/{}'.format(plotsDirectory, imageFileName))
 
         etree.SubElement(root, "imageSize").text = \
             '{}x{}'.format(imageSize[0], imageSize[1])
@@ -148,6 +142,46 @@ def write_image_xml(config, filePrefix, componentName, componentSubdirectory,
     tree.write(xmlFileName, xml_declaration=True, pretty_print=True)
 
 
+def collect_provenance():  # {{{
+    """
+    Collect the provenance of this run of MPAS-Analysis (the command, working
+    directory, user, host and git hash) that is added to the XML file for
+    each plot.  The provenance is only collected once per process.  Calling
+    this function before tasks are launched means that all tasks share the
+    provenance of the main process, rather than each having to run ``git``.
+
+    Returns
+    -------
+    provenance : ``OrderedDict``
+        The command-line call and the text of the ``cwd``, ``user``, ``host``
+        and ``githash`` tags
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    global _provenance
+
+    if _provenance is None:
+        p = subprocess.Popen(['git', 'describe', '--always', '--dirty'],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = p.communicate()
+        stdout = stdout.decode('utf-8')
+        if p.returncode == 0:
+            githash = stdout.strip('\n')
+        else:
+            githash = 'git hash unavailable'
+
+        _provenance = OrderedDict()
+        _provenance['call'] = ' '.join(sys.argv)
+        _provenance['cwd'] = os.getcwd()
+        _provenance['user'] = os.getenv('USER')
+        _provenance['host'] = socket.gethostname()
+        _provenance['githash'] = githash
+
+    return _provenance  # }}}
+
+
 def _provenance_command(root, history):  # {{{
     """
     Utility funciton for provenance of xml file associated with a plot.
@@ -156,7 +190,9 @@ def _provenance_command(root, history):  # {{{
     # -------
     # Xylar Asay-Davis
 
-    call = ' '.join(sys.argv)
+    provenance = collect_provenance()
+
+    call = provenance['call']
     if history is None:
         history = call
     else:
@@ -164,23 +200,135 @@ def _provenance_command(root, history):  # {{{
         history = call + '; ' + history
     etree.SubElement(root, 'history').text = history
 
-    etree.SubElement(root, 'cwd').text = os.getcwd()
-    etree.SubElement(root, 'user').text = os.getenv('USER')
+    etree.SubElement(root, 'cwd').text = provenance['cwd']
+    etree.SubElement(root, 'user').text = provenance['user']
     etree.SubElement(root, 'curtime').text = \
         datetime.datetime.now().strftime('%m/%d/%y %H:%M')
 
-    etree.SubElement(root, 'host').text = socket.gethostname()
+    etree.SubElement(root, 'host').text = provenance['host']
 
-    p = subprocess.Popen(['git', 'describe', '--always', '--dirty'],
-                         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout, stderr = p.communicate()
-    stdout = stdout.decode('utf-8')
-    if p.returncode == 0:
-        githash = stdout.strip('\n')
+    etree.SubElement(root, 'githash').text = provenance['githash']  # }}}
+
+
+def generate_thumbnails(config, images, processCount=None):  # {{{
+    """
+    Copy images to the html subdirectory and generate their thumbnails, in
+    parallel with up to ``processCount`` processes.  Images that have
+    not changed since they were last copied and whose thumbnails are up to
+    date are skipped.
+
+    Parameters
+    ----------
+    config : ``MpasAnalysisConfigParser`` object
+        contains config options
+
+    images : list of tuple of str
+        The file name (without path) of each image in the plots subdirectory
+        and the name of the subdirectory of the component page it belongs to
+
+    processCount : int, optional
+        The maximum number of processes to use, ``parallelTaskCount`` by
+        default
+
+    Returns
+    -------
+    updateCount : int
+        The number of images that were copied and had their thumbnails
+        (re)generated
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    plotsDirectory = build_config_full_path(config, 'output',
+                                            'plotsSubdirectory')
+    htmlBaseDirectory = build_config_full_path(config, 'output',
+                                               'htmlSubdirectory')
+
+    args = []
+    for imageFileName, componentSubdirectory in images:
+        componentDirectory = '{}/{}'.format(htmlBaseDirectory,
+                                            componentSubdirectory)
+        try:
+            os.makedirs('{}/thumbnails'.format(componentDirectory))
+        except OSError:
+            pass
+        args.append((plotsDirectory, imageFileName, componentDirectory))
+
+    if processCount is None:
+        processCount = config.getint('execute', 'parallelTaskCount')
+    processCount = min(processCount, len(args))
+    if processCount > 1:
+        pool = multiprocessing.Pool(processCount)
+        try:
+            updated = pool.map(_update_image, args, chunksize=8)
+        finally:
+            pool.close()
+            pool.join()
     else:
-        githash = 'git hash unavailable'
+        updated = [_update_image(arg) for arg in args]
 
-    etree.SubElement(root, 'githash').text = githash  # }}}
+    return sum(updated)  # }}}
+
+
+def _update_image(args):  # {{{
+    """
+    Copy an image to the directory of its component page and generate its
+    thumbnails unless the copy and thumbnails are already up to date.
+    Returns whether the image was updated.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    plotsDirectory, imageFileName, componentDirectory = args
+
+    sourceFileName = '{}/{}'.format(plotsDirectory, imageFileName)
+    imageFileNames = ['{}/{}'.format(componentDirectory, imageFileName),
+                      '{}/thumbnails/{}'.format(componentDirectory,
+                                                imageFileName),
+                      '{}/thumbnails/fixed_{}'.format(componentDirectory,
+                                                      imageFileName)]
+
+    if not os.path.exists(sourceFileName):
+        # the image is missing, like its XML file would be
+        return False
+
+    # the copy and the thumbnails are given the modification time of the
+    # source, so they are up to date if their modification times match
+    sourceStat = os.stat(sourceFileName)
+    upToDate = all([os.path.exists(fileName) and
+                    os.path.getmtime(fileName) == sourceStat.st_mtime
+                    for fileName in imageFileNames])
+    if upToDate and os.path.getsize(imageFileNames[0]) == sourceStat.st_size:
+        return False
+
+    shutil.copy2(sourceFileName, imageFileNames[0])
+    _generate_thumbnails(imageFileName, componentDirectory)
+    for fileName in imageFileNames[1:]:
+        os.utime(fileName, (sourceStat.st_atime, sourceStat.st_mtime))
+    return True  # }}}
+
+
+def _get_size_and_orientation(imageFileName):  # {{{
+    """
+    Get the size of an image and whether it is displayed as a vertical or
+    horizontal thumbnail, reading only the header of the image file
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    image = Image.open(imageFileName)
+    imageSize = image.size
+    image.close()
+
+    if imageSize[0] < imageSize[1]:
+        orientation = 'vert'
+    else:
+        orientation = 'horiz'
+
+    return imageSize, orientation  # }}}
 
 
 def _generate_thumbnails(imageFileName, directory):
@@ -208,7 +356,7 @@ def _generate_thumbnails(imageFileName, directory):
     # first, make a thumbnail with the same aspect ratio
     factor = image.size[1]/float(thumbnailHeight)
     size = [int(dim/factor + 0.5) for dim in image.size]
-    thumbnail = image.resize(size, Image.ANTIALIAS)
+    thumbnail = _resize(image, size)
     thumbnail.save('{}/{}'.format(thumbnailDir, imageFileName))
 
     # second, make a thumbnail with a fixed size
@@ -217,7 +365,7 @@ def _generate_thumbnails(imageFileName, directory):
 
     factor = min(widthFactor, heightFactor)
     size = [int(dim/factor + 0.5) for dim in image.size]
-    thumbnail = image.resize(size, Image.ANTIALIAS)
+    thumbnail = _resize(image, size)
 
     if widthFactor <= heightFactor:
         # crop out the top of the thumbnail
@@ -235,4 +383,22 @@ def _generate_thumbnails(imageFileName, directory):
     return imageSize, orientation
 
 
+def _resize(image, size):  # {{{
+    """
+    Downscale an image with a Lanczos filter.  Where supported (Pillow 7.0
+    and newer), the image is first reduced by an integer factor with a fast
+    box filter, leaving the Lanczos filter only the last factor of 3 or less,
+    which gives nearly the same result much faster for large images.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    try:
+        return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+    except TypeError:
+        # reducing_gap is not supported
+        return image.resize(size, Image.LANCZOS)  # }}}
+
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -12,6 +12,9 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import os
+import json
+import hashlib
 import pkg_resources
 from os import makedirs
 from shutil import copyfile
@@ -19,12 +22,19 @@ from lxml import etree
 from collections import OrderedDict
 
 from mpas_analysis.shared.io.utility import build_config_full_path
+from mpas_analysis.shared.html.image_xml import generate_thumbnails
 
 
-def generate_html(config, analyses, refConfig=None):  # {{{
+def generate_html(config, analyses, refConfig=None, inProgress=False):  # {{{
     """
     Generates webpages for diplaying the plots from each analysis task
 
+    The webpages are generated incrementally: the contents of the XML file
+    for each image are kept in an index in the HTML directory along with the
+    time the file was modified, so only new or modified XML files are parsed,
+    and a component page is only written if its images have changed since it
+    was last written.
+
     Parameters
     ----------
     config : ``MpasAnalysisConfigParser``
@@ -39,6 +49,11 @@ def generate_html(config, analyses, refConfig=None):  # {{{
     refConfig : ``MpasAnalysisConfigParser``, optional
         Config options for a reference run
 
+    inProgress : bool, optional
+        Whether analysis tasks are still running, in which case the webpages
+        are updated quietly and thumbnails are generated in serial so as not
+        to compete with the running tasks
+
     """
     # Authors
     # -------
@@ -48,29 +63,54 @@ def generate_html(config, analyses, refConfig=None):  # {{{
     if not generateHTML:
         return
 
-    print("Generating webpage for viewing results...")
+    if not inProgress:
+        print("Generating webpage for viewing results...")
 
     page = MainPage(config, refConfig)
 
     components = OrderedDict()
 
+    index = _read_index(config)
+
     # add images from each analysis task, creating ga dictionary of components
     missingCount = 0
     for analysisTask in analyses.values():
         for fileName in analysisTask.xmlFileNames:
             try:
                 ComponentPage.add_image(fileName, config, components,
-                                        refConfig)
-            except IOError:
+                                        refConfig, index['images'])
+            except (IOError, OSError):
                 missingCount += 1
 
-    if missingCount > 0:
+    if missingCount > 0 and not inProgress:
         print('Warning: {} XML files were missing and the analysis website'
               ' will be incomplete.'.format(missingCount))
-    # generate the page for each component and add the component to the main
-    # page
+
+    # copy the images and generate their thumbnails all at once
+    images = []
+    for component in components.values():
+        for group in component.groups.values():
+            for gallery in group['galleries'].values():
+                for imageFileName in gallery['images']:
+                    images.append((imageFileName, component.subdirectory))
+    if inProgress:
+        processCount = 1
+    else:
+        processCount = None
+    updateCount = generate_thumbnails(config, images, processCount)
+    if not inProgress:
+        print('  Updated thumbnails for {} of {} images'.format(updateCount,
+                                                               len(images)))
+
+    # generate the page for each component whose images have changed and add
+    # the component to the main page
     for componentName, component in components.items():
-        component.generate()
+        signature = component.get_signature()
+        if index['pages'].get(component.subdirectory) != signature or \
+                not os.path.exists('{}/index.html'.format(
+                    component.directory)):
+            component.generate()
+            index['pages'][component.subdirectory] = signature
 
         firstImageFileName = component.get_first_image()
 
@@ -79,7 +119,10 @@ def generate_html(config, analyses, refConfig=None):  # {{{
 
     page.generate()
 
-    print("Done.")
+    _write_index(config, index)
+
+    if not inProgress:
+        print("Done.")
 
     # }}}
 
@@ -330,7 +373,8 @@ class ComponentPage(object):
         self.groups = OrderedDict()
 
     @staticmethod
-    def add_image(xmlFileName, config, components, refConfig=None):
+    def add_image(xmlFileName, config, components, refConfig=None,
+                  imageIndex=None):
         """
         Add the image to the appropriate component.  Note: this is a static
         method because we do not know which component to add the image to
@@ -352,49 +396,50 @@ class ComponentPage(object):
 
         refConfig : ``MpasAnalysisConfigParser``, optional
             Config options for a reference run
+
+        imageIndex : dict, optional
+            The contents of previously parsed XML files and the times the
+            files were modified, with the XML file names as keys.  The XML
+            file is only parsed if it isn't in the index or has been modified
+            since, in which case it is added to the index.
         """
         # Authors
         # -------
         # Xylar Asay-Davis
 
-        xmlRoot = etree.parse(xmlFileName).getroot()
+        if imageIndex is None:
+            imageIndex = {}
+
+        # only parse the XML file if it has changed since it was indexed
+        modifiedTime = os.path.getmtime(xmlFileName)
+        entry = imageIndex.get(xmlFileName)
+        if entry is None or entry['modifiedTime'] != modifiedTime:
+            entry = {'modifiedTime': modifiedTime,
+                     'metadata': ComponentPage._read_image_xml(xmlFileName)}
+            imageIndex[xmlFileName] = entry
+        metadata = entry['metadata']
 
-        componentName = ComponentPage._get_required_xml_text(xmlRoot,
-                                                             'componentName',
-                                                             xmlFileName)
-        componentSubdirectory = ComponentPage._get_required_xml_text(
-                xmlRoot, 'componentSubdirectory', xmlFileName)
-
-        imageFileName = ComponentPage._get_required_xml_text(xmlRoot,
-                                                             'imageFileName',
-                                                             xmlFileName)
-        groupName = ComponentPage._get_required_xml_text(xmlRoot,
-                                                         'galleryGroup',
-                                                         xmlFileName)
-        groupLink = ComponentPage._get_required_xml_text(xmlRoot,
-                                                         'groupLink',
-                                                         xmlFileName)
+        componentName = metadata['componentName']
+        imageFileName = metadata['imageFileName']
+        groupName = metadata['galleryGroup']
 
         if componentName not in components:
-            components[componentName] = ComponentPage(config, componentName,
-                                                      componentSubdirectory,
-                                                      refConfig)
+            components[componentName] = ComponentPage(
+                config, componentName, metadata['componentSubdirectory'],
+                refConfig)
 
         component = components[componentName]
 
         if groupName not in component.groups:
             component.groups[groupName] = {'galleries': OrderedDict(),
-                                           'link': groupLink}
+                                           'link': metadata['groupLink']}
             group = component.groups[groupName]
-            node = xmlRoot.find('groupSubtitle')
-            if node is not None:
-                group['subtitle'] = node.text
+            if metadata['groupSubtitle'] is not None:
+                group['subtitle'] = metadata['groupSubtitle']
 
-        node = xmlRoot.find('gallery')
-        if node is None:
+        galleryName = metadata['gallery']
+        if galleryName is None:
             galleryName = 'None'
-        else:
-            galleryName = node.text
 
         galleries = component.groups[groupName]['galleries']
         if galleryName not in galleries:
@@ -409,11 +454,28 @@ class ComponentPage(object):
         image = images[imageFileName]
         for tag in ['thumbnailDescription', 'imageDescription',
                     'imageCaption', 'imageSize', 'orientation']:
-            node = xmlRoot.find(tag)
-            if node is None or node.text is None:
-                image[tag] = ''
-            else:
-                image[tag] = node.text
+            image[tag] = metadata[tag]
+
+    def get_signature(self):
+        """
+        Get a signature of the contents of the component page, which only
+        changes if the images on the page (or their descriptions) change
+
+        Returns
+        -------
+        signature : str
+            A hash of the gallery groups and run names
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        runNames = [self.config.get('runs', 'mainRunName')]
+        if self.refConfig is not None:
+            runNames.append(self.refConfig.get('runs', 'mainRunName'))
+
+        contents = json.dumps([self.name, runNames, self.groups])
+        return hashlib.md5(contents.encode('utf-8')).hexdigest()
 
     def generate(self):
         """
@@ -485,6 +547,34 @@ class ComponentPage(object):
                           '{} entry'.format(fileName, tag))
         return node.text
 
+    @staticmethod
+    def _read_image_xml(xmlFileName):
+        """read the contents of the XML file describing an image"""
+        xmlRoot = etree.parse(xmlFileName).getroot()
+
+        metadata = OrderedDict()
+        for tag in ['componentName', 'componentSubdirectory',
+                    'imageFileName', 'galleryGroup', 'groupLink']:
+            metadata[tag] = ComponentPage._get_required_xml_text(
+                xmlRoot, tag, xmlFileName)
+
+        for tag in ['groupSubtitle', 'gallery']:
+            node = xmlRoot.find(tag)
+            if node is None:
+                metadata[tag] = None
+            else:
+                metadata[tag] = node.text
+
+        for tag in ['thumbnailDescription', 'imageDescription',
+                    'imageCaption', 'imageSize', 'orientation']:
+            node = xmlRoot.find(tag)
+            if node is None or node.text is None:
+                metadata[tag] = ''
+            else:
+                metadata[tag] = node.text
+
+        return metadata
+
     def _generate_image_text(self, imageFileName, imageDict):
         """fill in the template for a given image with the desired content"""
         replacements = {'@imageFileName': imageFileName}
@@ -569,6 +659,45 @@ class ComponentPage(object):
         return quickLinkText
 
 
+def _get_index_file_name(config):
+    """
+    the name of the file indexing the contents of the XML files and the
+    component pages
+    """
+    htmlBaseDirectory = build_config_full_path(config, 'output',
+                                               'htmlSubdirectory')
+    return '{}/.index.json'.format(htmlBaseDirectory)
+
+
+def _read_index(config):
+    """
+    read the index of XML files and component pages from the last time the
+    webpages were generated, if any
+    """
+    index = {'images': {}, 'pages': {}}
+    indexFileName = _get_index_file_name(config)
+    if os.path.exists(indexFileName):
+        try:
+            with open(indexFileName, 'r') as indexFile:
+                index.update(json.load(indexFile))
+        except ValueError:
+            # the index is corrupt, so it's as if there weren't one
+            pass
+    return index
+
+
+def _write_index(config, index):
+    """
+    write out the index of XML files and component pages, replacing the old
+    index all at once so it is never seen partially written
+    """
+    indexFileName = _get_index_file_name(config)
+    tempFileName = '{}.{}'.format(indexFileName, os.getpid())
+    with open(tempFileName, 'w') as indexFile:
+        json.dump(index, indexFile)
+    os.rename(tempFileName, indexFileName)
+
+
 def _replace_tempate_text(template, replacements):
     """
     replace substrings in a given template based on a dictionary of
@@ -1,3 +1,4 @@
 from mpas_analysis.shared.interpolation.remapper import Remapper
 
-from mpas_analysis.shared.interpolation.interp_1d import interp_1d
+from mpas_analysis.shared.interpolation.interp_1d import interp_1d, \
+    compute_interp_1d_weights
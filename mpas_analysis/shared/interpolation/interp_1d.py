@@ -16,7 +16,7 @@ import xarray
 
 
 def interp_1d(ds, inInterpDim, inInterpCoord, outInterpDim,
-              outInterpCoord):  # {{{
+              outInterpCoord, weights=None):  # {{{
     """
     Interpolate 1D or 2D fields in 1D
 
@@ -32,13 +32,20 @@ def interp_1d(ds, inInterpDim, inInterpCoord, outInterpDim,
     inInterpCoord, outInterpCoord : str
         The name of the coordinates to interpolate from and to.  Each
         of these can be 1D (vertical) or 2D fields
+
+    weights : tuple, optional
+        Interpolation weights from ``compute_interp_1d_weights()`` for the
+        same coordinates (e.g. for another data set on the same grid).  If
+        not supplied, the weights are computed from ``ds``.
     """
     # Authors
     # -------
     # Xylar Asay-Davis
 
-    indices, weight0 = _compute_weights_and_indices(
-            ds, inInterpDim, inInterpCoord, outInterpDim, outInterpCoord)
+    if weights is None:
+        weights = compute_interp_1d_weights(ds, inInterpDim, inInterpCoord,
+                                            outInterpDim, outInterpCoord)
+    indices, weight0 = weights
 
     # conert coords to normal data variables
     coords = list(ds.coords)
@@ -52,10 +59,46 @@ def interp_1d(ds, inInterpDim, inInterpCoord, outInterpDim,
     return ds  # }}}
 
 
+def compute_interp_1d_weights(ds, inInterpDim, inInterpCoord, outInterpDim,
+                              outInterpCoord):  # {{{
+    """
+    Compute the weights for 1D interpolation with ``interp_1d()``, so they
+    can be reused for several data sets with the same coordinates
+
+    Parameters
+    ----------
+    ds : ``xarray.Dataset```
+        A data set containing the coordinates to interpolate from and to
+
+    inInterpDim, outInterpDim : str
+        The name of the dimensions to interpolate before and after
+        interpolation
+
+    inInterpCoord, outInterpCoord : str
+        The name of the coordinates to interpolate from and to.  Each
+        of these can be 1D (vertical) or 2D fields
+
+    Returns
+    -------
+    weights : tuple
+        The indices and weights to pass to ``interp_1d()``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    return _compute_weights_and_indices(ds, inInterpDim, inInterpCoord,
+                                        outInterpDim, outInterpCoord)  # }}}
+
+
 def _compute_weights_and_indices(ds, inInterpDim, inInterpCoord, outInterpDim,
                                  outInterpCoord):  # {{{
     """
     add interpolation weights and indices to the data set
+
+    If the input coordinate is the same for all points and monotonic, the
+    indices are found with ``searchsorted``.  Otherwise, each interval of the
+    input coordinate is searched for all output points at once.
     """
 
     xIn = ds[inInterpCoord]
@@ -68,7 +111,6 @@ def _compute_weights_and_indices(ds, inInterpDim, inInterpCoord, outInterpDim,
     outAxis = outDims.index(outInterpDim)
 
     inInterpSize = ds.sizes[inInterpDim]
-    outInterpSize = ds.sizes[outInterpDim]
 
     xIn = xIn.values
     xOut = xOut.values
@@ -113,46 +155,47 @@ def _compute_weights_and_indices(ds, inInterpDim, inInterpCoord, outInterpDim,
     xIn = xIn.reshape(shape)
 
     inAxis = allInDims.index(inInterpDim)
-    outAxis = allOutDims.index(outInterpDim)
 
     indexArrays = numpy.indices(outSizes, int)
     indices = {}
     for index, dim in enumerate(allInDims):
         indices[dim] = indexArrays[index]
     index0 = indices[inInterpDim]
-    index0[:] = -1
-
-    weight0 = numpy.nan*numpy.ones(outSizes)
 
-    for outIndex in range(outInterpSize):
-        outInd = [slice(None)]*xOut.ndim
-        outInd[outAxis] = outIndex
-        x = xOut[outInd]
+    if xIn.size == inInterpSize:
+        sign = _get_monotonic_sign(xIn.ravel())
+    else:
+        sign = 0
+
+    if sign != 0:
+        # the same input coordinate for all points, so we can find the
+        # indices by bisection
+        index0[:], weight0 = _compute_weights_and_indices_1d(
+            xIn.ravel(), xOut, sign, outSizes)
+    else:
+        index0[:] = -1
+        weight0 = numpy.nan*numpy.ones(outSizes)
+
+        # find the interval containing each output point, one input interval
+        # at a time for all output points at once.  Later intervals take
+        # precedence if a point is in more than one interval.
         for inIndex in range(inInterpSize-1):
-            ind0 = [slice(None)]*xIn.ndim
-            ind0[inAxis] = inIndex
-            x0 = xIn[ind0]
-            ind1 = [slice(None)]*xIn.ndim
-            ind1[inAxis] = inIndex+1
-            x1 = xIn[ind1]
+            x0 = numpy.take(xIn, [inIndex], axis=inAxis)
+            x1 = numpy.take(xIn, [inIndex+1], axis=inAxis)
             dx = x1 - x0
-            frac = (x - x0)/dx
-            valid = numpy.isfinite(frac)
-            mask = numpy.zeros(valid.shape, bool)
-            mask[valid] = numpy.logical_and(frac[valid] >= 0.,
-                                            frac[valid] < 1.)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                frac = numpy.broadcast_to((xOut - x0)/dx, outSizes)
+                # comparisons with NaN are false, so invalid fractions are
+                # excluded
+                mask = numpy.logical_and(frac >= 0., frac < 1.)
             if inIndex == inInterpSize-2:
-                mask = numpy.logical_or(mask, x == x1)
-            if numpy.count_nonzero(mask) == 0:
+                mask = numpy.logical_or(
+                    mask, numpy.broadcast_to(xOut == x1, outSizes))
+            if not numpy.any(mask):
                 continue
 
-            localIndex = index0[outInd]
-            localIndex[mask] = inIndex
-            index0[outInd] = localIndex
-
-            localWeight = weight0[outInd]
-            localWeight[mask] = 1. - frac[mask]
-            weight0[outInd] = localWeight
+            index0[mask] = inIndex
+            weight0[mask] = 1. - frac[mask]
 
     for dim in indices:
         indices[dim] = xarray.DataArray(indices[dim], dims=allOutDims)
@@ -161,6 +204,45 @@ def _compute_weights_and_indices(ds, inInterpDim, inInterpCoord, outInterpDim,
     return indices, weight0  # }}}
 
 
+def _get_monotonic_sign(xIn):  # {{{
+    """
+    Get 1 if ``xIn`` is finite and strictly increasing, -1 if it is finite and
+    strictly decreasing and 0 otherwise
+    """
+    if len(xIn) < 2 or not numpy.all(numpy.isfinite(xIn)):
+        return 0
+    dx = numpy.diff(xIn)
+    if numpy.all(dx > 0.):
+        return 1
+    elif numpy.all(dx < 0.):
+        return -1
+    else:
+        return 0  # }}}
+
+
+def _compute_weights_and_indices_1d(xIn, xOut, sign, outSizes):  # {{{
+    """
+    Find the indices and weights for a monotonic 1D input coordinate with
+    ``searchsorted``, giving the same results as the search over intervals
+    """
+    inInterpSize = len(xIn)
+
+    # the interval i contains x if xIn[i] <= x < xIn[i+1] (for increasing
+    # xIn), and the last interval also contains its end point
+    index0 = numpy.searchsorted(sign*xIn, sign*xOut, side='right') - 1
+    index0[xOut == xIn[-1]] = inInterpSize-2
+    valid = numpy.logical_and(index0 >= 0, index0 < inInterpSize-1)
+    index0 = numpy.where(valid, index0, -1)
+
+    validIndex = numpy.where(valid, index0, 0)
+    x0 = xIn[validIndex]
+    x1 = xIn[validIndex+1]
+    weight0 = numpy.where(valid, 1. - (xOut - x0)/(x1 - x0), numpy.nan)
+
+    return numpy.broadcast_to(index0, outSizes), \
+        numpy.array(numpy.broadcast_to(weight0, outSizes))  # }}}
+
+
 def _interp_1d_array(da, indices, weight0, inInterpDim):  # {{{
 
     """
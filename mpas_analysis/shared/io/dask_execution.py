@@ -0,0 +1,258 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Utility functions for controlling how dask executes the computations built
+on top of data sets read by MPAS-Analysis: the memory and threads available
+to each task, automatic chunking along ``Time`` and ``nCells`` and the dask
+scheduler used within each task.
+"""
+# Authors
+# -------
+# Xylar Asay-Davis
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+from contextlib import contextmanager
+
+import numpy
+import dask
+
+
+def get_available_memory():  # {{{
+    """
+    Get the amount of memory currently available on this node
+
+    Returns
+    -------
+    availableMemory : int
+        The available memory in bytes
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    # MemAvailable includes reclaimable page cache, which is what we want
+    try:
+        with open('/proc/meminfo') as memInfoFile:
+            for line in memInfoFile:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1])*1024
+    except (IOError, OSError):
+        pass
+
+    return os.sysconf(str('SC_PAGE_SIZE'))*os.sysconf(str('SC_PHYS_PAGES'))
+    # }}}
+
+
+def get_task_memory_limit(config):  # {{{
+    """
+    Get the memory (in bytes) that dask computations in each analysis task
+    are allowed to use, determined from the available memory, the
+    ``daskMemoryFraction`` and ``parallelTaskCount`` config options.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    Returns
+    -------
+    memoryLimit : int
+        The memory limit per task in bytes
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    memoryFraction = _get_option(config, 'execute', 'daskMemoryFraction', 0.5)
+    parallelTaskCount = _get_option(config, 'execute', 'parallelTaskCount', 1)
+
+    memoryLimit = int(memoryFraction*get_available_memory() /
+                      max(parallelTaskCount, 1))
+    return memoryLimit  # }}}
+
+
+def get_task_thread_count(config):  # {{{
+    """
+    Get the number of threads dask uses within each analysis task.  If the
+    ``daskThreads`` config option is 0, the cores on the node are divided
+    evenly between the parallel tasks.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    Returns
+    -------
+    threadCount : int
+        The number of threads per task
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    threadCount = _get_option(config, 'execute', 'daskThreads', 0)
+    if threadCount <= 0:
+        parallelTaskCount = _get_option(config, 'execute',
+                                        'parallelTaskCount', 1)
+        threadCount = multiprocessing.cpu_count()//max(parallelTaskCount, 1)
+
+    return max(threadCount, 1)  # }}}
+
+
+def compute_auto_chunks(ds, memoryLimit, threadCount=1,
+                        chunkDims=('Time', 'nCells'),
+                        memorySafetyFactor=4):  # {{{
+    """
+    Compute chunk sizes along ``Time`` and ``nCells`` so that a chunk of the
+    largest variable in the data set fits comfortably within the memory
+    limit.  Chunks span the full mesh and as many time slices as possible,
+    and are only split along ``nCells`` when a single time slice of the
+    mesh is too large.
+
+    Parameters
+    ----------
+    ds : ``xarray.Dataset``
+        The data set to be chunked
+
+    memoryLimit : int
+        The memory (in bytes) available to dask in this task
+
+    threadCount : int, optional
+        The number of threads dask uses, each of which may hold a chunk in
+        memory at the same time
+
+    chunkDims : tuple of str, optional
+        The time and horizontal dimensions (in that order) to chunk along
+
+    memorySafetyFactor : int, optional
+        The number of copies of each chunk assumed to be in memory at once
+        (inputs, intermediates and outputs of a computation)
+
+    Returns
+    -------
+    chunks : dict
+        The chunk size for each of ``chunkDims`` present in ``ds``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    timeDim, horizDim = chunkDims
+
+    # the size in bytes of a single (time, cell) point of the largest
+    # variable, summed over any other (e.g. vertical) dimensions
+    bytesPerPoint = 1
+    for varName in ds.data_vars:
+        var = ds[varName]
+        if not any([dim in chunkDims for dim in var.dims]):
+            continue
+        otherSize = int(numpy.prod([var.sizes[dim] for dim in var.dims
+                                    if dim not in chunkDims]))
+        bytesPerPoint = max(bytesPerPoint, otherSize*var.dtype.itemsize)
+
+    targetBytes = max(memoryLimit//(threadCount*memorySafetyFactor), 1)
+
+    timeCount = ds.dims.get(timeDim, 1)
+    cellCount = ds.dims.get(horizDim, 1)
+    bytesPerTime = bytesPerPoint*cellCount
+
+    if bytesPerTime <= targetBytes:
+        cellChunk = cellCount
+        timeChunk = min(timeCount, targetBytes//bytesPerTime)
+    else:
+        timeChunk = 1
+        cellChunk = max(targetBytes//bytesPerPoint, 1)
+
+    chunks = {}
+    if timeDim in ds.dims:
+        chunks[timeDim] = int(timeChunk)
+    if horizDim in ds.dims:
+        chunks[horizDim] = int(cellChunk)
+
+    return chunks  # }}}
+
+
+@contextmanager
+def dask_scheduler(config):  # {{{
+    """
+    A context manager that sets the dask scheduler used within an analysis
+    task based on the ``daskScheduler`` config option.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    Raises
+    ------
+    ValueError
+        If ``daskScheduler`` is not one of the supported schedulers
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    scheduler = _get_option(config, 'execute', 'daskScheduler', 'threads')
+    threadCount = get_task_thread_count(config)
+
+    if scheduler == 'threads':
+        pool = ThreadPool(threadCount)
+        try:
+            with dask.config.set(scheduler='threads', pool=pool):
+                yield
+        finally:
+            pool.close()
+    elif scheduler == 'synchronous':
+        with dask.config.set(scheduler='synchronous'):
+            yield
+    elif scheduler == 'distributed':
+        # only imported when needed, since distributed is an optional
+        # dependency
+        from distributed import Client, LocalCluster
+
+        # analysis tasks are daemonic processes, which cannot spawn child
+        # processes, so the cluster's worker runs in this process
+        cluster = LocalCluster(n_workers=1, threads_per_worker=threadCount,
+                               processes=False,
+                               memory_limit=get_task_memory_limit(config))
+        client = Client(cluster)
+        try:
+            yield
+        finally:
+            client.close()
+            cluster.close()
+    else:
+        raise ValueError('Unexpected daskScheduler {}.  Should be one of '
+                         'threads, synchronous or distributed.'.format(
+                             scheduler))
+    # }}}
+
+
+def _get_option(config, section, option, default):  # {{{
+    """
+    Get an option of the same type as ``default``, falling back on the default
+    if the section or option is not present
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if not config.has_section(section):
+        return default
+    return config.getWithDefault(section, option, default)  # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
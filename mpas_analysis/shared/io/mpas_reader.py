@@ -19,12 +19,18 @@ all but a given list of variables from a data set.
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import os
+import re
 import six
 import xarray
+import netCDF4
 
 from mpas_analysis.shared.timekeeping.utility import \
     string_to_days_since_date, days_to_datetime
 
+# a per-process cache of the variable and dimension names in each stream
+_variableCatalogs = {}
+
 
 def open_mpas_dataset(fileName, calendar,
                       timeVariableNames=['xtime_startMonthly',
@@ -71,8 +77,19 @@ def open_mpas_dataset(fileName, calendar,
     # -------
     # Xylar Asay-Davis
 
+    dropVariables = None
+    if variableList is not None:
+        # only the requested variables and the time variables get decoded
+        keepVariables = list(variableList)
+        if timeVariableNames is not None:
+            if isinstance(timeVariableNames, six.string_types):
+                keepVariables.append(timeVariableNames)
+            else:
+                keepVariables.extend(timeVariableNames)
+        dropVariables = _get_drop_variables(fileName, keepVariables)
+
     ds = xarray.open_dataset(fileName, decode_cf=True, decode_times=False,
-                             lock=False)
+                             lock=False, drop_variables=dropVariables)
 
     if timeVariableNames is not None:
         ds = _parse_dataset_time(ds, timeVariableNames, calendar)
@@ -154,6 +171,73 @@ def subset_variables(ds, variableList):  # {{{
     return ds  # }}}
 
 
+def _get_drop_variables(fileName, keepVariables):  # {{{
+    """
+    Get a list of the variables in a file (or rather in all files from the
+    same stream) that are not in ``keepVariables`` and need not be read.
+    Dimension coordinates are always kept.
+
+    Parameters
+    ----------
+    fileName : str
+        File path to read
+
+    keepVariables : list of str
+        The variables that should be read
+
+    Returns
+    -------
+    dropVariables : list of str
+        The variables that can be dropped when opening the file
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    variableNames, dimNames = _get_variable_catalog(fileName)
+    keepVariables = set(keepVariables) | set(dimNames)
+    return [varName for varName in variableNames
+            if varName not in keepVariables]  # }}}
+
+
+def _get_variable_catalog(fileName):  # {{{
+    """
+    Get the names of the variables and dimensions in a file, cached for all
+    files from the same stream.  Files are assumed to belong to the same
+    stream if they are in the same directory and their names differ only in
+    their digits (e.g. the date in
+    ``mpaso.hist.am.timeSeriesStatsMonthly.0001-01-01.nc``).
+
+    Parameters
+    ----------
+    fileName : str
+        File path to read
+
+    Returns
+    -------
+    variableNames : list of str
+        The names of the variables in the file
+
+    dimNames : list of str
+        The names of the dimensions in the file
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    directory, baseName = os.path.split(os.path.abspath(fileName))
+    streamKey = os.path.join(directory, re.sub(r'[0-9]', '#', baseName))
+
+    if streamKey not in _variableCatalogs:
+        # only the header is read, nothing is decoded
+        with netCDF4.Dataset(fileName, 'r') as inFile:
+            variableNames = list(inFile.variables.keys())
+            dimNames = list(inFile.dimensions.keys())
+        _variableCatalogs[streamKey] = (variableNames, dimNames)
+
+    return _variableCatalogs[streamKey]  # }}}
+
+
 def _parse_dataset_time(ds, inTimeVariableName, calendar,
                         outTimeVariableName='Time',
                         referenceDate='0001-01-01'):  # {{{
@@ -0,0 +1,7 @@
+from mpas_analysis.shared.mesh.mesh_cache import get_mesh_variables, \
+    get_derived_mesh_variables, get_mesh_operator, \
+    get_global_lat_bin_operator, get_mesh_cache_directory
+from mpas_analysis.shared.mesh.operators import build_lat_bin_operator, \
+    build_transect_operator, build_edge_divergence_operator
+from mpas_analysis.shared.mesh.rasterizer import MeshRasterizer, \
+    get_mesh_rasterizer, compute_cell_radius
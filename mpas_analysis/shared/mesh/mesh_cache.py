@@ -0,0 +1,381 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+A persistent cache of mesh geometry (e.g. ``areaCell``, ``latCell``,
+``dvEdge``, ``refBottomDepth``, ``maxLevelCell``) extracted from an MPAS
+restart file.  Each variable is extracted only once per mesh into a raw
+``.npy`` file, which every task then maps read-only, so that tasks running in
+parallel share a single copy through the page cache.  Variables derived from
+the mesh (e.g. ``zMid``) and sparse operators built from it (e.g. for binning
+in latitude) are cached alongside so tasks needing them compute them only
+once.
+"""
+# Authors
+# -------
+# Xylar Asay-Davis
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import json
+import tempfile
+import numpy
+import netCDF4
+import xarray
+import scipy.sparse
+
+from mpas_analysis.shared.io.utility import build_config_full_path, \
+    make_directories
+from mpas_analysis.shared.mesh.operators import build_lat_bin_operator
+
+
+def get_mesh_cache_directory(config):  # {{{
+    """
+    Get the directory where mesh geometry for this run's mesh is cached,
+    creating it if it doesn't exist.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    Returns
+    -------
+    cacheDirectory : str
+        The cache directory for the mesh named by ``mpasMeshName``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    # make sure the option is defined for older config files
+    config.getWithDefault('output', 'meshCacheSubdirectory', 'mesh')
+
+    baseDirectory = build_config_full_path(config, 'output',
+                                           'meshCacheSubdirectory')
+    mpasMeshName = config.get('input', 'mpasMeshName')
+
+    return make_directories('{}/{}'.format(baseDirectory, mpasMeshName))
+    # }}}
+
+
+def get_mesh_variables(config, restartFileName, variableList):  # {{{
+    """
+    Get mesh variables from the cache, first extracting any that are not yet
+    cached (or are older than the restart file) from the restart file.
+
+    The variables are memory-mapped read-only, so they should be copied
+    before they are modified.  Variables with a ``Time`` dimension (e.g.
+    ``layerThickness``) are cached at the first time index and have no
+    ``Time`` dimension.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of an MPAS restart file containing the variables
+
+    variableList : list of str
+        The names of the variables to get
+
+    Returns
+    -------
+    dsMesh : ``xarray.Dataset``
+        A data set with the requested variables
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cacheDirectory = get_mesh_cache_directory(config)
+
+    missingVariables = _get_missing_variables(cacheDirectory,
+                                              restartFileName, variableList)
+
+    if len(missingVariables) > 0:
+        _extract_variables(restartFileName, missingVariables, cacheDirectory)
+
+    return _read_variables(cacheDirectory, variableList)  # }}}
+
+
+def get_derived_mesh_variables(config, restartFileName, variableList,
+                               compute_variables):  # {{{
+    """
+    Get variables derived from the mesh (e.g. ``zMid``) from the cache, first
+    computing them with ``compute_variables`` if they are not yet cached (or
+    are older than the restart file).
+
+    As with ``get_mesh_variables()``, the variables are memory-mapped
+    read-only.  Derived variables are cached separately from those extracted
+    from the restart file, so their names need not be distinct from
+    variables in the restart file.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of the MPAS restart file the variables are derived from
+
+    variableList : list of str
+        The names of the variables to get
+
+    compute_variables : function
+        A function with no arguments that returns an ``xarray.Dataset``
+        containing (at least) all the variables in ``variableList``
+
+    Returns
+    -------
+    dsMesh : ``xarray.Dataset``
+        A data set with the requested variables
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cacheDirectory = make_directories('{}/derived'.format(
+        get_mesh_cache_directory(config)))
+
+    missingVariables = _get_missing_variables(cacheDirectory,
+                                              restartFileName, variableList)
+
+    if len(missingVariables) > 0:
+        dsDerived = compute_variables()
+        for variableName in missingVariables:
+            _write_variable(cacheDirectory, variableName,
+                            list(dsDerived[variableName].dims),
+                            dsDerived[variableName].values)
+
+    return _read_variables(cacheDirectory, variableList)  # }}}
+
+
+def get_mesh_operator(config, restartFileName, operatorName,
+                      build_operator):  # {{{
+    """
+    Get a sparse operator on the mesh from the cache, first building it with
+    ``build_operator`` if it is not yet cached (or is older than the restart
+    file).
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of the MPAS restart file the operator is built from
+
+    operatorName : str
+        A name for the operator that is unique to the way it is built (e.g.
+        including the size of latitude bins), so that tasks asking for the
+        same name share the same operator
+
+    build_operator : function
+        A function with no arguments that returns the operator as a
+        ``scipy.sparse`` matrix
+
+    Returns
+    -------
+    operator : ``scipy.sparse.csr_matrix``
+        The operator
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cacheDirectory = get_mesh_cache_directory(config)
+    operatorFileName = '{}/{}.npz'.format(cacheDirectory, operatorName)
+
+    if os.path.exists(operatorFileName) and \
+            os.path.getmtime(operatorFileName) >= \
+            os.path.getmtime(restartFileName):
+        return scipy.sparse.load_npz(operatorFileName).tocsr()
+
+    operator = scipy.sparse.csr_matrix(build_operator())
+    _write_atomic(operatorFileName,
+                  lambda outFile: scipy.sparse.save_npz(outFile, operator))
+    return operator  # }}}
+
+
+def get_global_lat_bin_operator(config, restartFileName,
+                                latBinSize):  # {{{
+    """
+    Get the (cached) operator that integrates a field on cells over global
+    latitude bins, weighting by ``areaCell``.  This operator is shared by the
+    tasks that compute meridional integrals (e.g. the MOC and meridional heat
+    transport).
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of an MPAS restart file containing ``latCell`` and
+        ``areaCell``
+
+    latBinSize : float
+        The size of the latitude bins in degrees
+
+    Returns
+    -------
+    latBins : ``numpy.ndarray``
+        The boundaries of the latitude bins in degrees, from -90 to 90
+
+    operator : ``scipy.sparse.csr_matrix``
+        The operator from ``build_lat_bin_operator()``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    latBins = numpy.arange(-90.0, 90.1, latBinSize)
+
+    def build_operator():
+        dsMesh = get_mesh_variables(config, restartFileName,
+                                    ['latCell', 'areaCell'])
+        return build_lat_bin_operator(numpy.rad2deg(dsMesh.latCell.values),
+                                      latBins,
+                                      weights=dsMesh.areaCell.values)
+
+    operator = get_mesh_operator(
+        config, restartFileName,
+        'globalLatBinOperator_{}deg'.format(repr(float(latBinSize))),
+        build_operator)
+
+    return latBins, operator  # }}}
+
+
+def _extract_variables(restartFileName, variableList,
+                       cacheDirectory):  # {{{
+    """
+    Extract variables from the restart file and write them to the cache.
+    Each file is written under a temporary name and then renamed, so tasks
+    running in parallel never see a partially written file.
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    with netCDF4.Dataset(restartFileName, 'r') as inFile:
+        inFile.set_auto_mask(False)
+        for variableName in variableList:
+            var = inFile.variables[variableName]
+            dims = list(var.dimensions)
+            if len(dims) > 0 and dims[0] == 'Time':
+                array = var[0, ...]
+                dims = dims[1:]
+            else:
+                array = var[...]
+
+            _write_variable(cacheDirectory, variableName, dims, array)
+    # }}}
+
+
+def _get_missing_variables(cacheDirectory, restartFileName,
+                           variableList):  # {{{
+    """
+    Find the variables that are not in the cache or are older than the
+    restart file
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    restartModTime = os.path.getmtime(restartFileName)
+
+    missingVariables = []
+    for variableName in variableList:
+        arrayFileName, dimsFileName = _get_cache_file_names(cacheDirectory,
+                                                            variableName)
+        if not os.path.exists(arrayFileName) or \
+                not os.path.exists(dimsFileName) or \
+                os.path.getmtime(arrayFileName) < restartModTime:
+            missingVariables.append(variableName)
+    return missingVariables  # }}}
+
+
+def _read_variables(cacheDirectory, variableList):  # {{{
+    """
+    Memory-map cached variables read-only into a data set
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    dsMesh = xarray.Dataset()
+    for variableName in variableList:
+        arrayFileName, dimsFileName = _get_cache_file_names(cacheDirectory,
+                                                            variableName)
+        with open(dimsFileName) as dimsFile:
+            dims = tuple(json.load(dimsFile))
+        dsMesh[variableName] = (dims, numpy.load(arrayFileName,
+                                                 mmap_mode='r'))
+
+    return dsMesh  # }}}
+
+
+def _write_variable(cacheDirectory, variableName, dims, array):  # {{{
+    """
+    Write a variable and its dimensions to the cache
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    arrayFileName, dimsFileName = _get_cache_file_names(cacheDirectory,
+                                                        variableName)
+
+    _write_atomic(arrayFileName,
+                  lambda outFile: numpy.save(outFile, array))
+    _write_atomic(dimsFileName,
+                  lambda outFile: outFile.write(
+                      json.dumps(dims).encode('utf-8')))
+    # }}}
+
+
+def _write_atomic(fileName, write):  # {{{
+    """
+    Write to a temporary file in the same directory and then rename it
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    directory = os.path.dirname(fileName)
+    handle, tempFileName = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as outFile:
+            write(outFile)
+        os.rename(tempFileName, fileName)
+    except (Exception, BaseException):
+        if os.path.exists(tempFileName):
+            os.remove(tempFileName)
+        raise
+    # }}}
+
+
+def _get_cache_file_names(cacheDirectory, variableName):  # {{{
+    """
+    Get the names of the array and dimensions files for a cached variable
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    arrayFileName = '{}/{}.npy'.format(cacheDirectory, variableName)
+    dimsFileName = '{}/{}.dims.json'.format(cacheDirectory, variableName)
+    return arrayFileName, dimsFileName  # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
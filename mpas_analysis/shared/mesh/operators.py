@@ -0,0 +1,185 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Sparse operators on the MPAS mesh for aggregating fields into latitude bins,
+taking the divergence of fluxes on edges and integrating them along
+transects.  Each operator is built once and then
+applied (with a sparse matrix product) to every field it is needed for.
+"""
+# Authors
+# -------
+# Xylar Asay-Davis
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+from scipy.sparse import csr_matrix
+
+
+def build_lat_bin_operator(lat, latBins, weights=None, mask=None):  # {{{
+    """
+    Build a sparse matrix that sums a (weighted) field over the mesh elements
+    in each latitude bin
+
+    Parameters
+    ----------
+    lat : ``numpy.ndarray``
+        The latitude of each mesh element (e.g. ``latCell`` in degrees)
+
+    latBins : ``numpy.ndarray``
+        The (increasing) boundaries of the latitude bins in the same units as
+        ``lat``.  Element ``i`` is in bin ``k`` if
+        ``latBins[k] <= lat[i] < latBins[k+1]``.
+
+    weights : ``numpy.ndarray``, optional
+        A weight (e.g. ``areaCell``) for each element, 1 by default
+
+    mask : ``numpy.ndarray``, optional
+        Elements where ``mask`` is not 1 (e.g. outside a region) are excluded
+
+    Returns
+    -------
+    operator : ``scipy.sparse.csr_matrix``
+        A matrix of size ``len(latBins)-1`` by ``len(lat)``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    lat = numpy.asarray(lat)
+    elementCount = len(lat)
+    binCount = len(latBins) - 1
+
+    binIndices = numpy.searchsorted(latBins, lat, side='right') - 1
+    valid = numpy.logical_and(binIndices >= 0, binIndices < binCount)
+    if mask is not None:
+        valid = numpy.logical_and(valid, numpy.asarray(mask) == 1)
+
+    if weights is None:
+        weights = numpy.ones(elementCount)
+
+    elementIndices = numpy.nonzero(valid)[0]
+    operator = csr_matrix(
+        (numpy.asarray(weights, dtype=float)[elementIndices],
+         (binIndices[elementIndices], elementIndices)),
+        shape=(binCount, elementCount))
+    return operator  # }}}
+
+
+def build_transect_operator(transectEdgeGlobalIDs, transectEdgeMaskSigns,
+                            dvEdge):  # {{{
+    """
+    Build a sparse row vector that integrates a field on edges along a
+    transect, taking the sign of each edge relative to the transect into
+    account
+
+    Parameters
+    ----------
+    transectEdgeGlobalIDs : ``numpy.ndarray``
+        The 1-based indices of the edges in the transect, terminated by the
+        first 0 (if any)
+
+    transectEdgeMaskSigns : ``numpy.ndarray``
+        The sign of each edge (over all ``nEdges``) relative to the transect
+
+    dvEdge : ``numpy.ndarray``
+        The length of each edge
+
+    Returns
+    -------
+    operator : ``scipy.sparse.csr_matrix``
+        A matrix of size 1 by ``nEdges``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    transectEdgeGlobalIDs = numpy.asarray(transectEdgeGlobalIDs)
+    edgeCount = len(dvEdge)
+
+    zeroIndices = numpy.nonzero(transectEdgeGlobalIDs == 0)[0]
+    if len(zeroIndices) > 0:
+        transectEdgeGlobalIDs = transectEdgeGlobalIDs[0:zeroIndices[0]]
+
+    # subtract 1 because of python 0-indexing
+    edgeIndices = transectEdgeGlobalIDs.astype(int) - 1
+
+    transectEdgeMaskSigns = numpy.asarray(transectEdgeMaskSigns, dtype=float)
+    dvEdge = numpy.asarray(dvEdge, dtype=float)
+    weights = transectEdgeMaskSigns[edgeIndices]*dvEdge[edgeIndices]
+
+    # duplicate edges are summed, as they would be in a loop over the transect
+    operator = csr_matrix(
+        (weights, (numpy.zeros(len(edgeIndices), int), edgeIndices)),
+        shape=(1, edgeCount))
+    return operator  # }}}
+
+
+def build_edge_divergence_operator(cellsOnEdge, dvEdge,
+                                   areaCell=None):  # {{{
+    """
+    Build a sparse matrix that computes the divergence on cells of a flux
+    (per unit length) normal to each edge
+
+    Parameters
+    ----------
+    cellsOnEdge : ``numpy.ndarray``
+        The 1-based indices of the two cells on each edge, with 0 for
+        edges on the boundary of the mesh.  A positive flux goes from the
+        first cell to the second.
+
+    dvEdge : ``numpy.ndarray``
+        The length of each edge
+
+    areaCell : ``numpy.ndarray``, optional
+        The area of each cell.  If supplied, the divergence is per unit area;
+        otherwise, it is the net flux out of each cell.
+
+    Returns
+    -------
+    operator : ``scipy.sparse.csr_matrix``
+        A matrix of size ``nCells`` by ``nEdges``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    # subtract 1 because of python 0-indexing
+    cellsOnEdge = numpy.asarray(cellsOnEdge).astype(int) - 1
+    dvEdge = numpy.asarray(dvEdge, dtype=float)
+    edgeCount = len(dvEdge)
+    if areaCell is None:
+        cellCount = numpy.amax(cellsOnEdge) + 1
+    else:
+        cellCount = len(areaCell)
+
+    cellIndices = []
+    edgeIndices = []
+    weights = []
+    # the flux leaves the first cell and enters the second
+    for column, sign in zip([0, 1], [1., -1.]):
+        valid = cellsOnEdge[:, column] >= 0
+        cellIndices.append(cellsOnEdge[valid, column])
+        edgeIndices.append(numpy.nonzero(valid)[0])
+        weights.append(sign*dvEdge[valid])
+
+    cellIndices = numpy.concatenate(cellIndices)
+    weights = numpy.concatenate(weights)
+    if areaCell is not None:
+        weights = weights/numpy.asarray(areaCell, dtype=float)[cellIndices]
+
+    operator = csr_matrix(
+        (weights, (cellIndices, numpy.concatenate(edgeIndices))),
+        shape=(cellCount, edgeCount))
+    return operator  # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
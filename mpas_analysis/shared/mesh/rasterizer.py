@@ -0,0 +1,445 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Rasterization of fields on MPAS cells directly to the pixels of an image on
+a longitude/latitude or projection grid, without remapping.
+
+MPAS cells are the Voronoi regions of the cell centers, so the cell covering
+a pixel is the cell whose center is nearest to the pixel.  Pixels are
+assigned to cells with a nearest-neighbor search on the unit sphere, at a
+tiny fraction of the cost of drawing the cell polygons.  A pixel past the
+edge of the mesh (e.g. on land) is still nearest to a cell on the boundary
+of the mesh, so pixels whose nearest cell is on the boundary are also tested
+against the polygon of that cell.  With this test, each pixel is colored
+exactly as if the cell polygons had been drawn.
+"""
+# Authors
+# -------
+# Xylar Asay-Davis
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+import xarray
+from scipy.spatial import cKDTree
+
+from mpas_analysis.shared.mesh.mesh_cache import get_mesh_variables, \
+    get_derived_mesh_variables
+
+# per-process cache of rasterizers, one for each restart file
+_rasterizers = {}
+
+
+class MeshRasterizer(object):  # {{{
+    """
+    Rasterizes fields on MPAS cells to images on arbitrary grids, reusing the
+    assignment of pixels to cells for all fields rasterized to the same grid
+
+    Attributes
+    ----------
+    cellCount : int
+        The number of cells in the mesh
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, latCell, lonCell, cellRadius, latVertex=None,
+                 lonVertex=None, verticesOnCell=None, nEdgesOnCell=None,
+                 cellsOnCell=None):  # {{{
+        """
+        Build the search tree of cell centers
+
+        Parameters
+        ----------
+        latCell, lonCell : ``numpy.ndarray``
+            The latitude and longitude of cell centers in radians
+
+        cellRadius : ``numpy.ndarray``
+            The largest distance (as a chord of the unit sphere) from each
+            cell center to its vertices, see ``compute_cell_radius()``
+
+        latVertex, lonVertex : ``numpy.ndarray``, optional
+            The latitude and longitude of vertices in radians
+
+        verticesOnCell, cellsOnCell : ``numpy.ndarray``, optional
+            The (1-based) indices of the vertices and neighbors of each cell,
+            with neighbor indices outside of the mesh where a cell is on the
+            boundary of the mesh
+
+        nEdgesOnCell : ``numpy.ndarray``, optional
+            The number of vertices of each cell
+
+        If the vertices and neighbors of cells are given, a pixel whose
+        nearest cell is on the boundary of the mesh is only assigned to that
+        cell if it is inside the cell polygon.  Otherwise, pixels closer to
+        the nearest cell center than ``cellRadius`` are assigned to that
+        cell, so the mesh extends by up to about half a cell past its
+        boundary.
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        self.cellCount = len(latCell)
+        self._tree = cKDTree(_lon_lat_to_cartesian(lonCell, latCell))
+        self._cellRadius = numpy.array(cellRadius)
+        self._pixelCells = {}
+
+        if cellsOnCell is None:
+            self._boundaryIndices = None
+            self._edgeNormals = None
+        else:
+            self._boundaryIndices, self._edgeNormals = \
+                _compute_boundary_edge_normals(
+                    latCell, lonCell, latVertex, lonVertex, verticesOnCell,
+                    nEdgesOnCell, cellsOnCell)
+        # }}}
+
+    def get_pixel_cells(self, lon, lat):  # {{{
+        """
+        Find the cell covering each pixel
+
+        Parameters
+        ----------
+        lon, lat : ``numpy.ndarray``
+            The longitude and latitude of pixel centers in degrees
+
+        Returns
+        -------
+        pixelCells : ``numpy.ndarray``
+            The index of the cell covering each pixel, with the same shape as
+            ``lon`` and ``lat``, or -1 where pixels are outside the mesh
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        lon = numpy.deg2rad(lon)
+        lat = numpy.deg2rad(lat)
+        shape = lon.shape
+        lon = lon.ravel()
+        lat = lat.ravel()
+
+        # pixels off the edge of a projection have no longitude and latitude
+        valid = numpy.isfinite(lon + lat)
+        points = _lon_lat_to_cartesian(lon[valid], lat[valid])
+
+        distance, cells = self._tree.query(points)
+        cells[distance > self._cellRadius[cells]] = -1
+
+        if self._edgeNormals is not None:
+            # pixels nearest to a cell on the boundary of the mesh may be
+            # past its edge, so check that they are inside the cell polygon
+            boundaryIndices = numpy.where(cells >= 0,
+                                          self._boundaryIndices[cells], -1)
+            pixels = numpy.nonzero(boundaryIndices >= 0)[0]
+            normals = self._edgeNormals[boundaryIndices[pixels], :, :]
+            inside = numpy.all(
+                numpy.einsum('ijk,ik->ij', normals, points[pixels, :]) >= 0.,
+                axis=1)
+            cells[pixels[numpy.logical_not(inside)]] = -1
+
+        pixelCells = -numpy.ones(lon.shape, dtype=int)
+        pixelCells[valid] = cells
+
+        return pixelCells.reshape(shape)  # }}}
+
+    def get_lon_lat_pixel_cells(self, lonMin, lonMax, latMin, latMax,
+                                nLon, nLat):  # {{{
+        """
+        Find the cell covering each pixel of an image on a longitude/latitude
+        grid.  The result is cached, so rasterizing many fields to the same
+        grid only requires one search.
+
+        Parameters
+        ----------
+        lonMin, lonMax, latMin, latMax : float
+            The edges of the image in degrees
+
+        nLon, nLat : int
+            The number of pixels in each direction
+
+        Returns
+        -------
+        pixelCells : ``numpy.ndarray``
+            The index of the cell covering each pixel (``nLat`` by ``nLon``,
+            starting at ``latMin``), or -1 where pixels are outside the mesh
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        key = ('lonlat', lonMin, lonMax, latMin, latMax, nLon, nLat)
+        if key not in self._pixelCells:
+            lon = _pixel_centers(lonMin, lonMax, nLon)
+            lat = _pixel_centers(latMin, latMax, nLat)
+            lon, lat = numpy.meshgrid(lon, lat)
+            self._pixelCells[key] = self.get_pixel_cells(lon, lat)
+        return self._pixelCells[key]  # }}}
+
+    def get_projection_pixel_cells(self, projection, xMin, xMax, yMin, yMax,
+                                   nx, ny):  # {{{
+        """
+        Find the cell covering each pixel of an image on a projection grid
+        (e.g. polar stereographic).  The result is cached, so rasterizing
+        many fields to the same grid only requires one search.
+
+        Parameters
+        ----------
+        projection : ``pyproj.Proj``
+            The projection
+
+        xMin, xMax, yMin, yMax : float
+            The edges of the image in projection coordinates
+
+        nx, ny : int
+            The number of pixels in each direction
+
+        Returns
+        -------
+        pixelCells : ``numpy.ndarray``
+            The index of the cell covering each pixel (``ny`` by ``nx``,
+            starting at ``yMin``), or -1 where pixels are outside the mesh
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        key = ('projection', projection.srs, xMin, xMax, yMin, yMax, nx, ny)
+        if key not in self._pixelCells:
+            x = _pixel_centers(xMin, xMax, nx)
+            y = _pixel_centers(yMin, yMax, ny)
+            x, y = numpy.meshgrid(x, y)
+            lon, lat = projection(x, y, inverse=True)
+            lon = numpy.where(numpy.abs(lon) < 1e30, lon, numpy.nan)
+            lat = numpy.where(numpy.abs(lat) < 1e30, lat, numpy.nan)
+            self._pixelCells[key] = self.get_pixel_cells(lon, lat)
+        return self._pixelCells[key]  # }}}
+
+    def rasterize(self, field, pixelCells):  # {{{
+        """
+        Rasterize a field on cells
+
+        Parameters
+        ----------
+        field : ``numpy.ndarray`` or ``xarray.DataArray``
+            A field on the cells of the mesh, possibly with NaNs (or masked
+            values) where it is invalid
+
+        pixelCells : ``numpy.ndarray``
+            The cell covering each pixel from ``get_pixel_cells()``,
+            ``get_lon_lat_pixel_cells()`` or ``get_projection_pixel_cells()``
+
+        Returns
+        -------
+        image : ``numpy.ma.MaskedArray``
+            The field at each pixel, masked outside the mesh and where the
+            field is invalid
+        """
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if isinstance(field, xarray.DataArray):
+            field = field.values
+        field = numpy.ma.masked_invalid(field)
+        if field.shape != (self.cellCount,):
+            raise ValueError('The field has shape {} but should be on the {} '
+                             'cells of the mesh'.format(field.shape,
+                                                        self.cellCount))
+
+        outside = pixelCells < 0
+        image = field[numpy.where(outside, 0, pixelCells)]
+        image[outside] = numpy.ma.masked
+        return image  # }}}
+
+    # }}}
+
+
+def get_mesh_rasterizer(config, restartFileName):  # {{{
+    """
+    Get a rasterizer for the mesh, reusing one built earlier in this process
+    if possible.  The radius of each cell is computed once per mesh and
+    cached with the mesh.  Pixels past the edges of cells on the boundary of
+    the mesh are outside the mesh.
+
+    Parameters
+    ----------
+    config :  instance of ``MpasAnalysisConfigParser``
+        Contains configuration options
+
+    restartFileName : str
+        The name of an MPAS restart file with the mesh
+
+    Returns
+    -------
+    rasterizer : ``MeshRasterizer``
+        The rasterizer
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if restartFileName in _rasterizers:
+        return _rasterizers[restartFileName]
+
+    dsMesh = get_mesh_variables(
+        config, restartFileName,
+        ['latCell', 'lonCell', 'latVertex', 'lonVertex', 'verticesOnCell',
+         'nEdgesOnCell', 'cellsOnCell'])
+
+    def compute_variables():
+        cellRadius = compute_cell_radius(
+            dsMesh.latCell.values, dsMesh.lonCell.values,
+            dsMesh.latVertex.values, dsMesh.lonVertex.values,
+            dsMesh.verticesOnCell.values, dsMesh.nEdgesOnCell.values)
+        dsDerived = xarray.Dataset()
+        dsDerived['cellRadius'] = (('nCells',), cellRadius)
+        return dsDerived
+
+    dsDerived = get_derived_mesh_variables(config, restartFileName,
+                                           ['cellRadius'], compute_variables)
+
+    rasterizer = MeshRasterizer(
+        dsMesh.latCell.values, dsMesh.lonCell.values,
+        dsDerived.cellRadius.values, latVertex=dsMesh.latVertex.values,
+        lonVertex=dsMesh.lonVertex.values,
+        verticesOnCell=dsMesh.verticesOnCell.values,
+        nEdgesOnCell=dsMesh.nEdgesOnCell.values,
+        cellsOnCell=dsMesh.cellsOnCell.values)
+    _rasterizers[restartFileName] = rasterizer
+    return rasterizer  # }}}
+
+
+def compute_cell_radius(latCell, lonCell, latVertex, lonVertex,
+                        verticesOnCell, nEdgesOnCell):  # {{{
+    """
+    Compute the largest distance from each cell center to its vertices, as a
+    chord of the unit sphere
+
+    Parameters
+    ----------
+    latCell, lonCell, latVertex, lonVertex : ``numpy.ndarray``
+        The latitude and longitude of cell centers and vertices in radians
+
+    verticesOnCell : ``numpy.ndarray``
+        The (1-based) indices of the vertices of each cell
+
+    nEdgesOnCell : ``numpy.ndarray``
+        The number of vertices of each cell
+
+    Returns
+    -------
+    cellRadius : ``numpy.ndarray``
+        The radius of each cell
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cellPoints = _lon_lat_to_cartesian(lonCell, latCell)
+    vertexPoints = _lon_lat_to_cartesian(lonVertex, latVertex)
+
+    maxEdges = verticesOnCell.shape[1]
+    valid = numpy.arange(maxEdges)[numpy.newaxis, :] < \
+        nEdgesOnCell[:, numpy.newaxis]
+    vertexIndices = numpy.where(valid, verticesOnCell - 1, 0)
+
+    distance = numpy.linalg.norm(
+        vertexPoints[vertexIndices, :] - cellPoints[:, numpy.newaxis, :],
+        axis=2)
+    distance[numpy.logical_not(valid)] = 0.
+
+    return distance.max(axis=1)  # }}}
+
+
+def _compute_boundary_edge_normals(latCell, lonCell, latVertex, lonVertex,
+                                   verticesOnCell, nEdgesOnCell,
+                                   cellsOnCell):  # {{{
+    """
+    Find the cells on the boundary of the mesh and the normals to the great
+    circles through the edges of each, pointing into the cell, so a point is
+    inside a boundary cell if its dot product with every normal is positive
+
+    Returns
+    -------
+    boundaryIndices : ``numpy.ndarray``
+        The index of each cell among the boundary cells, or -1 if the cell is
+        not on the boundary
+
+    edgeNormals : ``numpy.ndarray``
+        The normals to the edges of each boundary cell (``nBoundaryCells``
+        by ``maxEdges`` by 3), zero beyond the edges of the cell
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    nCells = len(latCell)
+    maxEdges = verticesOnCell.shape[1]
+    valid = numpy.arange(maxEdges)[numpy.newaxis, :] < \
+        nEdgesOnCell[:, numpy.newaxis]
+    missing = numpy.logical_or(cellsOnCell < 1, cellsOnCell > nCells)
+    boundaryCells = numpy.nonzero(
+        numpy.any(numpy.logical_and(valid, missing), axis=1))[0]
+    boundaryIndices = -numpy.ones(nCells, dtype=int)
+    boundaryIndices[boundaryCells] = numpy.arange(len(boundaryCells))
+
+    valid = valid[boundaryCells, :]
+    vertexIndices = numpy.where(valid, verticesOnCell[boundaryCells, :] - 1,
+                                0)
+    # the next vertex around each cell, wrapping around after the last
+    nextEdges = (numpy.arange(maxEdges)[numpy.newaxis, :] + 1) % \
+        nEdgesOnCell[boundaryCells, numpy.newaxis]
+    cellIndices = numpy.arange(len(boundaryCells))[:, numpy.newaxis]
+    nextIndices = vertexIndices[cellIndices, nextEdges]
+
+    vertexPoints = _lon_lat_to_cartesian(lonVertex, latVertex)
+    edgeNormals = numpy.cross(vertexPoints[vertexIndices, :],
+                              vertexPoints[nextIndices, :])
+    # point the normals toward the cell center
+    cellPoints = _lon_lat_to_cartesian(lonCell[boundaryCells],
+                                       latCell[boundaryCells])
+    sign = numpy.sign(numpy.einsum('ijk,ik->ij', edgeNormals, cellPoints))
+    edgeNormals *= sign[:, :, numpy.newaxis]
+    edgeNormals[numpy.logical_not(valid), :] = 0.
+
+    return boundaryIndices, edgeNormals  # }}}
+
+
+def _lon_lat_to_cartesian(lon, lat):  # {{{
+    """
+    Convert longitude and latitude in radians to points on the unit sphere
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cosLat = numpy.cos(lat)
+    return numpy.column_stack((cosLat*numpy.cos(lon),
+                               cosLat*numpy.sin(lon),
+                               numpy.sin(lat)))  # }}}
+
+
+def _pixel_centers(edgeMin, edgeMax, count):  # {{{
+    """
+    The centers of ``count`` pixels between ``edgeMin`` and ``edgeMax``
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    edges = numpy.linspace(edgeMin, edgeMax, count + 1)
+    return 0.5*(edges[0:-1] + edges[1:])  # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -20,6 +20,7 @@ from functools import partial
 from mpas_analysis.shared.timekeeping.utility import \
     string_to_days_since_date,  string_to_datetime, days_to_datetime, \
     datetime_to_days
+from mpas_analysis.shared.io.dask_execution import compute_auto_chunks
 
 """
 Utility functions for importing MPAS files into xarray.
@@ -38,7 +39,8 @@ def open_multifile_dataset(fileNames, calendar,
                            simulationStartTime=None,
                            timeVariableName='xtime',
                            variableList=None, selValues=None,
-                           iselValues=None):  # {{{
+                           iselValues=None, chunking=None,
+                           memoryLimit=None, threadCount=1):  # {{{
     """
     Opens and returns an xarray data set given file name(s) and the MPAS
     calendar name.
@@ -87,6 +89,18 @@ def open_multifile_dataset(fileNames, calendar,
             iselValues = {'nVertLevels': slice(0, 3),
                           'nCells': cellIDs}
 
+    chunking : None, int, dict, ``'auto'``, optional
+        How the data set is chunked after it has been opened.  See
+        ``process_chunking()`` for details.
+
+    memoryLimit : int, optional
+        The memory (in bytes) available to dask, required if ``chunking`` is
+        ``'auto'``
+
+    threadCount : int, optional
+        The number of dask threads that may each hold a chunk in memory, used
+        if ``chunking`` is ``'auto'``
+
     Returns
     -------
     ds : ``xarray.Dataset``
@@ -120,6 +134,9 @@ def open_multifile_dataset(fileNames, calendar,
 
     ds = remove_repeated_time_index(ds)
 
+    ds = process_chunking(ds, chunking, memoryLimit=memoryLimit,
+                          threadCount=threadCount)
+
     return ds  # }}}
 
 
@@ -522,7 +539,7 @@ def _parse_dataset_time(ds, inTimeVariableName, calendar,
     return dsOut  # }}}
 
 
-def process_chunking(ds, chunking):  # {{{
+def process_chunking(ds, chunking, memoryLimit=None, threadCount=1):  # {{{
     """
     Computes chunking for a dataset.
 
@@ -531,10 +548,20 @@ def process_chunking(ds, chunking):  # {{{
     ds : ``xarray.Dataset``
         Input dataset to be chunked.
 
-    chunking : None, int, dict
+    chunking : None, int, dict, ``'auto'``
         If chunking is an integer it specifies the maximum chunking rule,
         otherwise if None do not perform chunking.  If a chunking is a dict use
-        dictionary values for chunking.
+        dictionary values for chunking.  If ``'auto'``, chunk sizes along
+        ``Time`` and ``nCells`` are determined from the size of the mesh and
+        ``memoryLimit``.
+
+    memoryLimit : int, optional
+        The memory (in bytes) available to dask, required if ``chunking`` is
+        ``'auto'``
+
+    threadCount : int, optional
+        The number of dask threads that may each hold a chunk in memory, used
+        if ``chunking`` is ``'auto'``
 
     Returns
     -------
@@ -548,9 +575,16 @@ def process_chunking(ds, chunking):  # {{{
     """
     # Authors
     # -------
-    # Phillip J. Wolfram
+    # Phillip J. Wolfram, Xylar Asay-Davis
+
+    if isinstance(chunking, six.string_types) and chunking == 'auto':
+        if memoryLimit is None:
+            raise ValueError('A memoryLimit must be supplied for automatic '
+                             'chunking.')
+        chunks = compute_auto_chunks(ds, memoryLimit, threadCount)
+        ds = ds.chunk(chunks)
 
-    if isinstance(chunking, int):
+    elif isinstance(chunking, int):
         chunks = {}
         for name in ds.chunks.keys():
             chunklim = np.asarray(ds.chunks[name]).max()
@@ -0,0 +1,200 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+'''
+A pool of long-lived worker processes for running tasks that only produce
+plots
+'''
+# Authors
+# -------
+# Xylar Asay-Davis
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+from multiprocessing import Process, Queue, Value
+from six.moves import queue
+
+import matplotlib.pyplot as plt
+
+from mpas_analysis.shared.analysis_task import AnalysisTask
+from mpas_analysis.shared.plot.plotting import _register_custom_colormaps, \
+    _close_figures_except_templates
+
+
+class PlotWorkerPool(object):  # {{{
+    '''
+    A pool of long-lived worker processes that run tasks that only produce
+    plots (those with ``plotOnly = True``).  Each worker sets up the plotting
+    stack (matplotlib fonts, custom colormaps, etc.) once and then runs one
+    task after another, rather than each plot task paying this cost in its
+    own process.  Figure templates are kept open from one task to the next,
+    so a worker plotting several seasons of the same field only lays out the
+    figure once.
+
+    The workers are forked after all tasks have been set up, so each worker
+    has its own copy of every task, exactly as a task started in its own
+    process would.  Tasks are identified by their index in ``analyses``.
+
+    Attributes
+    ----------
+    workers : list of ``multiprocessing.Process``
+        The worker processes
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, analyses, workerCount):  # {{{
+        '''
+        Start the worker processes
+
+        Parameters
+        ----------
+        analyses : OrderedDict of ``AnalysisTask`` objects
+            A dictionary of all analysis tasks that will be run, with
+            (task, subtask) names as keys
+
+        workerCount : int
+            The number of worker processes
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        self._tasks = list(analyses.values())
+        self._taskQueue = Queue()
+        self._doneQueue = Queue()
+
+        self.workers = [self._start_worker() for index in range(workerCount)]
+        # }}}
+
+    def submit(self, analysisTask):  # {{{
+        '''
+        Run a task on the next available worker
+
+        Parameters
+        ----------
+        analysisTask : ``AnalysisTask``
+            A task with ``plotOnly = True``
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        self._taskQueue.put(self._tasks.index(analysisTask))  # }}}
+
+    def get_finished_task(self, timeout=0.1):  # {{{
+        '''
+        Get a task that has finished running on a worker, if any.  If a worker
+        has died while running a task, the task is marked as failed and the
+        worker is replaced.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The time (in seconds) to wait for a task to finish
+
+        Returns
+        -------
+        analysisTask : ``AnalysisTask``
+            A task that has finished, or ``None`` if no task finished
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        try:
+            return self._tasks[self._doneQueue.get(timeout=timeout)]
+        except queue.Empty:
+            pass
+
+        for workerIndex, worker in enumerate(self.workers):
+            if not worker.is_alive():
+                self.workers[workerIndex] = self._start_worker()
+                taskIndex = worker.taskIndex.value
+                if taskIndex >= 0:
+                    analysisTask = self._tasks[taskIndex]
+                    analysisTask._runStatus.value = AnalysisTask.FAIL
+                    return analysisTask
+
+        return None  # }}}
+
+    def close(self):  # {{{
+        '''
+        Stop the worker processes once they have finished their current tasks
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        for worker in self.workers:
+            self._taskQueue.put(None)
+        for worker in self.workers:
+            worker.join()
+        # }}}
+
+    def _start_worker(self):  # {{{
+        '''
+        Start a worker process
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        # the index of the task the worker is running (-1 for none)
+        taskIndex = Value('i', -1)
+        worker = Process(target=_run_worker,
+                         args=(self._tasks, self._taskQueue, self._doneQueue,
+                               taskIndex))
+        worker.taskIndex = taskIndex
+        worker.daemon = True
+        worker.start()
+        return worker  # }}}
+
+    # }}}
+
+
+def _run_worker(tasks, taskQueue, doneQueue, taskIndex):  # {{{
+    '''
+    Set up the plotting stack, then run tasks from the queue until ``None``
+    is received
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    try:
+        _register_custom_colormaps()
+
+        # load the fonts once by rendering some text
+        fig = plt.figure()
+        fig.text(0.5, 0.5, 'MPAS-Analysis')
+        fig.canvas.draw()
+        plt.close('all')
+    except Exception:
+        # this is only an optimization, so any problems with plotting are
+        # left to be reported in the log file of the first task to plot
+        pass
+
+    while True:
+        index = taskQueue.get()
+        if index is None:
+            break
+        taskIndex.value = index
+        tasks[index].run(writeLogFile=True)
+        # make sure no figures are left over for the next task, except the
+        # figure templates that later seasons of the same field can reuse
+        _close_figures_except_templates()
+        taskIndex.value = -1
+        doneQueue.put(index)
+    # }}}
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
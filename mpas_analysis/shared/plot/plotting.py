@@ -32,18 +32,43 @@ from mpl_toolkits.basemap import addcyclic
 from matplotlib.ticker import FuncFormatter, FixedLocator
 import numpy as np
 from functools import partial
+from collections import OrderedDict
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.collections import QuadMesh
 import xml.etree.ElementTree as ET
 from six.moves import configparser
 import cmocean
 import pkg_resources
+import os
+import copy
 
 from mpas_analysis.shared.timekeeping.utility import days_to_datetime, \
     date_to_days
 
 from mpas_analysis.shared.constants import constants
 
+# per-process caches of Basemap projections (including their coastline and
+# continent geometry) and of grid coordinates in each projection, shared by
+# all seasons, fields and panels plotted in the process
+_basemaps = {}
+_projectedCoords = {}
+
+# figures kept open so their layout and decorations can be reused for plots
+# of other fields on the same grid (see _FigureTemplate)
+_figureTemplates = OrderedDict()
+_maxFigureTemplates = 2
+
+# per-process cache of the colormaps, norms, levels and ticks set up from each
+# config section (see setup_colormap), and whether the custom colormaps have
+# already been registered in this process
+_colormapSetups = {}
+_customColormapsRegistered = False
+
+# per-process cache of the x-axis tick locations and date labels of time
+# series plots, shared by all plots of the same time range
+_xtickFormats = {}
+
 
 def timeseries_analysis_plot(config, dsvalues, N, title, xlabel, ylabel,
                              fileout, calendar, lineColors=None,
@@ -52,7 +77,8 @@ def timeseries_analysis_plot(config, dsvalues, N, title, xlabel, ylabel,
                              titleFontSize=None, figsize=(15, 6), dpi=None,
                              firstYearXTicks=None, yearStrideXTicks=None,
                              maxXTicks=20, obsMean=None, obsUncertainty=None,
-                             obsLegend=None, legendLocation='lower left'):
+                             obsLegend=None, legendLocation='lower left',
+                             fig=None):
 
     """
     Plots the list of time series data sets and stores the result in an image
@@ -128,6 +154,10 @@ def timeseries_analysis_plot(config, dsvalues, N, title, xlabel, ylabel,
 
     legendLocation : str, optional
         The location of the legend (see ``pyplot.legend()`` for details)
+
+    fig : ``matplotlib.figure.Figure``, optional
+        An empty figure to plot into, which is left open.  By default, a new
+        figure is created and closed once the plot has been saved.
     """
     # Authors
     # -------
@@ -135,7 +165,12 @@ def timeseries_analysis_plot(config, dsvalues, N, title, xlabel, ylabel,
 
     if dpi is None:
         dpi = config.getint('plot', 'dpi')
-    plt.figure(figsize=figsize, dpi=dpi)
+    if fig is None:
+        closeFigure = True
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+    else:
+        closeFigure = False
+        plt.figure(fig.number)
 
     minDays = []
     maxDays = []
@@ -235,9 +270,55 @@ def timeseries_analysis_plot(config, dsvalues, N, title, xlabel, ylabel,
     if ylabel is not None:
         plt.ylabel(ylabel, **axis_font)
     if fileout is not None:
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi, fig=fig)
+
+    if closeFigure:
+        plt.close(fig)
 
-    plt.close()
+
+def timeseries_analysis_plots(config, plots, calendar, figsize=(15, 6),
+                              dpi=None):  # {{{
+    """
+    Plots many time series plots (e.g. one for each region or variable) in a
+    single pass.  One figure is reused for all the plots, and the x-axis tick
+    locations and date labels are only computed once for all plots with the
+    same time range.  Data sets should be loaded into memory (e.g. with
+    ``load()``) before they are passed to this function.
+
+    Parameters
+    ----------
+    config : instance of ConfigParser
+        the configuration, containing a [plot] section with options that
+        control plotting
+
+    plots : list of dict
+        The arguments of ``timeseries_analysis_plot()`` for each plot, other
+        than ``config``, ``calendar``, ``figsize`` and ``dpi``, which are the
+        same for all plots
+
+    calendar : str
+        the calendar to use for formatting the time axis
+
+    figsize : tuple of float, optional
+        the size of the figures in inches
+
+    dpi : int, optional
+        the number of dots per inch of the figures, taken from section
+        ``plot`` option ``dpi`` in the config file by default
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if dpi is None:
+        dpi = config.getint('plot', 'dpi')
+
+    fig = plt.figure(figsize=figsize, dpi=dpi)
+    for kwargs in plots:
+        fig.clf()
+        timeseries_analysis_plot(config, calendar=calendar, figsize=figsize,
+                                 dpi=dpi, fig=fig, **kwargs)
+    plt.close(fig)  # }}}
 
 
 def timeseries_analysis_plot_polar(config, dsvalues, N, title,
@@ -364,7 +445,7 @@ def timeseries_analysis_plot_polar(config, dsvalues, N, title,
         plt.title(title, **title_font)
 
     if fileout is not None:
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi)
 
     plt.close()
 
@@ -458,13 +539,15 @@ def plot_polar_comparison(
         Make a subplot within the figure.
         """
 
-        m = Basemap(projection=plotProjection, boundinglat=latmin,
-                    lon_0=lon0, resolution='l', ax=ax)
+        # the Basemap draws on the current axes, ax
+        m = _get_basemap(projection=plotProjection, boundinglat=latmin,
+                         lon_0=lon0, resolution='l')
 
         fieldPeriodic, LatsPeriodic, LonsPeriodic = addcyclic(field, Lats,
                                                               Lons)
 
-        x, y = m(LonsPeriodic, LatsPeriodic)  # compute map proj coordinates
+        # compute map proj coordinates
+        x, y = _get_projected_coords(m, LonsPeriodic, LatsPeriodic)
 
         ax.set_title(title, y=1.06, **plottitle_font)
 
@@ -537,7 +620,7 @@ def plot_polar_comparison(
         plt.subplots_adjust(top=0.9)
 
     if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi)
 
     plt.close()
 
@@ -621,8 +704,24 @@ def plot_global_comparison(
     # -------
     # Xylar Asay-Davis, Milena Veneziani
 
-    def plot_panel(title, array, colormap, norm, levels, ticks, contours,
-                   lineWidth, lineColor):
+    def plot_data(ax, array, colormap, norm, levels, ticks, contours,
+                  lineWidth, lineColor):
+
+        if levels is None:
+            plotHandle = m.pcolormesh(x, y, array, cmap=colormap, norm=norm,
+                                      ax=ax)
+        else:
+            plotHandle = m.contourf(x, y, array, cmap=colormap, norm=norm,
+                                    levels=levels, extend='both', ax=ax)
+
+        if contours is not None:
+            matplotlib.rcParams['contour.negative_linestyle'] = 'solid'
+            m.contour(x, y, array, levels=contours, colors=lineColor,
+                      linewidths=lineWidth, ax=ax)
+
+        return plotHandle
+
+    def plot_panel(title, array, **colormapDict):
 
         plt.title(title, y=1.06, **plottitle_font)
 
@@ -633,17 +732,10 @@ def plot_global_comparison(
         m.drawmeridians(np.arange(-180., 180., 60.),
                         labels=[False, False, False, True])
 
-        if levels is None:
-            plotHandle = m.pcolormesh(x, y, array, cmap=colormap, norm=norm)
-        else:
-            plotHandle = m.contourf(x, y, array, cmap=colormap, norm=norm,
-                                    levels=levels, extend='both')
-
-        if contours is not None:
-            matplotlib.rcParams['contour.negative_linestyle'] = 'solid'
-            m.contour(x, y, array, levels=contours, colors=lineColor,
-                      linewidths=lineWidth)
+        plotHandle = template.add_panel(plt.gca(), plot_data, array,
+                                        **colormapDict)
 
+        ticks = colormapDict['ticks']
         cbar = m.colorbar(plotHandle, location='right', pad="5%",
                           spacing='uniform', ticks=ticks, boundaries=ticks)
         cbar.set_label(cbarlabel)
@@ -657,41 +749,50 @@ def plot_global_comparison(
             figsize = (8, 5)
         else:
             figsize = (8, 13)
-    fig = plt.figure(figsize=figsize, dpi=dpi)
-    if (title is not None):
-        if titleFontSize is None:
-            titleFontSize = config.get('plot', 'titleFontSize')
-        title_font = {'size': titleFontSize,
-                      'color': config.get('plot', 'titleFontColor'),
-                      'weight': config.get('plot', 'titleFontWeight')}
-        fig.suptitle(title, y=0.95, **title_font)
 
-    plottitle_font = {'size': config.get('plot',
-                                         'threePanelPlotTitleFontSize')}
-
-    m = Basemap(projection='cyl', llcrnrlat=-85, urcrnrlat=86, llcrnrlon=-180,
-                urcrnrlon=181, resolution='l')
-    x, y = m(Lons, Lats)  # compute map proj coordinates
+    m = _get_basemap(projection='cyl', llcrnrlat=-85, urcrnrlat=86,
+                     llcrnrlon=-180, urcrnrlon=181, resolution='l')
+    x, y = _get_projected_coords(m, Lons, Lats)  # compute map proj coordinates
 
     dictModelRef = setup_colormap(config, colorMapSectionName, suffix='Result')
     dictDiff = setup_colormap(config, colorMapSectionName, suffix='Difference')
 
+    panels = [(modelTitle, modelArray, dictModelRef)]
     if refArray is not None:
-        plt.subplot(3, 1, 1)
-
-    plot_panel(modelTitle, modelArray, **dictModelRef)
-
-    if refArray is not None:
-        plt.subplot(3, 1, 2)
-        plot_panel(refTitle, refArray, **dictModelRef)
-
-        plt.subplot(3, 1, 3)
-        plot_panel(diffTitle, diffArray, **dictDiff)
+        panels.extend([(refTitle, refArray, dictModelRef),
+                       (diffTitle, diffArray, dictDiff)])
+
+    # the layout and decorations only depend on these (and the grid)
+    templateKey = ('global', id(config), colorMapSectionName, len(panels),
+                   title is None, titleFontSize, cbarlabel, figsize, dpi)
+    template = _get_figure_template(config, templateKey, (Lons, Lats))
+
+    if template is None:
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+        template = _FigureTemplate(fig, (Lons, Lats))
+        if (title is not None):
+            if titleFontSize is None:
+                titleFontSize = config.get('plot', 'titleFontSize')
+            title_font = {'size': titleFontSize,
+                          'color': config.get('plot', 'titleFontColor'),
+                          'weight': config.get('plot', 'titleFontWeight')}
+            template.suptitle = fig.suptitle(title, y=0.95, **title_font)
+
+        plottitle_font = {'size': config.get('plot',
+                                             'threePanelPlotTitleFontSize')}
+
+        for index, (panelTitle, array, colormapDict) in enumerate(panels):
+            if refArray is not None:
+                plt.subplot(3, 1, index+1)
+            plot_panel(panelTitle, array, **colormapDict)
+    else:
+        template.update(title, plot_data, panels)
 
     if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi, fig=template.fig)
 
-    plt.close()
+    # keep the figure open for reuse (or close it if reuse is disabled)
+    _add_figure_template(config, templateKey, template)
 
 
 def plot_polar_projection_comparison(
@@ -786,25 +887,31 @@ def plot_polar_projection_comparison(
     # -------
     # Xylar Asay-Davis
 
-    def plot_panel(ax, title, array, colormap, norm, levels, ticks, contours,
-                   lineWidth, lineColor):
-
-        plt.title(title, y=1.06, **plottitle_font)
+    def plot_data(ax, array, colormap, norm, levels, ticks, contours,
+                  lineWidth, lineColor):
 
         if levels is None:
-            plotHandle = plt.pcolormesh(x, y, array, cmap=colormap, norm=norm)
+            plotHandle = ax.pcolormesh(x, y, array, cmap=colormap, norm=norm)
         else:
-            plotHandle = plt.contourf(xCenter, yCenter, array, cmap=colormap,
-                                      norm=norm, levels=levels, extend='both')
+            plotHandle = ax.contourf(xCenter, yCenter, array, cmap=colormap,
+                                     norm=norm, levels=levels, extend='both')
 
-        plt.pcolormesh(x, y, landMask, cmap=landColorMap)
-        plt.contour(xCenter, yCenter, landMask.mask, (0.5,), colors='k',
-                    linewidths=0.5)
+        ax.pcolormesh(x, y, landMask, cmap=landColorMap)
+        ax.contour(xCenter, yCenter, landMask.mask, (0.5,), colors='k',
+                   linewidths=0.5)
 
         if contours is not None:
             matplotlib.rcParams['contour.negative_linestyle'] = 'solid'
-            plt.contour(x, y, array, levels=contours, colors=lineColor,
-                        linewidths=lineWidth)
+            ax.contour(x, y, array, levels=contours, colors=lineColor,
+                       linewidths=lineWidth)
+
+        return plotHandle
+
+    def plot_panel(ax, title, array, **colormapDict):
+
+        plt.title(title, y=1.06, **plottitle_font)
+
+        plotHandle = template.add_panel(ax, plot_data, array, **colormapDict)
 
         # create an axes on the right side of ax. The width of cax will be 5%
         # of ax and the padding between cax and ax will be fixed at 0.05 inch.
@@ -813,6 +920,7 @@ def plot_polar_projection_comparison(
 
         cbar = plt.colorbar(plotHandle, cax=cax)
         cbar.set_label(cbarlabel)
+        ticks = colormapDict['ticks']
         if ticks is not None:
             cbar.set_ticks(ticks)
             cbar.set_ticklabels(['{}'.format(tick) for tick in ticks])
@@ -841,41 +949,204 @@ def plot_polar_projection_comparison(
     dictModelRef = setup_colormap(config, colorMapSectionName, suffix='Result')
     dictDiff = setup_colormap(config, colorMapSectionName, suffix='Difference')
 
+    panels = [(modelTitle, modelArray, dictModelRef)]
+    if refArray is not None:
+        panels.extend([(refTitle, refArray, dictModelRef),
+                       (diffTitle, diffArray, dictDiff)])
+
+    # set up land colormap
+    colorList = [(0.8, 0.8, 0.8), (0.8, 0.8, 0.8)]
+    landColorMap = cols.LinearSegmentedColormap.from_list('land', colorList)
+
+    # locations of centers for contour plots
+    xCenter = 0.5*(x[1:] + x[0:-1])
+    yCenter = 0.5*(y[1:] + y[0:-1])
+
+    # the layout and decorations only depend on these (and the grid)
+    templateKey = ('polarProjection', id(config), colorMapSectionName,
+                   len(panels), vertical, title is None, titleFontSize,
+                   cbarlabel, figsize, dpi)
+    gridArrays = (x, y, np.ma.getdata(landMask), np.ma.getmaskarray(landMask))
+    template = _get_figure_template(config, templateKey, gridArrays)
+
+    if template is None:
+        fig = plt.figure(figsize=figsize, dpi=dpi)
+        template = _FigureTemplate(fig, gridArrays)
+
+        if (title is not None):
+            if titleFontSize is None:
+                titleFontSize = config.get('plot', 'titleFontSize')
+            title_font = {'size': titleFontSize,
+                          'color': config.get('plot', 'titleFontColor'),
+                          'weight': config.get('plot', 'titleFontWeight')}
+            template.suptitle = fig.suptitle(title, y=0.95, **title_font)
+
+        plottitle_font = {'size': config.get('plot',
+                                             'threePanelPlotTitleFontSize')}
+
+        for index, (panelTitle, array, colormapDict) in enumerate(panels):
+            ax = plt.subplot(subplots[index])
+            plot_panel(ax, panelTitle, array, **colormapDict)
+    else:
+        template.update(title, plot_data, panels)
+
+    if (fileout is not None):
+        savefig(fileout, config, dpi=dpi, fig=template.fig)
+
+    # keep the figure open for reuse (or close it if reuse is disabled)
+    _add_figure_template(config, templateKey, template)
+
+
+def plot_native_mesh(
+        config,
+        rasterizer,
+        field,
+        fileout,
+        colorMapSectionName,
+        bounds,
+        projection=None,
+        title=None,
+        cbarlabel='units',
+        titleFontSize=None,
+        figsize=(8, 7),
+        dpi=None,
+        suffix='Result'):
+
+    """
+    Plots a field on the native MPAS mesh as a map of a region, rasterizing
+    the cells directly to the pixels of the image at the resolution of the
+    output file, rather than remapping to a comparison grid first.
+
+    Parameters
+    ----------
+    config : instance of ConfigParser
+        the configuration, containing a [plot] section with options that
+        control plotting
+
+    rasterizer : ``MeshRasterizer``
+        A rasterizer for the mesh (e.g. from ``get_mesh_rasterizer()``)
+
+    field : numpy.ndarray or xarray.DataArray
+        A field on the cells of the mesh, with NaNs where it is invalid
+
+    fileout : str
+        the file name to be written
+
+    colorMapSectionName : str
+        section name in ``config`` where color map info can be found.
+
+    bounds : list of float
+        ``[lonMin, lonMax, latMin, latMax]`` in degrees for a map in
+        longitude and latitude, or ``[xMin, xMax, yMin, yMax]`` in
+        projection coordinates if ``projection`` is given
+
+    projection : ``pyproj.Proj``, optional
+        A projection for the map (e.g. polar stereographic)
+
+    title : str, optional
+        the title of the plot
+
+    cbarlabel : str, optional
+        label on the colorbar
+
+    titleFontSize : int, optional
+        size of the title font
+
+    figsize : tuple of float, optional
+        the size of the figure in inches
+
+    dpi : int, optional
+        the number of dots per inch of the figure, taken from section ``plot``
+        option ``dpi`` in the config file by default
+
+    suffix : str, optional
+        the suffix of the colormap options in ``colorMapSectionName`` (e.g.
+        ``Result`` or ``Difference``)
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if dpi is None:
+        dpi = config.getint('plot', 'dpi')
+
     fig = plt.figure(figsize=figsize, dpi=dpi)
+    ax = plt.subplot(111)
 
-    if (title is not None):
+    if title is not None:
         if titleFontSize is None:
             titleFontSize = config.get('plot', 'titleFontSize')
         title_font = {'size': titleFontSize,
                       'color': config.get('plot', 'titleFontColor'),
                       'weight': config.get('plot', 'titleFontWeight')}
-        fig.suptitle(title, y=0.95, **title_font)
-
-    plottitle_font = {'size': config.get('plot',
-                                         'threePanelPlotTitleFontSize')}
+        plt.title(title, **title_font)
 
-    # set up land colormap
-    colorList = [(0.8, 0.8, 0.8), (0.8, 0.8, 0.8)]
-    landColorMap = cols.LinearSegmentedColormap.from_list('land', colorList)
+    # one pixel of the image for each pixel in the output file, in the part
+    # of the axes the map will fill
+    xMin, xMax, yMin, yMax = bounds
+    aspect = (yMax - yMin)/(xMax - xMin)
+    position = ax.get_position()
+    width = position.width*figsize[0]*dpi
+    height = position.height*figsize[1]*dpi
+    if height > aspect*width:
+        height = aspect*width
+    else:
+        width = height/aspect
+    nx = max(int(width + 0.5), 1)
+    ny = max(int(height + 0.5), 1)
 
-    # locations of centers for contour plots
-    xCenter = 0.5*(x[1:] + x[0:-1])
-    yCenter = 0.5*(y[1:] + y[0:-1])
+    if projection is None:
+        pixelCells = rasterizer.get_lon_lat_pixel_cells(xMin, xMax, yMin, yMax,
+                                                        nx, ny)
+    else:
+        pixelCells = rasterizer.get_projection_pixel_cells(
+            projection, xMin, xMax, yMin, yMax, nx, ny)
 
-    ax = plt.subplot(subplots[0])
-    plot_panel(ax, modelTitle, modelArray, **dictModelRef)
+    image = rasterizer.rasterize(field, pixelCells)
 
-    if refArray is not None:
-        ax = plt.subplot(subplots[1])
-        plot_panel(ax, refTitle, refArray, **dictModelRef)
+    colormapDict = setup_colormap(config, colorMapSectionName, suffix=suffix)
 
-        ax = plt.subplot(subplots[2])
-        plot_panel(ax, diffTitle, diffArray, **dictDiff)
+    # outside the mesh (e.g. land) is gray
+    colorList = [(0.8, 0.8, 0.8), (0.8, 0.8, 0.8)]
+    landColorMap = cols.LinearSegmentedColormap.from_list('land', colorList)
+    landImage = np.ma.masked_array(np.ones(pixelCells.shape),
+                                   mask=pixelCells >= 0)
+    ax.imshow(landImage, cmap=landColorMap, origin='lower', extent=bounds,
+              interpolation='nearest')
+
+    plotHandle = ax.imshow(image, cmap=colormapDict['colormap'],
+                           norm=colormapDict['norm'], origin='lower',
+                           extent=bounds, interpolation='nearest')
+
+    # create an axes on the right side of ax. The width of cax will be 5%
+    # of ax and the padding between cax and ax will be fixed at 0.05 inch.
+    divider = make_axes_locatable(ax)
+    cax = divider.append_axes("right", size="5%", pad=0.05)
+
+    if colormapDict['levels'] is None:
+        extend = 'neither'
+    else:
+        extend = 'both'
+    cbar = plt.colorbar(plotHandle, cax=cax, extend=extend)
+    cbar.set_label(cbarlabel)
+    ticks = colormapDict['ticks']
+    if ticks is not None:
+        cbar.set_ticks(ticks)
+        cbar.set_ticklabels(['{}'.format(tick) for tick in ticks])
+
+    if projection is None:
+        axis_font = {'size': config.get('plot', 'axisFontSize')}
+        ax.set_xlabel('Longitude', **axis_font)
+        ax.set_ylabel('Latitude', **axis_font)
+    else:
+        ax.axis('off')
+    ax.set_xlim(xMin, xMax)
+    ax.set_ylim(yMin, yMax)
 
-    if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+    if fileout is not None:
+        savefig(fileout, config, dpi=dpi, fig=fig)
 
-    plt.close()
+    plt.close(fig)
 
 
 def plot_vertical_section_comparison(
@@ -1314,7 +1585,7 @@ def plot_vertical_section_comparison(
         plt.tight_layout(pad=0.0, h_pad=2.0, rect=[0.0, 0.0, 1.0, 0.88])
 
     if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi)
 
     plt.close()
 
@@ -1449,7 +1720,7 @@ def plot_1D(config, xArrays, fieldArrays, errArrays,
         plt.ylim(yLim)
 
     if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi)
 
     plt.close()
 
@@ -1999,7 +2270,7 @@ def plot_vertical_section(
 
 
     if (fileout is not None):
-        plt.savefig(fileout, dpi=dpi, bbox_inches='tight', pad_inches=0.1)
+        savefig(fileout, config, dpi=dpi)
 
     if fileout is not None:
         plt.close()
@@ -2051,6 +2322,29 @@ def setup_colormap(config, configSectionName, suffix=''):
 
     _register_custom_colormaps()
 
+    # the config options are only parsed once for each section and suffix.
+    # The key includes the options themselves in case they have changed.
+    key = (configSectionName, suffix, tuple(config.items(configSectionName)))
+    if key not in _colormapSetups:
+        _colormapSetups[key] = _build_colormap_setup(config, configSectionName,
+                                                     suffix)
+
+    colormapDict = dict(_colormapSetups[key])
+    # a norm without limits is autoscaled to the first data it normalizes, so
+    # each plot gets its own copy
+    colormapDict['norm'] = copy.deepcopy(colormapDict['norm'])
+    return colormapDict
+
+
+def _build_colormap_setup(config, configSectionName, suffix):
+    '''
+    Set up a colormap, norm, levels, ticks and contours from the options in
+    a config section (see ``setup_colormap()``)
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis, Milena Veneziani, Greg Streletz
+
     if config.has_option(configSectionName,
                          'colormapIndices{}'.format(suffix)):
         (colormap, norm, levels, ticks) = _setup_indexed_colormap(
@@ -2118,27 +2412,38 @@ def plot_xtick_format(calendar, minDays, maxDays, maxXTicks, yearStride=None):
 
     ax = plt.gca()
 
-    start = days_to_datetime(np.amin(minDays), calendar=calendar)
-    end = days_to_datetime(np.amax(maxDays), calendar=calendar)
+    minDays = float(np.amin(minDays))
+    maxDays = float(np.amax(maxDays))
+
+    # the ticks and their labels are the same for all plots of the same time
+    # range, so they are only computed once
+    key = (calendar, minDays, maxDays, maxXTicks, yearStride)
+    if key not in _xtickFormats:
+        start = days_to_datetime(minDays, calendar=calendar)
+        end = days_to_datetime(maxDays, calendar=calendar)
 
-    if yearStride is not None or end.year - start.year > maxXTicks/2:
-        if yearStride is None:
-            yearStride = 1
+        if yearStride is not None or end.year - start.year > maxXTicks/2:
+            if yearStride is None:
+                yearStride = 1
+            else:
+                maxXTicks = None
+            major = [date_to_days(year=year, calendar=calendar)
+                     for year in np.arange(start.year, end.year+1,
+                                           yearStride)]
+            includeMonth = False
         else:
-            maxXTicks = None
-        major = [date_to_days(year=year, calendar=calendar)
-                 for year in np.arange(start.year, end.year+1, yearStride)]
-        formatterFun = partial(_date_tick, calendar=calendar,
-                               includeMonth=False)
-    else:
-        # add ticks for months
-        major = []
-        for year in range(start.year, end.year+1):
-            for month in range(1, 13):
-                major.append(date_to_days(year=year, month=month,
-                                          calendar=calendar))
-        formatterFun = partial(_date_tick, calendar=calendar,
-                               includeMonth=True)
+            # add ticks for months
+            major = []
+            for year in range(start.year, end.year+1):
+                for month in range(1, 13):
+                    major.append(date_to_days(year=year, month=month,
+                                              calendar=calendar))
+            includeMonth = True
+        formatterFun = partial(_cached_date_tick, calendar=calendar,
+                               includeMonth=includeMonth, labels={})
+        _xtickFormats[key] = (major, maxXTicks, formatterFun)
+
+    major, maxXTicks, formatterFun = _xtickFormats[key]
 
     ax.xaxis.set_major_locator(FixedLocator(major, maxXTicks))
     ax.xaxis.set_major_formatter(FuncFormatter(formatterFun))
@@ -2148,6 +2453,82 @@ def plot_xtick_format(calendar, minDays, maxDays, maxXTicks, yearStride=None):
     plt.autoscale(enable=True, axis='x', tight=True)
 
 
+def savefig(fileout, config, dpi=None, fig=None, pad_inches=0.1):  # {{{
+    """
+    Save a figure as a PNG image and, optionally, in other formats (see
+    ``additionalFormats`` in the ``[plot]`` section of the config file) next
+    to it.
+
+    The tight bounding box of the figure (if requested with
+    ``tightBoundingBox``) is computed once and used for all formats, rather
+    than each format requiring an extra pass to compute it.  Meshes plotted
+    with ``pcolormesh`` are rasterized in vector formats (e.g. PDF and SVG),
+    so these files remain small.
+
+    Parameters
+    ----------
+    fileout : str
+        The name of the PNG file.  Files in other formats have the same name
+        but with the extension replaced
+
+    config : ``MpasAnalysisConfigParser``
+        Config options
+
+    dpi : int, optional
+        The resolution of raster images (including rasterized meshes in
+        vector formats), ``dpi`` from the ``[plot]`` section by default
+
+    fig : ``matplotlib.figure.Figure``, optional
+        The figure to save, the current figure by default
+
+    pad_inches : float, optional
+        The padding around a tight bounding box
+    """
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if fig is None:
+        fig = plt.gcf()
+    if dpi is None:
+        dpi = config.getint('plot', 'dpi')
+
+    prefix = os.path.splitext(fileout)[0]
+    fileNames = [fileout]
+    additionalFormats = config.getWithDefault('plot', 'additionalFormats',
+                                              [])
+    for extension in additionalFormats:
+        fileName = '{}.{}'.format(prefix, extension)
+        if fileName not in fileNames:
+            fileNames.append(fileName)
+
+    if len(fileNames) > 1:
+        for mesh in fig.findobj(QuadMesh):
+            mesh.set_rasterized(True)
+
+    if not config.getWithDefault('plot', 'tightBoundingBox', True):
+        bbox = None
+    elif len(fileNames) == 1:
+        bbox = 'tight'
+    else:
+        # lay out the figure at the output resolution once to find the tight
+        # bounding box for all formats
+        figDpi = fig.dpi
+        fig.set_dpi(dpi)
+        if hasattr(fig, 'draw_without_rendering'):
+            fig.draw_without_rendering()
+        else:
+            fig.canvas.draw()
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+        bbox = bbox.padded(pad_inches)
+        fig.set_dpi(figDpi)
+
+    for fileName in fileNames:
+        fig.savefig(fileName, dpi=dpi, bbox_inches=bbox,
+                    pad_inches=pad_inches)
+    # }}}
+
+
 def _setup_colormap_and_norm(config, configSectionName, suffix=''):
 
     '''
@@ -2180,8 +2561,6 @@ def _setup_colormap_and_norm(config, configSectionName, suffix=''):
     # -------
     # Xylar Asay-Davis
 
-    _register_custom_colormaps()
-
     colormap = plt.get_cmap(config.get(configSectionName,
                                        'colormapName{}'.format(suffix)))
 
@@ -2288,6 +2667,211 @@ def _setup_indexed_colormap(config, configSectionName, suffix=''):
     return (colormap, norm, levels, ticks)
 
 
+def _get_basemap(**kwargs):  # {{{
+    '''
+    Get a Basemap with the given projection, extent and resolution, reusing
+    one constructed earlier in this process if possible.  Constructing a
+    Basemap reads and clips the coastlines, which is expensive, whereas
+    drawing them from an existing Basemap is cheap.  The Basemap is not
+    attached to any axes, so it draws on the current axes.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    key = tuple(sorted(kwargs.items()))
+    if key not in _basemaps:
+        _basemaps[key] = Basemap(**kwargs)
+    return _basemaps[key]  # }}}
+
+
+def _get_projected_coords(m, Lons, Lats):  # {{{
+    '''
+    Get the coordinates of the given longitudes and latitudes in the map
+    projection of a Basemap, reusing those computed earlier in this process
+    for the same Basemap and grid if possible.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    Lons = np.asarray(Lons)
+    Lats = np.asarray(Lats)
+    key = (id(m), Lons.shape, Lats.shape)
+    if key not in _projectedCoords:
+        _projectedCoords[key] = []
+    for (cachedLons, cachedLats, x, y) in _projectedCoords[key]:
+        if np.array_equal(cachedLons, Lons) and \
+                np.array_equal(cachedLats, Lats):
+            return x, y
+
+    x, y = m(Lons, Lats)
+    _projectedCoords[key].append((Lons.copy(), Lats.copy(), x, y))
+    return x, y  # }}}
+
+
+class _FigureTemplate(object):  # {{{
+    '''
+    A figure whose layout and decorations (axes, titles, colorbars,
+    coastlines, land masks, etc.) can be reused for plotting a new set of
+    fields on the same grid by replacing only the artists that show the data.
+
+    Attributes
+    ----------
+    fig : ``matplotlib.figure.Figure``
+        The figure
+
+    arrays : tuple of numpy.ndarray
+        The grid arrays the figure was created for
+
+    suptitle : ``matplotlib.text.Text``
+        The title of the figure, if any
+
+    panels : list of tuples
+        The axes of each panel and the artists showing its data
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    def __init__(self, fig, arrays):  # {{{
+        self.fig = fig
+        self.arrays = tuple(np.array(array) for array in arrays)
+        self.suptitle = None
+        self.panels = []  # }}}
+
+    def matches(self, arrays):  # {{{
+        '''
+        Whether the template was created for the given grid arrays
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if len(arrays) != len(self.arrays):
+            return False
+        for array, templateArray in zip(arrays, self.arrays):
+            if not np.array_equal(np.asarray(array), templateArray):
+                return False
+        return True  # }}}
+
+    def add_panel(self, ax, plot_data, *args, **kwargs):  # {{{
+        '''
+        Plot the data of a new panel with ``plot_data(ax, *args, **kwargs)``,
+        keeping track of the artists it adds so they can be replaced later.
+        Returns the return value of ``plot_data()``
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        children = set(ax.get_children())
+        plotHandle = plot_data(ax, *args, **kwargs)
+        artists = [child for child in ax.get_children()
+                   if child not in children]
+        self.panels.append((ax, artists))
+        return plotHandle  # }}}
+
+    def update(self, title, plot_data, panels):  # {{{
+        '''
+        Replace the title and the data of each panel.  ``panels`` is a list
+        of (title, array, colormap dictionary) for each panel, in the order
+        the panels were added.
+        '''
+        # Authors
+        # -------
+        # Xylar Asay-Davis
+
+        if self.suptitle is not None:
+            self.suptitle.set_text(title)
+
+        plt.figure(self.fig.number)
+        for index, (panelTitle, array, colormapDict) in enumerate(panels):
+            ax, artists = self.panels[index]
+            xlim = ax.get_xlim()
+            ylim = ax.get_ylim()
+            for artist in artists:
+                artist.remove()
+            ax.title.set_text(panelTitle)
+
+            plt.sca(ax)
+            children = set(ax.get_children())
+            plot_data(ax, array, **colormapDict)
+            artists = [child for child in ax.get_children()
+                       if child not in children]
+            self.panels[index] = (ax, artists)
+
+            ax.set_xlim(xlim)
+            ax.set_ylim(ylim)
+        # }}}
+
+    # }}}
+
+
+def _get_figure_template(config, key, arrays):  # {{{
+    '''
+    Get a figure template created earlier in this process with the given key
+    for the given grid arrays, or ``None`` if there isn't one or reusing
+    figures is disabled.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if not config.getWithDefault('plot', 'reuseFigureTemplates', True):
+        return None
+
+    template = _figureTemplates.get(key)
+    if template is None:
+        return None
+
+    if not plt.fignum_exists(template.fig.number) or \
+            not template.matches(arrays):
+        # the figure has been closed or the grid has changed
+        _figureTemplates.pop(key)
+        plt.close(template.fig)
+        return None
+
+    return template  # }}}
+
+
+def _add_figure_template(config, key, template):  # {{{
+    '''
+    Keep a figure open so it can be reused as a template for later plots,
+    closing the least recently added template if there are too many.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if not config.getWithDefault('plot', 'reuseFigureTemplates', True):
+        plt.close(template.fig)
+        return
+
+    _figureTemplates[key] = template
+    while len(_figureTemplates) > _maxFigureTemplates:
+        _, oldTemplate = _figureTemplates.popitem(last=False)
+        plt.close(oldTemplate.fig)
+    # }}}
+
+
+def _close_figures_except_templates():  # {{{
+    '''
+    Close all figures except those kept open as figure templates, so the
+    templates can be reused by the next task run in the same process
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    templateNumbers = [template.fig.number for template in
+                       _figureTemplates.values()]
+    for number in plt.get_fignums():
+        if number not in templateNumbers:
+            plt.close(number)
+    # }}}
+
+
 def _date_tick(days, pos, calendar='gregorian', includeMonth=True):
     days = np.maximum(days, 0.)
     date = days_to_datetime(days, calendar)
@@ -2297,7 +2881,27 @@ def _date_tick(days, pos, calendar='gregorian', includeMonth=True):
         return '{:04d}'.format(date.year)
 
 
+def _cached_date_tick(days, pos, calendar, includeMonth, labels):
+    '''
+    A date tick label, stored in ``labels`` so each label is only computed
+    once
+    '''
+    if days not in labels:
+        labels[days] = _date_tick(days, pos, calendar=calendar,
+                                  includeMonth=includeMonth)
+    return labels[days]
+
+
 def _register_custom_colormaps():
+    '''
+    Register the custom colormaps with matplotlib, if this hasn't already been
+    done in this process (or in the process it was forked from)
+    '''
+    global _customColormapsRegistered
+
+    if _customColormapsRegistered:
+        return
+
     name = 'ferret'
     backgroundColor = (0.9, 0.9, 0.9)
 
@@ -2471,6 +3075,8 @@ def _register_custom_colormaps():
             __name__, 'SciVisColorColormaps/{}.xml'.format(mapName))
         _read_xml_colormap(xmlFile, mapName)
 
+    _customColormapsRegistered = True
+
 
 def _read_xml_colormap(xmlFile, mapName):
     '''Read in an XML colormap'''
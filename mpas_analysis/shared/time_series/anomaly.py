@@ -14,6 +14,10 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import os
+import numpy
+import xarray
+
 from mpas_analysis.shared.io import open_mpas_dataset
 from mpas_analysis.shared.time_series.moving_average import compute_moving_avg
 
@@ -22,7 +26,8 @@ def compute_moving_avg_anomaly_from_start(timeSeriesFileName, variableList,
                                           anomalyStartTime, anomalyEndTime,
                                           startDate, endDate, calendar,
                                           movingAveragePoints=12,
-                                          alter_dataset=None):  # {{{
+                                          alter_dataset=None,
+                                          previousFileName=None):  # {{{
 
     '''
     Compute the rolling mean of the anomaly of a quantity from the beginning
@@ -55,6 +60,12 @@ def compute_moving_avg_anomaly_from_start(timeSeriesFileName, variableList,
         variables), taking an ``xarray.Dataset`` as input argument and
         returning an ``xarray.Dataset``
 
+    previousFileName : str, optional
+        A file holding the result of a previous call to this function with
+        the same anomaly period and moving average (e.g. before more years of
+        the simulation were available).  If present and consistent, only the
+        moving average at times beyond those in this file is computed.
+
     Returns
     -------
     ds : ``xarray.Dataset``
@@ -85,13 +96,66 @@ def compute_moving_avg_anomaly_from_start(timeSeriesFileName, variableList,
 
     dsStart = dsStart.isel(Time=slice(0, movingAveragePoints)).mean('Time')
 
+    attrs = {'movingAveragePoints': movingAveragePoints,
+             'anomalyStartTime': anomalyStartTime,
+             'anomalyEndTime': anomalyEndTime}
+
+    dsPrevious = _read_previous_anomaly(previousFileName, ds, attrs)
+    if dsPrevious is None:
+        previousCount = 0
+    else:
+        previousCount = dsPrevious.sizes['Time']
+
+    # the anomaly of the moving average is the moving average of the anomaly
+    # but only requires one subtraction per output time
+    ds = compute_moving_avg(ds.isel(Time=slice(previousCount, None)),
+                            movingAveragePoints)
+
     for variable in ds.data_vars:
         ds[variable] = ds[variable] - dsStart[variable]
 
-    ds = compute_moving_avg(ds)
+    if dsPrevious is not None:
+        ds = xarray.concat([dsPrevious, ds], dim='Time', data_vars='minimal')
+
+    ds.attrs.update(attrs)
 
     return ds
 
     # }}}
 
+
+def _read_previous_anomaly(fileName, ds, attrs):  # {{{
+    '''
+    Read the moving-average anomaly from a previous call to
+    ``compute_moving_avg_anomaly_from_start``, returning ``None`` if there is
+    no such file or if it is not consistent with the current data set and
+    options (so the anomaly must be recomputed from scratch).
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if fileName is None or not os.path.exists(fileName):
+        return None
+
+    with xarray.open_dataset(fileName) as dsPrevious:
+        for attr in attrs:
+            if dsPrevious.attrs.get(attr) != attrs[attr]:
+                return None
+
+        if set(dsPrevious.data_vars) != set(ds.data_vars):
+            return None
+
+        # the previous moving average must cover a prefix of the current one
+        offset = attrs['movingAveragePoints']//2
+        previousTimes = dsPrevious.Time.values
+        times = ds.Time.values[offset:offset+len(previousTimes)]
+        if len(times) != len(previousTimes) or \
+                not numpy.allclose(times, previousTimes):
+            return None
+
+        dsPrevious.load()
+
+    return dsPrevious  # }}}
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -14,12 +14,21 @@
 from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
+import numpy
+import xarray
 
-def compute_moving_avg(ds, movingAveragePoints=12):  # {{{
+
+def compute_moving_avg(ds, movingAveragePoints=12,
+                       timeChunkSize=1200):  # {{{
 
     '''
     Compute the rolling mean of a data set
 
+    The mean is computed from a running (cumulative) sum, one block of
+    ``timeChunkSize`` output times at a time, so that the cost is independent
+    of ``movingAveragePoints`` and only one block of the data set needs to be
+    in memory at once.
+
     Parameters
     ----------
     ds :  ``xarray.Dataset``
@@ -29,20 +38,78 @@ def compute_moving_avg(ds, movingAveragePoints=12):  # {{{
         The number of points (months) over which to perform the rolling average
         of the data set
 
+    timeChunkSize : int, optional
+        The number of time entries in the moving average computed at once
+
     Returns
     -------
     ds : ``xarray.Dataset``
-        The anomaly of the rolling time mean from the start of the simulation
+        The rolling time mean of the data set, centered in time and without
+        the ``movingAveragePoints - 1`` entries at the ends of the time series
+        that have an incomplete window
     '''
     # Authors
     # -------
     # Xylar Asay-Davis
 
-    ds = ds.rolling(Time=movingAveragePoints,
-                    center=True).mean().dropna('Time')
+    timeCount = ds.sizes['Time']
+    outCount = max(timeCount - movingAveragePoints + 1, 0)
+    # the window is centered on the output time (as in
+    # ds.rolling(Time=movingAveragePoints, center=True))
+    offset = movingAveragePoints//2
+
+    timeVariables = [variableName for variableName in ds.data_vars
+                     if 'Time' in ds[variableName].dims]
+
+    dsBlocks = []
+    for outStart in range(0, max(outCount, 1), timeChunkSize):
+        outEnd = min(outStart + timeChunkSize, outCount)
+        dsOut = ds.isel(Time=slice(outStart + offset, outEnd + offset))
+        dsIn = ds[timeVariables].isel(
+            Time=slice(outStart, outEnd + movingAveragePoints - 1))
+        for variableName in timeVariables:
+            da = dsIn[variableName]
+            dsOut[variableName] = (da.dims,
+                                   _window_mean(da.values,
+                                                da.dims.index('Time'),
+                                                movingAveragePoints))
+            dsOut[variableName].attrs = da.attrs
+        dsBlocks.append(dsOut)
+
+    if len(dsBlocks) == 1:
+        ds = dsBlocks[0]
+    else:
+        ds = xarray.concat(dsBlocks, dim='Time', data_vars='minimal')
 
     return ds
 
     # }}}
 
+
+def _window_mean(values, axis, windowSize):  # {{{
+    '''
+    The mean over each (complete) window of ``windowSize`` entries along the
+    given axis, computed from cumulative sums.  A window containing any NaNs
+    has a NaN mean.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    values = numpy.moveaxis(numpy.asarray(values, dtype=float), axis, 0)
+    valid = numpy.isfinite(values)
+
+    zeros = numpy.zeros((1,) + values.shape[1:])
+    cumSum = numpy.concatenate(
+        [zeros, numpy.cumsum(numpy.where(valid, values, 0.), axis=0)])
+    cumCount = numpy.concatenate([zeros, numpy.cumsum(valid, axis=0)])
+
+    windowSum = cumSum[windowSize:] - cumSum[:-windowSize]
+    windowCount = cumCount[windowSize:] - cumCount[:-windowSize]
+
+    mean = numpy.where(windowCount == windowSize, windowSum/windowSize,
+                       numpy.nan)
+
+    return numpy.moveaxis(mean, 0, axis)  # }}}
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -20,6 +20,7 @@ from __future__ import absolute_import, division, print_function, \
 
 import xarray as xr
 import numpy
+import netCDF4
 import os
 from distutils.spawn import find_executable
 import glob
@@ -121,6 +122,8 @@ def cache_time_series(timesInDataSet, timeSeriesCalcFunction, cacheFileName,
     Create or update a NetCDF file ``cacheFileName`` containing the given time
     series, calculated with ``timeSeriesCalcFunction`` over the given times,
     start and end year, and time frequency with which results are cached.
+    New records are appended along the unlimited ``Time`` dimension of the
+    cache file, so records already in the cache are never rewritten.
 
     Note: only works with climatologies where the mask (locations of ``NaN``
     values) doesn't vary with time.
@@ -168,17 +171,16 @@ def cache_time_series(timesInDataSet, timeSeriesCalcFunction, cacheFileName,
 
     timesProcessed = numpy.zeros(len(timesInDataSet), bool)
     # figure out which files to load and which years go in each file
-    continueOutput = os.path.exists(cacheFileName)
     cacheDataSetExists = False
-    if continueOutput:
+    if os.path.exists(cacheFileName):
         if logger is not None:
             logger.info('   Read in previously computed time series')
-        # read in what we have so far
+        # read in the times we have so far
 
         try:
-            dsCache = xr.open_dataset(cacheFileName, decode_times=False)
+            cachedTimes = _read_cached_times(cacheFileName)
             cacheDataSetExists = True
-        except IOError:
+        except (IOError, OSError, RuntimeError):
             # assuming the cache file is corrupt, so deleting it.
             message = 'Deleting cache file {}, which appears to have ' \
                       'been corrupted.'.format(cacheFileName)
@@ -189,11 +191,7 @@ def cache_time_series(timesInDataSet, timeSeriesCalcFunction, cacheFileName,
             os.remove(cacheFileName)
 
         if cacheDataSetExists:
-            # force loading and then close so we can overwrite the file later
-            dsCache.load()
-            dsCache.close()
-            for time in dsCache.Time.values:
-                timesProcessed[timesInDataSet == time] = True
+            timesProcessed = numpy.isin(timesInDataSet, cachedTimes)
 
     datetimes = days_to_datetime(timesInDataSet, calendar=calendar)
     yearsInDataSet = numpy.array([date.year for date in datetimes])
@@ -203,13 +201,12 @@ def cache_time_series(timesInDataSet, timeSeriesCalcFunction, cacheFileName,
 
     firstProcessed = True
     for firstYear in range(startYear, endYear+1, yearsPerCacheUpdate):
-        years = range(firstYear, numpy.minimum(endYear+1,
-                                               firstYear+yearsPerCacheUpdate))
+        years = numpy.arange(firstYear,
+                             numpy.minimum(endYear+1,
+                                           firstYear+yearsPerCacheUpdate))
 
-        mask = numpy.zeros(len(yearsInDataSet), bool)
-        for year in years:
-            mask = numpy.logical_or(mask, yearsInDataSet == year)
-        mask = numpy.logical_and(mask, numpy.logical_not(timesProcessed))
+        mask = numpy.logical_and(numpy.isin(yearsInDataSet, years),
+                                 numpy.logical_not(timesProcessed))
 
         timeIndices = numpy.nonzero(mask)[0]
 
@@ -229,17 +226,193 @@ def cache_time_series(timesInDataSet, timeSeriesCalcFunction, cacheFileName,
         firstProcessed = False
 
         if cacheDataSetExists:
-            dsCache = xr.concat([dsCache, ds], dim='Time')
-            # now sort the Time dimension:
-            dsCache = dsCache.loc[{'Time': sorted(dsCache.Time.values)}]
+            _append_to_cache(ds, cacheFileName)
         else:
-            dsCache = ds
+            ds.to_netcdf(cacheFileName, unlimited_dims=['Time'])
             cacheDataSetExists = True
 
-        dsCache.to_netcdf(cacheFileName)
+    with xr.open_dataset(cacheFileName, decode_times=False) as dsCache:
+        # force loading and then close so we can append to the file later
+        dsCache.load()
+
+    # records are stored in the order they were computed, so sort if needed
+    cachedTimes = dsCache.Time.values
+    if numpy.any(cachedTimes[1:] < cachedTimes[:-1]):
+        dsCache = dsCache.isel(Time=numpy.argsort(cachedTimes, kind='stable'))
 
     return dsCache.sel(Time=slice(timesInDataSet[0], timesInDataSet[-1]))
 
     # }}}
 
+
+def align_records(cachedKeys, expectedKeys):  # {{{
+    '''
+    Match previously computed (cached) records of a time series with the
+    records that are expected, using a single vectorized join on the keys that
+    identify each record (e.g. ``Time`` or ``year`` and ``month``)
+
+    Parameters
+    ----------
+    cachedKeys, expectedKeys : list of array-like
+        Parallel arrays of keys (e.g. ``[years, months]``) that together
+        identify each cached and each expected record
+
+    Returns
+    -------
+    cachedIndices, expectedIndices : ``numpy.ndarray``
+        Indices of the cached records that match expected records and of the
+        matching expected records (in increasing order)
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    cachedKeys = numpy.rec.fromarrays(
+        [numpy.asarray(key, dtype=float) for key in cachedKeys])
+    expectedKeys = numpy.rec.fromarrays(
+        [numpy.asarray(key, dtype=float) for key in expectedKeys])
+
+    # give each distinct key an integer code, then look up the expected index
+    # for the code of each cached record
+    uniqueKeys, codes = numpy.unique(
+        numpy.concatenate([expectedKeys, cachedKeys]), return_inverse=True)
+    codes = codes.ravel()
+    expectedCodes = codes[0:len(expectedKeys)]
+    cachedCodes = codes[len(expectedKeys):]
+
+    lookup = -numpy.ones(len(uniqueKeys), int)
+    lookup[expectedCodes] = numpy.arange(len(expectedKeys))
+    expectedIndices = lookup[cachedCodes]
+
+    cachedIndices = numpy.nonzero(expectedIndices >= 0)[0]
+    expectedIndices = expectedIndices[cachedIndices]
+
+    # if a record was cached more than once, keep the last copy
+    expectedIndices, lastIndices = numpy.unique(expectedIndices[::-1],
+                                                return_index=True)
+    cachedIndices = cachedIndices[::-1][lastIndices]
+
+    return cachedIndices, expectedIndices  # }}}
+
+
+def read_cached_records(cacheFileName, keyNames, expectedKeys,
+                        logger=None):  # {{{
+    '''
+    Read the records of a time series that were computed previously and
+    written to a cache file, aligned with the expected records, so that only
+    the remaining records need to be computed
+
+    Parameters
+    ----------
+    cacheFileName : str
+        The cache file from a previous (possibly incomplete) computation
+
+    keyNames : list of str
+        The names of the variables in the cache file (e.g. ``['Time']`` or
+        ``['year', 'month']``) that identify each record
+
+    expectedKeys : list of array-like
+        The values of the keys for each of the expected records
+
+    logger : ``logging.Logger``, optional
+        A logger to which to write output
+
+    Returns
+    -------
+    dsCache : ``xarray.Dataset`` or ``None``
+        The cached records that are expected, sorted in the order they are
+        expected, or ``None`` if there is no (readable) cache file
+
+    expectedIndices : ``numpy.ndarray``
+        The index of each record in ``dsCache`` among the expected records
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    if not os.path.exists(cacheFileName):
+        return None, numpy.zeros(0, int)
+
+    if logger is not None:
+        logger.info('   Read in previously computed time series')
+
+    try:
+        with xr.open_dataset(cacheFileName, decode_times=False) as dsCache:
+            # force loading and then close so we can overwrite the file later
+            dsCache.load()
+    except (IOError, OSError, RuntimeError):
+        # assuming the cache file is corrupt, so deleting it.
+        message = 'Deleting cache file {}, which appears to have ' \
+                  'been corrupted.'.format(cacheFileName)
+        if logger is None:
+            print('Warning: {}'.format(message))
+        else:
+            logger.warning(message)
+        os.remove(cacheFileName)
+        return None, numpy.zeros(0, int)
+
+    cachedIndices, expectedIndices = align_records(
+        [dsCache[keyName].values for keyName in keyNames], expectedKeys)
+
+    dsCache = dsCache.isel(Time=cachedIndices)
+
+    return dsCache, expectedIndices  # }}}
+
+
+def _read_cached_times(cacheFileName):  # {{{
+    '''
+    Read only the ``Time`` coordinate from a cache file
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    with netCDF4.Dataset(cacheFileName, 'r') as ncFile:
+        ncFile.set_auto_mask(False)
+        return ncFile.variables['Time'][:]  # }}}
+
+
+def _append_to_cache(ds, cacheFileName):  # {{{
+    '''
+    Append the records in ``ds`` along the unlimited ``Time`` dimension of an
+    existing cache file, without rewriting the records already there.  Cache
+    files written without an unlimited ``Time`` dimension are rewritten once
+    with one.
+    '''
+    # Authors
+    # -------
+    # Xylar Asay-Davis
+
+    with netCDF4.Dataset(cacheFileName, 'r') as ncFile:
+        isUnlimited = ncFile.dimensions['Time'].isunlimited()
+
+    if not isUnlimited:
+        with xr.open_dataset(cacheFileName, decode_times=False) as dsCache:
+            dsCache.load()
+        dsCache = xr.concat([dsCache, ds], dim='Time')
+        dsCache.to_netcdf(cacheFileName, unlimited_dims=['Time'])
+        return
+
+    with netCDF4.Dataset(cacheFileName, 'a') as ncFile:
+        ncFile.set_auto_mask(False)
+        firstRecord = len(ncFile.dimensions['Time'])
+        lastRecord = firstRecord + ds.sizes['Time']
+        for variableName in list(ds.variables):
+            var = ds[variableName]
+            if 'Time' not in var.dims:
+                continue
+            ncVar = ncFile.variables[variableName]
+            values = var.transpose(*[dim for dim in ncVar.dimensions
+                                     if dim in var.dims]).values
+            if ncVar.dtype == numpy.dtype('S1'):
+                # strings are stored as character arrays
+                stringLength = ncFile.dimensions[ncVar.dimensions[-1]].size
+                values = netCDF4.stringtochar(
+                    numpy.array(values, 'S{}'.format(stringLength)))
+            index = [slice(None)]*len(ncVar.dimensions)
+            index[ncVar.dimensions.index('Time')] = \
+                slice(firstRecord, lastRecord)
+            ncVar[tuple(index)] = values
+    # }}}
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -0,0 +1,129 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for copying images to the webpage and generating thumbnails
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import tempfile
+import shutil
+import numpy
+from lxml import etree
+from PIL import Image
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.configuration import MpasAnalysisConfigParser
+from mpas_analysis.shared.html import generate_thumbnails, \
+    collect_provenance, write_image_xml
+from mpas_analysis.shared.html import image_xml
+
+
+class TestImageXml(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def setup_config(self, parallelTaskCount=1):
+        config = MpasAnalysisConfigParser()
+        config.add_section('output')
+        config.set('output', 'baseDirectory', self.test_dir)
+        config.set('output', 'plotsSubdirectory', 'plots')
+        config.set('output', 'htmlSubdirectory', 'html')
+        config.add_section('execute')
+        config.set('execute', 'parallelTaskCount', str(parallelTaskCount))
+        os.makedirs('{}/plots'.format(self.test_dir))
+        return config
+
+    def write_image(self, imageFileName, size):
+        random = numpy.random.RandomState(0)
+        data = random.randint(0, 256, (size[1], size[0], 3)).astype('uint8')
+        Image.fromarray(data).save('{}/plots/{}'.format(self.test_dir,
+                                                        imageFileName))
+
+    def test_generate_thumbnails(self):
+        config = self.setup_config(parallelTaskCount=2)
+        images = [('horiz.png', 'ocean'), ('vert.png', 'sea_ice')]
+        self.write_image('horiz.png', (1600, 1000))
+        self.write_image('vert.png', (800, 1600))
+
+        updateCount = generate_thumbnails(config, images)
+        self.assertEqual(updateCount, 2)
+
+        for (imageFileName, subdirectory), thumbnailSize in \
+                zip(images, [(288, 180), (240, 480)]):
+            directory = '{}/html/{}'.format(self.test_dir, subdirectory)
+            assert os.path.exists('{}/{}'.format(directory, imageFileName))
+            thumbnail = Image.open('{}/thumbnails/{}'.format(directory,
+                                                             imageFileName))
+            self.assertEqual(thumbnail.size, thumbnailSize)
+            thumbnail = Image.open('{}/thumbnails/fixed_{}'.format(
+                directory, imageFileName))
+            self.assertEqual(thumbnail.size, (480, 360))
+
+    def test_skip_unchanged(self):
+        config = self.setup_config()
+        images = [('horiz.png', 'ocean'), ('vert.png', 'ocean')]
+        self.write_image('horiz.png', (1600, 1000))
+        self.write_image('vert.png', (800, 1600))
+
+        self.assertEqual(generate_thumbnails(config, images), 2)
+        self.assertEqual(generate_thumbnails(config, images), 0)
+
+        # an image that has been replaced gets updated
+        self.write_image('vert.png', (900, 1600))
+        sourceFileName = '{}/plots/vert.png'.format(self.test_dir)
+        mtime = os.path.getmtime(sourceFileName) + 10.
+        os.utime(sourceFileName, (mtime, mtime))
+        self.assertEqual(generate_thumbnails(config, images), 1)
+        thumbnail = Image.open('{}/html/ocean/thumbnails/vert.png'.format(
+            self.test_dir))
+        self.assertEqual(thumbnail.size, (270, 480))
+
+        # so does an image with a missing thumbnail
+        os.remove('{}/html/ocean/thumbnails/fixed_horiz.png'.format(
+            self.test_dir))
+        self.assertEqual(generate_thumbnails(config, images), 1)
+
+    def test_provenance(self):
+        config = self.setup_config()
+        config.add_section('html')
+        config.set('html', 'generate', 'True')
+        self.write_image('horiz.png', (1600, 1000))
+
+        image_xml._provenance = None
+        provenance = collect_provenance()
+        # the provenance is only collected once
+        assert collect_provenance() is provenance
+
+        for history in [None, 'ncks in.nc out.nc']:
+            write_image_xml(config, 'horiz', componentName='Ocean',
+                            componentSubdirectory='ocean',
+                            galleryGroup='group', groupLink='link',
+                            history=history)
+            xmlRoot = etree.parse('{}/plots/horiz.xml'.format(
+                self.test_dir)).getroot()
+            expectedHistory = provenance['call']
+            if history is not None:
+                expectedHistory = '{}; {}'.format(expectedHistory, history)
+            self.assertEqual(xmlRoot.find('history').text, expectedHistory)
+            for tag in ['cwd', 'host', 'githash']:
+                self.assertEqual(xmlRoot.find(tag).text, provenance[tag])
+            self.assertEqual(xmlRoot.find('imageSize').text, '1600x1000')
+            self.assertEqual(xmlRoot.find('orientation').text, 'horiz')
@@ -0,0 +1,96 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for 1D interpolation of fields with 1D or 2D coordinates
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+import xarray
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.shared.interpolation import interp_1d
+
+
+class TestInterp1D(TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.nPoints = 20
+        self.nVertLevels = 15
+        # decreasing with depth and NaN below the bottom, like zMid
+        zMid = -numpy.cumsum(random.uniform(5., 50., (self.nPoints,
+                                                     self.nVertLevels)),
+                             axis=1)
+        self.maxLevelCell = random.randint(1, self.nVertLevels+1,
+                                           self.nPoints)
+        zMid[numpy.arange(self.nVertLevels)[numpy.newaxis, :] >=
+             self.maxLevelCell[:, numpy.newaxis]] = numpy.nan
+        self.zMid = zMid
+        self.temperature = random.randn(self.nPoints, self.nVertLevels)
+        self.z = numpy.linspace(0., -600., 31)
+        # an output depth exactly at a model level
+        self.z[3] = zMid[0, 2]
+
+    def test_interp_1d_2d_coord(self):
+        ds = xarray.Dataset()
+        ds['zMid'] = (('nPoints', 'nVertLevels'), self.zMid)
+        ds['temperature'] = (('nPoints', 'nVertLevels'), self.temperature)
+        ds['z'] = (('nz',), self.z)
+        ds = ds.set_coords(['zMid', 'z'])
+
+        dsOut = interp_1d(ds, inInterpDim='nVertLevels', inInterpCoord='zMid',
+                          outInterpDim='nz', outInterpCoord='z')
+
+        self.assertEqual(dsOut.temperature.dims, ('nPoints', 'nz'))
+        for iPoint in range(self.nPoints):
+            levelCount = self.maxLevelCell[iPoint]
+            zColumn = self.zMid[iPoint, 0:levelCount]
+            expected = numpy.interp(-self.z, -zColumn,
+                                    self.temperature[iPoint, 0:levelCount],
+                                    left=numpy.nan, right=numpy.nan)
+            if levelCount == 1:
+                # no intervals to interpolate within
+                expected[:] = numpy.nan
+            numpy.testing.assert_allclose(
+                dsOut.temperature.values[iPoint, :], expected)
+
+    def test_interp_1d_searchsorted(self):
+        # a monotonic 1D input coordinate uses searchsorted and should give
+        # identical results to the same coordinate broadcast to 2D
+        zIn = numpy.linspace(0., -500., self.nVertLevels)
+        z = numpy.append(self.z, [zIn[0], zIn[-1], numpy.nan])
+
+        ds1D = xarray.Dataset()
+        ds1D['zIn'] = (('nVertLevels',), zIn)
+        ds1D['temperature'] = (('nPoints', 'nVertLevels'), self.temperature)
+        ds1D['z'] = (('nz',), z)
+        ds1D = ds1D.set_coords(['zIn', 'z'])
+
+        ds2D = ds1D.copy()
+        ds2D.coords['zIn'] = (('nPoints', 'nVertLevels'),
+                              numpy.tile(zIn, (self.nPoints, 1)))
+
+        dsOut1D = interp_1d(ds1D, inInterpDim='nVertLevels',
+                            inInterpCoord='zIn', outInterpDim='nz',
+                            outInterpCoord='z')
+        dsOut2D = interp_1d(ds2D, inInterpDim='nVertLevels',
+                            inInterpCoord='zIn', outInterpDim='nz',
+                            outInterpCoord='z')
+
+        self.assertArrayEqual(
+            dsOut1D.temperature.transpose('nPoints', 'nz').values,
+            dsOut2D.temperature.transpose('nPoints', 'nz').values)
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
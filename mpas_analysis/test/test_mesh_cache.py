@@ -0,0 +1,157 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for the mesh geometry cache
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import tempfile
+import shutil
+import numpy
+import xarray
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.configuration import MpasAnalysisConfigParser
+from mpas_analysis.shared.mesh import get_mesh_variables, \
+    get_derived_mesh_variables, get_mesh_operator, \
+    get_global_lat_bin_operator, get_mesh_cache_directory
+
+
+class TestMeshCache(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def setup_config(self):
+        config = MpasAnalysisConfigParser()
+        config.add_section('input')
+        config.set('input', 'mpasMeshName', 'oTest')
+        config.add_section('output')
+        config.set('output', 'baseDirectory', self.test_dir)
+        return config
+
+    def write_restart(self):
+        nCells = 5
+        nVertLevels = 3
+        dsRestart = xarray.Dataset()
+        dsRestart['areaCell'] = ('nCells', numpy.arange(1., nCells+1))
+        dsRestart['latCell'] = ('nCells',
+                                numpy.deg2rad([-60., -30., 0., 30., 60.]))
+        dsRestart['refBottomDepth'] = ('nVertLevels',
+                                       numpy.array([10., 30., 60.]))
+        dsRestart['layerThickness'] = \
+            (('Time', 'nCells', 'nVertLevels'),
+             numpy.ones((1, nCells, nVertLevels)))
+        fileName = '{}/restart.nc'.format(self.test_dir)
+        dsRestart.to_netcdf(fileName)
+        return fileName, dsRestart
+
+    def test_get_mesh_variables(self):
+        config = self.setup_config()
+        restartFileName, dsRestart = self.write_restart()
+        variableList = ['areaCell', 'refBottomDepth', 'layerThickness']
+
+        dsMesh = get_mesh_variables(config, restartFileName, variableList)
+
+        cacheDirectory = get_mesh_cache_directory(config)
+        self.assertEqual(cacheDirectory,
+                         '{}/mesh/oTest'.format(self.test_dir))
+        for variableName in variableList:
+            assert os.path.exists('{}/{}.npy'.format(cacheDirectory,
+                                                     variableName))
+
+        self.assertArrayEqual(dsMesh.areaCell.values,
+                              dsRestart.areaCell.values)
+        self.assertArrayEqual(dsMesh.refBottomDepth.values,
+                              dsRestart.refBottomDepth.values)
+
+        # the Time dimension is dropped
+        self.assertEqual(dsMesh.layerThickness.dims,
+                         ('nCells', 'nVertLevels'))
+        self.assertArrayEqual(dsMesh.layerThickness.values,
+                              dsRestart.layerThickness.isel(Time=0).values)
+
+        # the second time around, the variables come from the (read-only)
+        # cache
+        os.remove(restartFileName)
+        # touch a placeholder restart file older than the cache
+        open(restartFileName, 'w').close()
+        os.utime(restartFileName, (0, 0))
+        dsMesh = get_mesh_variables(config, restartFileName, ['areaCell'])
+        self.assertArrayEqual(dsMesh.areaCell.values,
+                              dsRestart.areaCell.values)
+        assert not dsMesh.areaCell.values.flags.writeable
+
+    def test_get_derived_mesh_variables(self):
+        config = self.setup_config()
+        restartFileName, dsRestart = self.write_restart()
+
+        def compute_variables():
+            dsMesh = get_mesh_variables(config, restartFileName,
+                                        ['areaCell'])
+            dsDerived = xarray.Dataset()
+            dsDerived['areaCell'] = 2.*dsMesh.areaCell
+            return dsDerived
+
+        dsDerived = get_derived_mesh_variables(config, restartFileName,
+                                               ['areaCell'], compute_variables)
+        self.assertArrayEqual(dsDerived.areaCell.values,
+                              2.*dsRestart.areaCell.values)
+
+        # derived variables don't replace those from the restart file
+        dsMesh = get_mesh_variables(config, restartFileName, ['areaCell'])
+        self.assertArrayEqual(dsMesh.areaCell.values,
+                              dsRestart.areaCell.values)
+
+        # the second time around, the variables come from the cache
+        def fail_to_compute_variables():
+            raise AssertionError('variables should have been cached')
+
+        dsDerived = get_derived_mesh_variables(config, restartFileName,
+                                               ['areaCell'],
+                                               fail_to_compute_variables)
+        self.assertArrayEqual(dsDerived.areaCell.values,
+                              2.*dsRestart.areaCell.values)
+
+    def test_get_mesh_operator(self):
+        config = self.setup_config()
+        restartFileName, dsRestart = self.write_restart()
+
+        latBins, operator = get_global_lat_bin_operator(
+            config, restartFileName, 45.)
+        self.assertArrayEqual(latBins, [-90., -45., 0., 45., 90.])
+        self.assertArrayEqual(operator.toarray(),
+                              [[1., 0., 0., 0., 0.],
+                               [0., 2., 0., 0., 0.],
+                               [0., 0., 3., 4., 0.],
+                               [0., 0., 0., 0., 5.]])
+
+        # the second time around, the operator comes from the cache, so the
+        # build function isn't called
+        def build_operator():
+            raise AssertionError('operator should have been cached')
+
+        os.utime(restartFileName, (0, 0))
+        cachedOperator = get_mesh_operator(config, restartFileName,
+                                           'globalLatBinOperator_45.0deg',
+                                           build_operator)
+        self.assertArrayEqual(cachedOperator.toarray(), operator.toarray())
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
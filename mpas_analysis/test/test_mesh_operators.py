@@ -0,0 +1,107 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for sparse mesh operators, compared against loops over latitude
+bins, cells and transect edges
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.shared.mesh import build_lat_bin_operator, \
+    build_transect_operator, build_edge_divergence_operator
+
+
+class TestMeshOperators(TestCase):
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.nCells = 500
+        self.nEdges = 800
+        self.nVertLevels = 10
+        self.latCell = random.uniform(-80., 80., self.nCells)
+        self.areaCell = random.uniform(1., 2., self.nCells)
+        self.regionCellMask = random.randint(0, 2, self.nCells)
+        self.verticalVel = random.randn(self.nCells, self.nVertLevels+1)
+        self.dvEdge = random.uniform(1., 2., self.nEdges)
+        self.horizontalVel = random.randn(self.nEdges, self.nVertLevels)
+        self.transectEdgeMaskSigns = random.randint(-1, 2, self.nEdges)
+        self.refLayerThickness = random.uniform(10., 20., self.nVertLevels)
+
+    def test_lat_bin_operator(self):
+        latBins = numpy.arange(-60., 60.1, 2.)
+        operator = build_lat_bin_operator(self.latCell, latBins,
+                                          weights=self.areaCell,
+                                          mask=self.regionCellMask)
+        self.assertEqual(operator.shape, (len(latBins)-1, self.nCells))
+
+        binSums = operator.dot(self.verticalVel)
+
+        velArea = self.verticalVel*self.areaCell[:, numpy.newaxis]
+        for iLat in range(1, len(latBins)):
+            indlat = numpy.logical_and(numpy.logical_and(
+                self.regionCellMask == 1, self.latCell >= latBins[iLat-1]),
+                self.latCell < latBins[iLat])
+            numpy.testing.assert_allclose(binSums[iLat-1, :],
+                                          velArea[indlat, :].sum(axis=0))
+
+    def test_transect_operator(self):
+        maxEdgesInTransect = 50
+        transectEdgeGlobalIDs = numpy.zeros(maxEdgesInTransect, int)
+        transectEdgeGlobalIDs[0:40] = numpy.arange(1, 801, 20)
+
+        operator = build_transect_operator(transectEdgeGlobalIDs,
+                                           self.transectEdgeMaskSigns,
+                                           self.dvEdge)
+        transportZ = operator.dot(self.horizontalVel)[0, :] * \
+            self.refLayerThickness
+
+        expected = numpy.zeros(self.nVertLevels)
+        for i in range(maxEdgesInTransect):
+            if transectEdgeGlobalIDs[i] == 0:
+                break
+            iEdge = transectEdgeGlobalIDs[i] - 1
+            expected += self.horizontalVel[iEdge, :] * \
+                self.transectEdgeMaskSigns[iEdge] * self.dvEdge[iEdge] * \
+                self.refLayerThickness
+
+        numpy.testing.assert_allclose(transportZ, expected)
+
+    def test_edge_divergence_operator(self):
+        random = numpy.random.RandomState(1)
+        cellsOnEdge = random.randint(1, self.nCells+1, (self.nEdges, 2))
+        # some edges on the boundary of the mesh
+        cellsOnEdge[0:20, 1] = 0
+        cellsOnEdge[20:40, 0] = 0
+
+        operator = build_edge_divergence_operator(cellsOnEdge, self.dvEdge,
+                                                  self.areaCell)
+        self.assertEqual(operator.shape, (self.nCells, self.nEdges))
+
+        divergence = operator.dot(self.horizontalVel)
+
+        expected = numpy.zeros((self.nCells, self.nVertLevels))
+        for iEdge in range(self.nEdges):
+            flux = self.horizontalVel[iEdge, :]*self.dvEdge[iEdge]
+            cell1, cell2 = cellsOnEdge[iEdge, :] - 1
+            if cell1 >= 0:
+                expected[cell1, :] += flux
+            if cell2 >= 0:
+                expected[cell2, :] -= flux
+        expected /= self.areaCell[:, numpy.newaxis]
+
+        numpy.testing.assert_allclose(divergence, expected)
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -0,0 +1,184 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for rasterizing fields on MPAS cells to images
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import numpy
+import pyproj
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.shared.mesh import MeshRasterizer, compute_cell_radius
+from mpas_analysis.shared.mesh.rasterizer import _lon_lat_to_cartesian
+
+
+class TestMeshRasterizer(TestCase):
+
+    def setup_mesh(self):
+        # cell centers on a regular 2-degree grid covering part of the globe,
+        # with the vertices of each cell at the corners of its grid box
+        lonCell = numpy.deg2rad(numpy.arange(-89., 90., 2.))
+        latCell = numpy.deg2rad(numpy.arange(-59., 60., 2.))
+        lonCell, latCell = numpy.meshgrid(lonCell, latCell)
+        lonCell = lonCell.ravel()
+        latCell = latCell.ravel()
+        delta = numpy.deg2rad(1.)
+        offsets = numpy.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])*delta
+        lonVertex = (lonCell[:, numpy.newaxis] + offsets[:, 0]).ravel()
+        latVertex = (latCell[:, numpy.newaxis] + offsets[:, 1]).ravel()
+        # a fifth, unused entry to make sure only nEdgesOnCell are used
+        verticesOnCell = numpy.zeros((len(lonCell), 5), int)
+        verticesOnCell[:, 0:4] = numpy.arange(1, len(lonVertex) + 1).reshape(
+            len(lonCell), 4)
+        nEdgesOnCell = 4*numpy.ones(len(lonCell), int)
+        cellRadius = compute_cell_radius(latCell, lonCell, latVertex,
+                                         lonVertex, verticesOnCell,
+                                         nEdgesOnCell)
+
+        # the neighbors to the south, east, north and west, with 0 where
+        # there is no neighbor
+        nLat, nLon = 60, 90
+        iLon, iLat = numpy.meshgrid(numpy.arange(nLon), numpy.arange(nLat))
+        iLon = iLon.ravel()
+        iLat = iLat.ravel()
+        cellsOnCell = numpy.zeros((len(lonCell), 5), int)
+        for edge, (dLon, dLat) in enumerate([(0, -1), (1, 0), (0, 1),
+                                             (-1, 0)]):
+            neighborLon = iLon + dLon
+            neighborLat = iLat + dLat
+            valid = numpy.logical_and(
+                numpy.logical_and(neighborLon >= 0, neighborLon < nLon),
+                numpy.logical_and(neighborLat >= 0, neighborLat < nLat))
+            cellsOnCell[:, edge] = numpy.where(
+                valid, neighborLat*nLon + neighborLon + 1, 0)
+
+        self.meshVertices = {'latVertex': latVertex,
+                             'lonVertex': lonVertex,
+                             'verticesOnCell': verticesOnCell,
+                             'nEdgesOnCell': nEdgesOnCell,
+                             'cellsOnCell': cellsOnCell}
+        return latCell, lonCell, cellRadius
+
+    def test_compute_cell_radius(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        # the largest distance to a vertex is toward the equator
+        points = _lon_lat_to_cartesian(
+            lonCell + numpy.deg2rad(1.),
+            latCell - numpy.sign(latCell)*numpy.deg2rad(1.))
+        expected = numpy.linalg.norm(
+            points - _lon_lat_to_cartesian(lonCell, latCell), axis=1)
+        numpy.testing.assert_allclose(cellRadius, expected)
+
+    def test_nearest_cell(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        rasterizer = MeshRasterizer(latCell, lonCell, cellRadius)
+
+        pixelCells = rasterizer.get_lon_lat_pixel_cells(-30., 30., -20., 20.,
+                                                        60, 40)
+        self.assertEqual(pixelCells.shape, (40, 60))
+        assert numpy.all(pixelCells >= 0)
+
+        # compare with a brute-force search for the nearest cell center
+        lon = numpy.deg2rad(numpy.linspace(-29.5, 29.5, 60))
+        lat = numpy.deg2rad(numpy.linspace(-19.5, 19.5, 40))
+        lon, lat = numpy.meshgrid(lon, lat)
+        pixelPoints = _lon_lat_to_cartesian(lon.ravel(), lat.ravel())
+        cellPoints = _lon_lat_to_cartesian(lonCell, latCell)
+        distance = numpy.linalg.norm(
+            pixelPoints[:, numpy.newaxis, :] - cellPoints[numpy.newaxis, :, :],
+            axis=2)
+        expected = numpy.argmin(distance, axis=1).reshape(lon.shape)
+        numpy.testing.assert_array_equal(pixelCells, expected)
+
+        # the result is cached
+        assert rasterizer.get_lon_lat_pixel_cells(-30., 30., -20., 20.,
+                                                  60, 40) is pixelCells
+
+    def test_outside_mesh(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        rasterizer = MeshRasterizer(latCell, lonCell, cellRadius)
+
+        pixelCells = rasterizer.get_lon_lat_pixel_cells(-180., 180., -90.,
+                                                        90., 36, 18)
+        lon = numpy.linspace(-175., 175., 36)
+        lat = numpy.linspace(-85., 85., 18)
+        lon, lat = numpy.meshgrid(lon, lat)
+        inside = numpy.logical_and(numpy.abs(lon) < 90.,
+                                   numpy.abs(lat) < 60.)
+        numpy.testing.assert_array_equal(pixelCells >= 0, inside)
+
+    def test_boundary_cell_polygons(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        rasterizer = MeshRasterizer(latCell, lonCell, cellRadius,
+                                    **self.meshVertices)
+
+        # pixels 0.25 degrees from the edges of cells
+        pixelCells = rasterizer.get_lon_lat_pixel_cells(-100., 100., -70.,
+                                                        70., 400, 280)
+        lon = numpy.linspace(-99.75, 99.75, 400)
+        lat = numpy.linspace(-69.75, 69.75, 280)
+        lon, lat = numpy.meshgrid(lon, lat)
+        inside = numpy.logical_and(numpy.abs(lon) < 90.,
+                                   numpy.abs(lat) < 60.)
+        numpy.testing.assert_array_equal(pixelCells >= 0, inside)
+
+        # inside the mesh, pixels are in the cell with the nearest center
+        approximate = MeshRasterizer(latCell, lonCell, cellRadius)
+        approximatePixelCells = approximate.get_lon_lat_pixel_cells(
+            -100., 100., -70., 70., 400, 280)
+        numpy.testing.assert_array_equal(pixelCells[inside],
+                                         approximatePixelCells[inside])
+
+        # without the polygons, the mesh extends past its boundary
+        assert numpy.any(approximatePixelCells[numpy.logical_not(inside)]
+                         >= 0)
+
+    def test_projection(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        rasterizer = MeshRasterizer(latCell, lonCell, cellRadius)
+
+        projection = pyproj.Proj('+proj=stere +lat_ts=-71.0 +lat_0=-90 '
+                                 '+lon_0=0.0 +k_0=1.0 +x_0=0.0 +y_0=0.0 '
+                                 '+ellps=WGS84')
+        pixelCells = rasterizer.get_projection_pixel_cells(
+            projection, -6e6, 6e6, -6e6, 6e6, 50, 50)
+        self.assertEqual(pixelCells.shape, (50, 50))
+
+        x = numpy.linspace(-5.88e6, 5.88e6, 50)
+        x, y = numpy.meshgrid(x, x)
+        lon, lat = projection(x, y, inverse=True)
+        expected = rasterizer.get_pixel_cells(lon, lat)
+        numpy.testing.assert_array_equal(pixelCells, expected)
+        # the mesh doesn't reach the pole
+        self.assertEqual(pixelCells[25, 25], -1)
+        assert numpy.any(pixelCells >= 0)
+
+    def test_rasterize(self):
+        latCell, lonCell, cellRadius = self.setup_mesh()
+        rasterizer = MeshRasterizer(latCell, lonCell, cellRadius)
+
+        field = numpy.arange(rasterizer.cellCount, dtype=float)
+        field[0] = numpy.nan
+        pixelCells = numpy.array([[-1, 0], [1, 2]])
+        image = rasterizer.rasterize(field, pixelCells)
+        numpy.testing.assert_array_equal(image.mask, [[True, True],
+                                                      [False, False]])
+        numpy.testing.assert_array_equal(image[1, :], [1., 2.])
+
+        with self.assertRaisesRegexp(ValueError, 'cells of the mesh'):
+            rasterizer.rasterize(field[0:10], pixelCells)
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -19,6 +19,7 @@ from __future__ import absolute_import, division, print_function, \
     unicode_literals
 
 import numpy
+import xarray
 
 import pytest
 from mpas_analysis.test import TestCase, loaddatadir
@@ -193,4 +194,37 @@ class TestMpasXarray(TestCase):
         # Make sure there are 2.
         self.assertEqual(len(ds.Time.values), 2)
 
+    def test_auto_chunking(self):
+        nTime = 24
+        nCells = 1000
+        nVertLevels = 10
+        ds = xarray.Dataset()
+        ds['temperature'] = (('Time', 'nCells', 'nVertLevels'),
+                             numpy.zeros((nTime, nCells, nVertLevels)))
+        ds['ssh'] = (('Time', 'nCells'), numpy.zeros((nTime, nCells)))
+
+        bytesPerTime = nCells*nVertLevels*8
+
+        # enough memory for 3 time slices of temperature per chunk (with a
+        # safety factor of 4)
+        dsChunked = mpas_xarray.process_chunking(
+            ds, 'auto', memoryLimit=4*3*bytesPerTime)
+        self.assertEqual(dsChunked.chunks['Time'][0], 3)
+        self.assertEqual(dsChunked.chunks['nCells'][0], nCells)
+
+        # two threads each need a chunk, so only a single time slice fits
+        dsChunked = mpas_xarray.process_chunking(
+            ds, 'auto', memoryLimit=4*3*bytesPerTime, threadCount=2)
+        self.assertEqual(dsChunked.chunks['Time'][0], 1)
+        self.assertEqual(dsChunked.chunks['nCells'][0], nCells)
+
+        # not enough memory for a whole time slice, so split along nCells
+        dsChunked = mpas_xarray.process_chunking(
+            ds, 'auto', memoryLimit=bytesPerTime)
+        self.assertEqual(dsChunked.chunks['Time'][0], 1)
+        self.assertEqual(dsChunked.chunks['nCells'][0], nCells//4)
+
+        with self.assertRaisesRegexp(ValueError, 'memoryLimit'):
+            mpas_xarray.process_chunking(ds, 'auto')
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
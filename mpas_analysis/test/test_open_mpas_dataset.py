@@ -21,6 +21,7 @@ from __future__ import absolute_import, division, print_function, \
 import pytest
 from mpas_analysis.test import TestCase, loaddatadir
 from mpas_analysis.shared.io import open_mpas_dataset
+from mpas_analysis.shared.io.mpas_reader import _get_drop_variables
 
 
 @pytest.mark.usefixtures("loaddatadir")
@@ -86,4 +87,28 @@ class TestOpenMpasDataset(TestCase):
             timeVariableNames=['xtime_startMonthly', 'xtime_endMonthly'],
             variableList=['timeMonthly_avg_tThreshMLD'])
 
+    def test_drop_variables(self):
+        fileName = str(self.datadir.join('timeSeries.nc'))
+        calendar = 'gregorian_noleap'
+        timestr = ['xtime_startMonthly', 'xtime_endMonthly']
+        variableList = ['timeMonthly_avg_tThreshMLD']
+
+        dsFull = open_mpas_dataset(fileName=fileName, calendar=calendar,
+                                   timeVariableNames=timestr)
+
+        # variables not in the list and not time variables are never read
+        dropVariables = _get_drop_variables(fileName,
+                                            variableList + timestr)
+        self.assertTrue(len(dropVariables) > 0)
+        for varName in variableList + timestr:
+            assert(varName not in dropVariables)
+
+        ds = open_mpas_dataset(fileName=fileName, calendar=calendar,
+                               timeVariableNames=timestr,
+                               variableList=variableList)
+        self.assertEqual(list(ds.data_vars.keys()), variableList)
+        self.assertArrayEqual(ds.Time.values, dsFull.Time.values)
+        self.assertArrayEqual(ds[variableList[0]].values,
+                              dsFull[variableList[0]].values)
+
 # vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -0,0 +1,128 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for incrementally generating the analysis webpage
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import tempfile
+import shutil
+from collections import OrderedDict
+from PIL import Image
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.configuration import MpasAnalysisConfigParser
+from mpas_analysis.shared.html import generate_html, write_image_xml
+from mpas_analysis.shared.html import pages
+
+
+class MockTask(object):
+    def __init__(self, xmlFileNames):
+        self.xmlFileNames = xmlFileNames
+
+
+class TestPages(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+        # count the XML files that get parsed
+        self.parsedFiles = []
+        self.read_image_xml = pages.ComponentPage._read_image_xml
+
+        def read_image_xml(xmlFileName):
+            self.parsedFiles.append(os.path.basename(xmlFileName))
+            return self.read_image_xml(xmlFileName)
+
+        pages.ComponentPage._read_image_xml = staticmethod(read_image_xml)
+
+    def tearDown(self):
+        pages.ComponentPage._read_image_xml = staticmethod(
+            self.read_image_xml)
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def setup_config(self):
+        config = MpasAnalysisConfigParser()
+        config.add_section('runs')
+        config.set('runs', 'mainRunName', 'test')
+        config.add_section('output')
+        config.set('output', 'baseDirectory', self.test_dir)
+        config.set('output', 'plotsSubdirectory', 'plots')
+        config.set('output', 'htmlSubdirectory', 'html')
+        config.add_section('execute')
+        config.set('execute', 'parallelTaskCount', '1')
+        config.add_section('html')
+        config.set('html', 'generate', 'True')
+        os.makedirs('{}/plots'.format(self.test_dir))
+        return config
+
+    def write_plot(self, config, filePrefix, componentName,
+                   componentSubdirectory, caption):
+        Image.new('RGB', (800, 600)).save('{}/plots/{}.png'.format(
+            self.test_dir, filePrefix))
+        write_image_xml(config, filePrefix, componentName=componentName,
+                        componentSubdirectory=componentSubdirectory,
+                        galleryGroup='Group', groupLink='group',
+                        imageCaption=caption)
+        return '{}/plots/{}.xml'.format(self.test_dir, filePrefix)
+
+    def test_incremental(self):
+        config = self.setup_config()
+        oceanXml = self.write_plot(config, 'sst', 'Ocean', 'ocean',
+                                   'Sea surface temperature')
+        seaIceXml = self.write_plot(config, 'ice', 'Sea Ice', 'sea_ice',
+                                    'Sea ice concentration')
+        analyses = OrderedDict()
+        analyses['ocean'] = MockTask([oceanXml])
+        analyses['seaIce'] = MockTask([seaIceXml])
+
+        generate_html(config, analyses)
+        self.assertEqual(sorted(self.parsedFiles), ['ice.xml', 'sst.xml'])
+        oceanPage = '{}/html/ocean/index.html'.format(self.test_dir)
+        seaIcePage = '{}/html/sea_ice/index.html'.format(self.test_dir)
+        with open(oceanPage) as pageFile:
+            assert 'Sea surface temperature' in pageFile.read()
+        assert os.path.exists(seaIcePage)
+
+        # nothing has changed, so nothing is parsed or rewritten
+        os.remove(seaIcePage)
+        self.parsedFiles = []
+        os.utime(oceanPage, (0., 0.))
+        generate_html(config, analyses)
+        self.assertEqual(self.parsedFiles, [])
+        self.assertEqual(os.path.getmtime(oceanPage), 0.)
+        # but a page that has gone missing is written again
+        assert os.path.exists(seaIcePage)
+
+        # only the modified XML file is parsed and its page rewritten
+        self.write_plot(config, 'sst', 'Ocean', 'ocean',
+                        'Sea surface temperature (new)')
+        mtime = os.path.getmtime(oceanXml) + 10.
+        os.utime(oceanXml, (mtime, mtime))
+        os.utime(seaIcePage, (0., 0.))
+        generate_html(config, analyses)
+        self.assertEqual(self.parsedFiles, ['sst.xml'])
+        self.assertEqual(os.path.getmtime(seaIcePage), 0.)
+        with open(oceanPage) as pageFile:
+            assert 'Sea surface temperature (new)' in pageFile.read()
+
+        # a missing XML file is skipped
+        self.parsedFiles = []
+        missingXml = '{}/plots/missing.xml'.format(self.test_dir)
+        analyses['seaIce'] = MockTask([seaIceXml, missingXml])
+        generate_html(config, analyses, inProgress=True)
+        self.assertEqual(self.parsedFiles, [])
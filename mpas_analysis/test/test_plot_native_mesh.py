@@ -0,0 +1,163 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for plotting fields on the native MPAS mesh
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import tempfile
+import shutil
+import numpy
+import pyproj
+import pkg_resources
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from mpas_analysis.test import TestCase  # noqa: E402
+from mpas_analysis.configuration import MpasAnalysisConfigParser  # noqa: E402
+from mpas_analysis.shared.mesh import MeshRasterizer, \
+    compute_cell_radius  # noqa: E402
+from mpas_analysis.shared.plot.plotting import plot_native_mesh  # noqa: E402
+
+
+class TestPlotNativeMesh(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def setup_config(self):
+        config = MpasAnalysisConfigParser()
+        config.read(pkg_resources.resource_filename('mpas_analysis',
+                                                    'config.default'))
+        config.set('plot', 'dpi', '50')
+        # so the image is exactly the size of the figure
+        config.set('plot', 'tightBoundingBox', 'False')
+        config.add_section('testColormap')
+        config.set('testColormap', 'colormapNameResult', 'viridis')
+        config.set('testColormap', 'normTypeResult', 'linear')
+        config.set('testColormap', 'normArgsResult',
+                   "{'vmin': 0., 'vmax': 1.}")
+        return config
+
+    def setup_rasterizer(self):
+        # cell centers on a regular 2-degree grid covering longitudes between
+        # -90 and 90 degrees and latitudes between -60 and 60 degrees
+        lonCell = numpy.deg2rad(numpy.arange(-89., 90., 2.))
+        latCell = numpy.deg2rad(numpy.arange(-59., 60., 2.))
+        lonCell, latCell = numpy.meshgrid(lonCell, latCell)
+        lonCell = lonCell.ravel()
+        latCell = latCell.ravel()
+        delta = numpy.deg2rad(1.)
+        offsets = numpy.array([[-1, -1], [1, -1], [1, 1], [-1, 1]])*delta
+        lonVertex = (lonCell[:, numpy.newaxis] + offsets[:, 0]).ravel()
+        latVertex = (latCell[:, numpy.newaxis] + offsets[:, 1]).ravel()
+        verticesOnCell = numpy.arange(1, len(lonVertex) + 1).reshape(
+            len(lonCell), 4)
+        nEdgesOnCell = 4*numpy.ones(len(lonCell), int)
+        cellRadius = compute_cell_radius(latCell, lonCell, latVertex,
+                                         lonVertex, verticesOnCell,
+                                         nEdgesOnCell)
+        return MeshRasterizer(latCell, lonCell, cellRadius)
+
+    def read_image(self, fileName, figsize, dpi):
+        image = numpy.array(Image.open(fileName).convert('RGB'), int)
+        self.assertEqual(image.shape, (figsize[1]*dpi, figsize[0]*dpi, 3))
+        return image
+
+    def find_color(self, image, color):
+        color = numpy.round(255*numpy.array(color[0:3]))
+        return numpy.all(numpy.abs(image - color) <= 1, axis=2)
+
+    def find_map(self, land, ocean):
+        # the map is where whole rows and columns are land or ocean, rather
+        # than a few (antialiased) pixels of text
+        inMap = numpy.logical_or(land, ocean)
+        rows = numpy.nonzero(numpy.sum(inMap, axis=1) > 20)[0]
+        columns = numpy.nonzero(numpy.sum(inMap, axis=0) > 20)[0]
+        return rows[0], rows[-1], columns[0], columns[-1]
+
+    def test_lon_lat(self):
+        config = self.setup_config()
+        rasterizer = self.setup_rasterizer()
+        field = 0.5*numpy.ones(rasterizer.cellCount)
+        fileName = '{}/lon_lat.png'.format(self.test_dir)
+        figsize = (8, 4)
+
+        plot_native_mesh(config, rasterizer, field, fileName, 'testColormap',
+                         [-180., 0., -30., 30.], title='Lon/Lat',
+                         figsize=figsize)
+
+        assert len(plt.get_fignums()) == 0
+        image = self.read_image(fileName, figsize, dpi=50)
+
+        # the image of the field has the aspect ratio of the bounds
+        (key, pixelCells), = rasterizer._pixelCells.items()
+        nLat, nLon = pixelCells.shape
+        assert abs(nLon - 3*nLat) <= 1
+
+        # west of -90 degrees is land, east is ocean
+        land = self.find_color(image, (0.8, 0.8, 0.8))
+        ocean = self.find_color(image, plt.get_cmap('viridis')(0.5))
+        rowMin, rowMax, columnMin, columnMax = self.find_map(land, ocean)
+        row = (rowMin + rowMax)//2
+        landColumns = numpy.nonzero(land[row, :])[0]
+        oceanColumns = numpy.nonzero(ocean[row, :])[0]
+        assert len(landColumns) > 0 and len(oceanColumns) > 0
+        assert landColumns.max() < oceanColumns.min()
+        # the land and ocean are equally wide
+        assert abs(len(landColumns) - len(oceanColumns)) <= 4
+
+    def test_projection(self):
+        config = self.setup_config()
+        rasterizer = self.setup_rasterizer()
+        field = 0.5*numpy.ones(rasterizer.cellCount)
+        fileName = '{}/projection.png'.format(self.test_dir)
+        figsize = (6, 6)
+
+        projection = pyproj.Proj('+proj=stere +lat_ts=-71.0 +lat_0=-90 '
+                                 '+lon_0=0.0 +k_0=1.0 +x_0=0.0 +y_0=0.0 '
+                                 '+ellps=WGS84')
+        plot_native_mesh(config, rasterizer, field, fileName, 'testColormap',
+                         [-8e6, 8e6, -8e6, 8e6], projection=projection,
+                         figsize=figsize)
+
+        assert len(plt.get_fignums()) == 0
+        image = self.read_image(fileName, figsize, dpi=50)
+
+        (key, pixelCells), = rasterizer._pixelCells.items()
+        self.assertEqual(pixelCells.shape[0], pixelCells.shape[1])
+
+        # the mesh only covers longitudes between -90 and 90 degrees, the top
+        # half of the map, and doesn't reach the pole in the middle
+        land = self.find_color(image, (0.8, 0.8, 0.8))
+        ocean = self.find_color(image, plt.get_cmap('viridis')(0.5))
+        rowMin, rowMax, columnMin, columnMax = self.find_map(land, ocean)
+        row = (rowMin + rowMax)//2
+        column = (columnMin + columnMax)//2
+        quarter = (rowMax - rowMin)//4
+        assert ocean[rowMin + quarter, column]
+        assert land[rowMax - quarter, column]
+        assert land[row - 2, column]
+        assert ocean[row - 2, columnMin + 2]
+        assert ocean[row - 2, columnMax - 2]
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
@@ -0,0 +1,130 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for running plot tasks on plot workers
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import tempfile
+import shutil
+import numpy
+import pkg_resources
+from multiprocessing import Value
+from six.moves import queue
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+
+from mpas_analysis.test import TestCase  # noqa: E402
+from mpas_analysis.configuration import MpasAnalysisConfigParser  # noqa: E402
+from mpas_analysis.shared.plot import plotting  # noqa: E402
+from mpas_analysis.shared.plot.plot_worker import _run_worker  # noqa: E402
+
+
+class SeasonPlotTask(object):
+    '''
+    A stand-in for a climatology map subtask that plots one season
+    '''
+    def __init__(self, config, season, fileName):
+        self.config = config
+        self.season = season
+        self.fileName = fileName
+        self.template = None
+
+    def run(self, writeLogFile=True):
+        random = numpy.random.RandomState(len(self.season))
+        nx = 20
+        x = numpy.linspace(-1e6, 1e6, nx+1)
+        landMask = numpy.ma.masked_array(numpy.ones((nx, nx)),
+                                         mask=numpy.ones((nx, nx), bool))
+        modelArray = random.rand(nx, nx)
+        refArray = random.rand(nx, nx)
+        plotting.plot_polar_projection_comparison(
+            self.config, x, x, landMask, modelArray, refArray,
+            modelArray - refArray, self.fileName, 'testColormap',
+            title='SST ({})'.format(self.season))
+        templates = list(plotting._figureTemplates.values())
+        if len(templates) > 0:
+            self.template = templates[-1]
+
+
+class TestPlotWorker(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+        plotting._figureTemplates.clear()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+        plotting._figureTemplates.clear()
+        plt.close('all')
+
+    def setup_config(self):
+        config = MpasAnalysisConfigParser()
+        config.read(pkg_resources.resource_filename('mpas_analysis',
+                                                    'config.default'))
+        config.set('plot', 'dpi', '50')
+        config.add_section('testColormap')
+        for suffix in ['Result', 'Difference']:
+            config.set('testColormap', 'colormapName{}'.format(suffix),
+                       'viridis')
+            config.set('testColormap', 'normType{}'.format(suffix), 'linear')
+            config.set('testColormap', 'normArgs{}'.format(suffix),
+                       "{'vmin': -1., 'vmax': 1.}")
+        return config
+
+    def test_reuse_template_across_tasks(self):
+        config = self.setup_config()
+        tasks = [SeasonPlotTask(config, season,
+                                '{}/sst_{}.png'.format(self.test_dir, season))
+                 for season in ['JFM', 'JAS']]
+
+        taskQueue = queue.Queue()
+        doneQueue = queue.Queue()
+        for index in [0, 1, None]:
+            taskQueue.put(index)
+
+        _run_worker(tasks, taskQueue, doneQueue, Value('i', -1))
+
+        self.assertEqual(doneQueue.get_nowait(), 0)
+        self.assertEqual(doneQueue.get_nowait(), 1)
+        for task in tasks:
+            assert os.path.exists(task.fileName)
+
+        # the second season was plotted into the figure left open by the
+        # first, and only the template is still open
+        assert tasks[1].template is tasks[0].template
+        self.assertEqual(plt.get_fignums(), [tasks[0].template.fig.number])
+
+    def test_no_reuse_if_disabled(self):
+        config = self.setup_config()
+        config.set('plot', 'reuseFigureTemplates', 'False')
+        task = SeasonPlotTask(config, 'ANN',
+                              '{}/sst_ANN.png'.format(self.test_dir))
+
+        taskQueue = queue.Queue()
+        for index in [0, None]:
+            taskQueue.put(index)
+
+        _run_worker([task], taskQueue, queue.Queue(), Value('i', -1))
+
+        assert os.path.exists(task.fileName)
+        self.assertEqual(len(plotting._figureTemplates), 0)
+        self.assertEqual(plt.get_fignums(), [])
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
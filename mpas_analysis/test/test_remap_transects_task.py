@@ -0,0 +1,212 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for remapping climatologies to all transect collections at once
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import os
+import tempfile
+import shutil
+import numpy
+import xarray
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.configuration import MpasAnalysisConfigParser
+from mpas_analysis.shared import AnalysisTask
+from mpas_analysis.shared.grid import MpasMeshDescriptor, \
+    PointCollectionDescriptor
+from mpas_analysis.shared.interpolation import Remapper
+from mpas_analysis.ocean.remap_transects_task import RemapTransectsTask
+
+
+class TransectSubtask(object):
+    '''
+    Stands in for the ``ComputeTransectsSubtask`` of one transect collection,
+    with a remapper that uses a hand-written mapping file
+    '''
+    def __init__(self, testDir, transectCollectionName, seasons, lats, lons,
+                 mpasDescriptor, row, col, S):
+        self.testDir = testDir
+        self.transectCollectionName = transectCollectionName
+        self.seasons = seasons
+        self.collectionDescriptor = PointCollectionDescriptor(
+            lats, lons, collectionName=transectCollectionName,
+            units='degrees', outDimension='nPoints')
+
+        mappingFileName = '{}/map_{}_to_{}_bilinear.nc'.format(
+            testDir, mpasDescriptor.meshName, transectCollectionName)
+        write_mapping_file(mappingFileName, mpasDescriptor.dimSize[0],
+                           len(lats), row, col, S)
+
+        self.remappers = {transectCollectionName: Remapper(
+            mpasDescriptor, self.collectionDescriptor, mappingFileName)}
+
+    def get_remapped_file_name(self, season, comparisonGridName):
+        return '{}/remapped_{}_{}.nc'.format(self.testDir, comparisonGridName,
+                                             season)
+
+
+def write_mapping_file(fileName, nSource, nDestination, row, col, S):
+    '''
+    Write a mapping file in the ESMF format with the given (1-based) rows and
+    columns of the mapping matrix
+    '''
+    row = numpy.array(row, dtype=numpy.int32)
+    col = numpy.array(col, dtype=numpy.int32)
+    S = numpy.array(S, dtype=float)
+
+    frac_b = numpy.zeros(nDestination)
+    numpy.add.at(frac_b, row - 1, S)
+
+    dsMapping = xarray.Dataset()
+    dsMapping['frac_a'] = (('n_a',), numpy.ones(nSource))
+    dsMapping['frac_b'] = (('n_b',), frac_b)
+    dsMapping['col'] = (('n_s',), col)
+    dsMapping['row'] = (('n_s',), row)
+    dsMapping['S'] = (('n_s',), S)
+    dsMapping['src_grid_dims'] = \
+        (('src_grid_rank',), numpy.array([nSource], dtype=numpy.int32))
+    dsMapping['dst_grid_dims'] = \
+        (('dst_grid_rank',), numpy.array([nDestination], dtype=numpy.int32))
+    dsMapping.to_netcdf(fileName)
+
+
+class TestRemapTransectsTask(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def setup_config(self):
+        config = MpasAnalysisConfigParser()
+        config.add_section('climatology')
+        config.set('climatology', 'mpasInterpolationMethod', 'bilinear')
+        config.add_section('output')
+        config.set('output', 'baseDirectory', self.test_dir)
+        config.set('output', 'mappingSubdirectory', 'mapping')
+        return config
+
+    def setup_mesh(self):
+        nCells = 6
+        dsMesh = xarray.Dataset()
+        dsMesh['latCell'] = ('nCells', numpy.deg2rad(
+            numpy.linspace(-50., 50., nCells)))
+        dsMesh['lonCell'] = ('nCells', numpy.deg2rad(
+            numpy.linspace(0., 100., nCells)))
+        fileName = '{}/mesh.nc'.format(self.test_dir)
+        dsMesh.to_netcdf(fileName)
+        return MpasMeshDescriptor(fileName, meshName='oTest')
+
+    def setup_task(self, seasons=None):
+        if seasons is None:
+            seasons = [['ANN'], ['ANN']]
+        config = self.setup_config()
+        mpasDescriptor = self.setup_mesh()
+
+        mpasClimatologyTask = AnalysisTask(
+            config=config, taskName='mpasClimatologyOcean',
+            componentName='ocean')
+        task = RemapTransectsTask(config, mpasClimatologyTask)
+
+        # the first collection interpolates between pairs of cells
+        subtask = TransectSubtask(
+            self.test_dir, 'first', seasons[0], lats=[-40., -20., 0.],
+            lons=[10., 30., 50.], mpasDescriptor=mpasDescriptor,
+            row=[1, 1, 2, 2, 3, 3], col=[1, 2, 2, 3, 3, 4],
+            S=[0.25, 0.75, 0.5, 0.5, 0.9, 0.1])
+        task.transectSubtasks.append(subtask)
+
+        # the second collection has a point that is only partly covered and
+        # one that isn't covered at all
+        subtask = TransectSubtask(
+            self.test_dir, 'second', seasons[1], lats=[20., 45.],
+            lons=[70., 90.], mpasDescriptor=mpasDescriptor,
+            row=[1, 1], col=[5, 6], S=[0.3, 0.2])
+        task.transectSubtasks.append(subtask)
+
+        return task
+
+    def test_combined_remapper(self):
+        task = self.setup_task()
+        remapper, offsets = task._get_combined_remapper()
+
+        numpy.testing.assert_array_equal(offsets, [0, 3, 5])
+        assert os.path.exists(remapper.mappingFileName)
+        assert remapper.destinationDescriptor.meshName == 'first_second'
+
+        nCells = 6
+        nVertLevels = 2
+        dsIn = xarray.Dataset()
+        dsIn['temperature'] = \
+            (('nCells', 'nVertLevels'),
+             numpy.arange(nCells*nVertLevels, dtype=float).reshape(
+                 nCells, nVertLevels))
+        # invalid in the second layer of one of the cells of each collection
+        dsIn.temperature[1, 1] = numpy.nan
+        dsIn.temperature[4, 1] = numpy.nan
+
+        for renormalizationThreshold in [None, 0.01]:
+            dsCombined = remapper.remap(dsIn, renormalizationThreshold)
+            assert dsCombined.sizes['nPoints'] == offsets[-1]
+
+            for index, subtask in enumerate(task.transectSubtasks):
+                collectionRemapper = \
+                    subtask.remappers[subtask.transectCollectionName]
+                dsExpected = collectionRemapper.remap(
+                    dsIn, renormalizationThreshold)
+                dsSlice = dsCombined.isel(nPoints=slice(offsets[index],
+                                                        offsets[index+1]))
+                numpy.testing.assert_array_equal(
+                    dsSlice.temperature.values, dsExpected.temperature.values)
+                numpy.testing.assert_array_equal(
+                    dsSlice.lat.values, dsExpected.lat.values)
+                numpy.testing.assert_array_equal(
+                    dsSlice.lon.values, dsExpected.lon.values)
+
+        # the uncovered point is invalid, not just zero
+        assert numpy.all(numpy.isnan(dsCombined.temperature.values[4, :]))
+
+    def test_reuse_combined_mapping_file(self):
+        task = self.setup_task()
+        remapper, offsets = task._get_combined_remapper()
+        modificationTime = os.path.getmtime(remapper.mappingFileName)
+
+        remapper, offsets = task._get_combined_remapper()
+        assert os.path.getmtime(remapper.mappingFileName) == modificationTime
+
+    def test_get_missing_subtasks(self):
+        task = self.setup_task(seasons=[['ANN', 'JFM'], ['ANN']])
+        first, second = task.transectSubtasks
+
+        assert task._get_missing_subtasks('ANN') == [first, second]
+        assert task._get_missing_subtasks('JFM') == [first]
+        assert task._get_missing_subtasks('JJA') == []
+
+        # collections that have already been remapped are skipped
+        open(first.get_remapped_file_name(
+            'ANN', comparisonGridName='first'), 'w').close()
+        assert task._get_missing_subtasks('ANN') == [second]
+        assert task._get_missing_subtasks('JFM') == [first]
+
+        open(second.get_remapped_file_name(
+            'ANN', comparisonGridName='second'), 'w').close()
+        assert task._get_missing_subtasks('ANN') == []
+
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
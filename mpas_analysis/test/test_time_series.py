@@ -0,0 +1,193 @@
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+"""
+Unit tests for moving averages and anomalies of time series
+
+Xylar Asay-Davis
+"""
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import tempfile
+import shutil
+import numpy
+import xarray
+import netCDF4
+
+from mpas_analysis.test import TestCase
+from mpas_analysis.shared.time_series import compute_moving_avg, \
+    compute_moving_avg_anomaly_from_start, cache_time_series, \
+    align_records, read_cached_records
+
+
+class TestTimeSeries(TestCase):
+    def setUp(self):
+        # Create a temporary directory
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Remove the directory after the test
+        shutil.rmtree(self.test_dir)
+
+    def write_time_series(self, yearCount):
+        fileName = '{}/timeSeries.nc'.format(self.test_dir)
+        xtimeStart = []
+        xtimeEnd = []
+        for year in range(1, yearCount+1):
+            for month in range(1, 13):
+                xtimeStart.append('{:04d}-{:02d}-01_00:00:00'.format(
+                    year, month))
+                xtimeEnd.append('{:04d}-{:02d}-01_00:00:00'.format(
+                    year + month//12, month % 12 + 1))
+        timeCount = len(xtimeStart)
+        ds = xarray.Dataset()
+        ds['xtime_startMonthly'] = ('Time', numpy.array(xtimeStart, 'S64'))
+        ds['xtime_endMonthly'] = ('Time', numpy.array(xtimeEnd, 'S64'))
+        ds['temperature'] = (('Time', 'nVertLevels'),
+                             numpy.sin(0.1*numpy.arange(3*timeCount)).reshape(
+                                 timeCount, 3))
+        ds.to_netcdf(fileName)
+        return fileName
+
+    def test_compute_moving_avg(self):
+        ds = xarray.Dataset()
+        ds['Time'] = ('Time', 30.*numpy.arange(50))
+        ds['temperature'] = (('nVertLevels', 'Time'),
+                             numpy.random.rand(3, 50))
+        ds['temperature'][1, 20] = numpy.nan
+        ds['refBottomDepth'] = ('nVertLevels', numpy.arange(3.))
+
+        for movingAveragePoints in [1, 2, 12]:
+            for timeChunkSize in [1, 7, 1200]:
+                dsAvg = compute_moving_avg(ds, movingAveragePoints,
+                                           timeChunkSize=timeChunkSize)
+                # the centered rolling mean without the incomplete windows
+                # at either end
+                offset = movingAveragePoints//2
+                dsExpected = ds.rolling(Time=movingAveragePoints,
+                                        center=True).mean().isel(
+                    Time=slice(offset, offset + 50 - movingAveragePoints + 1))
+                self.assertArrayEqual(dsAvg.Time.values,
+                                      dsExpected.Time.values)
+                self.assertEqual(dsAvg.temperature.dims,
+                                 ('nVertLevels', 'Time'))
+                numpy.testing.assert_allclose(dsAvg.temperature.values,
+                                              dsExpected.temperature.values)
+                self.assertArrayEqual(dsAvg.refBottomDepth.values,
+                                      ds.refBottomDepth.values)
+
+    def test_anomaly_update(self):
+        fileName = self.write_time_series(yearCount=4)
+        outFileName = '{}/anomaly.nc'.format(self.test_dir)
+
+        kwargs = dict(timeSeriesFileName=fileName,
+                      variableList=['temperature'],
+                      anomalyStartTime='0001-01-01_00:00:00',
+                      anomalyEndTime='0001-12-31_23:59:59',
+                      startDate='0001-01-01_00:00:00',
+                      endDate='0003-12-31_23:59:59',
+                      calendar='gregorian_noleap',
+                      movingAveragePoints=12)
+
+        dsFirst = compute_moving_avg_anomaly_from_start(**kwargs)
+        self.assertEqual(dsFirst.sizes['Time'], 36 - 11)
+        # by definition, the anomaly starts at zero
+        numpy.testing.assert_allclose(dsFirst.temperature.isel(Time=0), 0.,
+                                      atol=1e-12)
+        dsFirst.to_netcdf(outFileName)
+
+        kwargs['endDate'] = '0004-12-31_23:59:59'
+        dsFull = compute_moving_avg_anomaly_from_start(**kwargs)
+        dsUpdate = compute_moving_avg_anomaly_from_start(
+            previousFileName=outFileName, **kwargs)
+
+        self.assertEqual(dsUpdate.sizes['Time'], 48 - 11)
+        self.assertArrayEqual(dsUpdate.Time.values, dsFull.Time.values)
+        numpy.testing.assert_allclose(dsUpdate.temperature.values,
+                                      dsFull.temperature.values)
+
+    def test_cache_time_series(self):
+        cacheFileName = '{}/cache.nc'.format(self.test_dir)
+        # 3 years of monthly times on a noleap calendar
+        times = 365.*numpy.arange(3)[:, numpy.newaxis] + \
+            numpy.array([0., 31., 59., 90., 120., 151., 181., 212., 243.,
+                         273., 304., 334.])[numpy.newaxis, :]
+        times = times.ravel()
+
+        timesComputed = []
+
+        def compute(timesInDataSet):
+            def compute_subset(timeIndices, firstCall):
+                timesComputed.extend(timesInDataSet[timeIndices])
+                ds = xarray.Dataset()
+                ds['Time'] = ('Time', timesInDataSet[timeIndices])
+                ds['value'] = (('Time', 'nRegions'),
+                               numpy.outer(timesInDataSet[timeIndices],
+                                           [1., 2.]))
+                return ds
+            return compute_subset
+
+        # the last year first, then all years
+        dsCache = cache_time_series(times[24:], compute(times[24:]),
+                                    cacheFileName,
+                                    calendar='gregorian_noleap')
+        self.assertArrayEqual(dsCache.Time.values, times[24:])
+
+        del timesComputed[:]
+        dsCache = cache_time_series(times, compute(times), cacheFileName,
+                                    calendar='gregorian_noleap')
+
+        # only the first 2 years were computed on the second call
+        self.assertArrayEqual(numpy.array(timesComputed), times[0:24])
+        self.assertArrayEqual(dsCache.Time.values, times)
+        self.assertArrayEqual(dsCache.value.values,
+                              numpy.outer(times, [1., 2.]))
+
+        with netCDF4.Dataset(cacheFileName) as ncFile:
+            assert ncFile.dimensions['Time'].isunlimited()
+            # records are appended in the order they were computed
+            self.assertEqual(ncFile.variables['Time'][0], times[24])
+
+    def test_align_records(self):
+        years = numpy.repeat(numpy.arange(1, 1001), 12)
+        months = numpy.tile(numpy.arange(1, 13), 1000)
+
+        # cached records in a different order, with a duplicate and a record
+        # that is no longer expected
+        cachedYears = numpy.array([5, 1, 2, 5, 2000], dtype='i4')
+        cachedMonths = numpy.array([3, 1, 12, 3, 1], dtype='i4')
+
+        cachedIndices, expectedIndices = align_records(
+            [cachedYears, cachedMonths], [years, months])
+
+        self.assertArrayEqual(expectedIndices, [0, 23, 50])
+        self.assertArrayEqual(cachedIndices, [1, 2, 3])
+
+    def test_read_cached_records(self):
+        cacheFileName = '{}/cache.nc'.format(self.test_dir)
+        dsCache, expectedIndices = read_cached_records(
+            cacheFileName, keyNames=['Time'], expectedKeys=[[0., 31.]])
+        assert dsCache is None
+        self.assertEqual(len(expectedIndices), 0)
+
+        ds = xarray.Dataset()
+        ds['Time'] = ('Time', [59., 0., 90.])
+        ds['value'] = ('Time', [3., 1., 4.])
+        ds.to_netcdf(cacheFileName)
+
+        dsCache, expectedIndices = read_cached_records(
+            cacheFileName, keyNames=['Time'],
+            expectedKeys=[[0., 31., 59.]])
+        self.assertArrayEqual(expectedIndices, [0, 2])
+        self.assertArrayEqual(dsCache.value.values, [1., 3.])
+
+# vim: foldmethod=marker ai ts=4 sts=4 et sw=4 ft=python
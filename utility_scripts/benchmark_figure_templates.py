@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+
+'''
+Times three-panel polar projection comparison plots of a field for all
+seasons, building each figure from scratch and reusing the figure from the
+previous season as a template.
+
+Usage: Copy this script into the main MPAS-Analysis directory (up one level).
+Modify the grid size and the seasons as desired.
+'''
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import shutil
+import tempfile
+import timeit
+import numpy
+import matplotlib
+matplotlib.use('Agg')
+
+from mpas_analysis.configuration import MpasAnalysisConfigParser
+from mpas_analysis.shared.plot.plotting import \
+    plot_polar_projection_comparison
+
+# replace with the desired number of grid points in each direction
+nx = 500
+
+# replace with the seasons to plot
+seasons = ['JFM', 'AMJ', 'JAS', 'OND', 'ANN', 'Jan', 'Feb', 'Mar', 'Apr',
+           'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# the number of times to repeat the plots for all seasons
+repeatCount = 3
+
+# the section with the colormap to use
+colorMapSectionName = 'climatologyMapAntarcticMelt'
+
+config = MpasAnalysisConfigParser()
+config.read('mpas_analysis/config.default')
+
+random = numpy.random.RandomState(0)
+
+x = numpy.linspace(-3000., 3000., nx+1)
+y = numpy.linspace(-3000., 3000., nx+1)
+xCenter = 0.5*(x[1:] + x[0:-1])
+yCenter = 0.5*(y[1:] + y[0:-1])
+radius = numpy.sqrt(xCenter[numpy.newaxis, :]**2 +
+                    yCenter[:, numpy.newaxis]**2)
+land = radius < 1000.
+landMask = numpy.ma.masked_array(numpy.ones((nx, nx)),
+                                 mask=numpy.logical_not(land))
+
+fields = {}
+for season in seasons:
+    modelArray = numpy.ma.masked_array(random.rand(nx, nx), mask=land)
+    refArray = numpy.ma.masked_array(random.rand(nx, nx), mask=land)
+    fields[season] = (modelArray, refArray, modelArray - refArray)
+
+outDirectory = tempfile.mkdtemp()
+
+
+def plot_seasons():
+    for season in seasons:
+        modelArray, refArray, diffArray = fields[season]
+        plot_polar_projection_comparison(
+            config, x, y, landMask, modelArray, refArray, diffArray,
+            fileout='{}/melt_{}.png'.format(outDirectory, season),
+            colorMapSectionName=colorMapSectionName,
+            title='Melt Rate ({})'.format(season),
+            cbarlabel='m/yr')
+
+
+for reuse in ['False', 'True']:
+    config.set('plot', 'reuseFigureTemplates', reuse)
+    plotTime = min(timeit.repeat(plot_seasons, number=1, repeat=repeatCount))
+    print('{} seasons on a {}x{} grid, reuseFigureTemplates = {}:'.format(
+        len(seasons), nx, nx, reuse))
+    print('  {:.3f} s'.format(plotTime))
+
+shutil.rmtree(outDirectory)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# This software is open source software available under the BSD-3 license.
+#
+# Copyright (c) 2018 Los Alamos National Security, LLC. All rights reserved.
+# Copyright (c) 2018 Lawrence Livermore National Security, LLC. All rights
+# reserved.
+# Copyright (c) 2018 UT-Battelle, LLC. All rights reserved.
+#
+# Additional copyright and license information can be found in the LICENSE file
+# distributed with this code, or at
+# https://raw.githubusercontent.com/MPAS-Dev/MPAS-Analysis/master/LICENSE
+
+'''
+Times the vertical interpolation used to put model and observed transects on
+the same depths, for transects of typical sizes.
+
+Usage: Copy this script into the main MPAS-Analysis directory (up one level).
+Modify the number of transect points and of model and output levels as
+desired.
+'''
+
+from __future__ import absolute_import, division, print_function, \
+    unicode_literals
+
+import timeit
+import numpy
+import xarray
+
+from mpas_analysis.shared.interpolation import interp_1d
+
+# replace with the desired number of points in all transects
+pointCounts = [1000, 10000]
+
+# replace with the number of model levels and of levels to interpolate to
+nVertLevels = 80
+nz = 100
+
+# the number of times to repeat each interpolation
+repeatCount = 3
+
+random = numpy.random.RandomState(0)
+
+for nPoints in pointCounts:
+    # model: zMid varies with position and is NaN below the bathymetry
+    zMid = -numpy.cumsum(random.uniform(1., 100., (nPoints, nVertLevels)),
+                         axis=1)
+    maxLevelCell = random.randint(1, nVertLevels+1, nPoints)
+    zMid[numpy.arange(nVertLevels)[numpy.newaxis, :] >=
+         maxLevelCell[:, numpy.newaxis]] = numpy.nan
+
+    dsModel = xarray.Dataset()
+    dsModel['zMid'] = (('nPoints', 'nVertLevels'), zMid)
+    dsModel['z'] = (('nz',), numpy.linspace(0., -6000., nz))
+    dsModel['temperature'] = (('nPoints', 'nVertLevels'),
+                              random.randn(nPoints, nVertLevels))
+    dsModel = dsModel.set_coords(['zMid', 'z'])
+
+    # observations: the same depths at all points
+    dsObs = xarray.Dataset()
+    dsObs['zObs'] = (('nzObs',), numpy.linspace(0., -6000., 2*nz))
+    dsObs['z'] = (('nz',), numpy.linspace(0., -6000., nz))
+    dsObs['temperature'] = (('nPoints', 'nzObs'),
+                            random.randn(nPoints, 2*nz))
+    dsObs = dsObs.set_coords(['zObs', 'z'])
+
+    modelTime = min(timeit.repeat(
+        lambda: interp_1d(dsModel, inInterpDim='nVertLevels',
+                          inInterpCoord='zMid', outInterpDim='nz',
+                          outInterpCoord='z'),
+        number=1, repeat=repeatCount))
+
+    obsTime = min(timeit.repeat(
+        lambda: interp_1d(dsObs, inInterpDim='nzObs', inInterpCoord='zObs',
+                          outInterpDim='nz', outInterpCoord='z'),
+        number=1, repeat=repeatCount))
+
+    print('{} points, {} levels to {} levels:'.format(nPoints, nVertLevels,
+                                                      nz))
+    print('  model (2D zMid):   {:.3f} s'.format(modelTime))
+    print('  obs (1D z):        {:.3f} s'.format(obsTime))